@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import DataLoader
+from utils.data_loader import get_shared_loader
+from utils.warmup import warmer, start_warmup
+from utils.auth import can_view_dashboard
 from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer, show_acknowledgment, create_section_divider
 from datetime import datetime
 
@@ -73,7 +75,8 @@ def main():
     @st.cache_resource
     def load_data():
         try:
-            loader = DataLoader()
+            loader = get_shared_loader()
+            start_warmup()
             return loader
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
@@ -91,6 +94,7 @@ def main():
         - PRODUCT TYPE LOOKUP TABLE_*.csv
         """)
         return
+    loader = get_shared_loader()  # current loader: reloading the data files replaces it
     
     # Welcome message
     st.markdown("### Welcome to the BI Portal")
@@ -190,6 +194,23 @@ def main():
         **Source System:** Core Banking System  
         **Data Retention:** 24 months rolling  
         """)
+        
+        progress = warmer.progress()
+        st.markdown(f"**Dashboard Cache:** {progress['state'].title()} "
+                    f"({progress['completed']}/{progress['total']} steps)")
+        if progress['state'] == 'running':
+            st.progress(progress['fraction'], text=f"Warming: {progress['current'] or 'starting'}")
+        for step, error in progress['errors'].items():
+            st.warning(f"{step}: {error}")
+        
+        # Reloading drops the shared caches and re-warms every dashboard: cache administrators only
+        if can_view_dashboard('Cache Administration') and \
+                st.button("🔄 Reload Data Files", disabled=progress['state'] == 'running'):
+            changed = warmer.refresh()
+            if changed:
+                st.success(f"Reloaded: {', '.join(changed)}. Dashboards are being re-warmed in the background.")
+            else:
+                st.info("Data files are unchanged.")
     
     st.markdown("---")
     
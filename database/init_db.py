@@ -9,7 +9,8 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.database import init_database, test_database_connection
+from utils.database import init_database, test_database_connection, get_database_engine
+from utils.migrations import migration_status
 from utils.auth import hash_password
 import streamlit as st
 
@@ -28,7 +29,9 @@ def main():
     - Inserts default roles (Executive, Manager, Analyst, Read-Only, External)
     - Creates default admin user (username: admin, password: Admin@123456)
     
-    **⚠️ Warning:** This will execute the schema.sql file. Only run once or after database reset.
+    **Migrations:** Applies the pending files in database/migrations in version order and records each
+    in schema_version. Applied migrations are skipped, so it is safe to run again. App processes do the
+    same on startup unless DB_AUTO_MIGRATE=0.
     """)
     
     st.markdown("---")
@@ -51,7 +54,7 @@ def main():
     # Initialize database
     st.markdown("### Step 2: Initialize Database Schema")
     
-    st.warning("⚠️ This will create/update all database tables. Proceed with caution in production.")
+    st.warning("⚠️ This will apply pending schema migrations. Proceed with caution in production.")
     
     if st.button("Initialize Database", key="init_db"):
         with st.spinner("Initializing database..."):
@@ -85,6 +88,14 @@ def main():
                 st.error(f"❌ {message}")
                 st.error("Database initialization failed. Check error message above.")
     
+    # Applied and pending migrations
+    st.markdown("### Schema Migrations")
+    
+    try:
+        st.dataframe(migration_status(get_database_engine()), use_container_width=True, hide_index=True)
+    except Exception as e:
+        st.caption(f"Migration status unavailable: {e}")
+    
     st.markdown("---")
     
     # View database info
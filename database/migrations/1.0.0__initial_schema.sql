@@ -2,6 +2,7 @@
 -- PostgreSQL Database Schema for Authentication and User Management
 -- Version: 1.0
 -- Created: October 21, 2025
+-- Applied by utils/migrations.py, which records it in schema_version
 
 -- ============================================================================
 -- USER MANAGEMENT
@@ -307,20 +308,6 @@ COMMENT ON TABLE user_sessions IS 'Active user sessions for authentication';
 -- GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO nmb_app_user;
 -- GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO nmb_app_user;
 
--- ============================================================================
--- SCHEMA VERSION
--- ============================================================================
-
-CREATE TABLE IF NOT EXISTS schema_version (
-    version_id SERIAL PRIMARY KEY,
-    version VARCHAR(20) NOT NULL,
-    description TEXT,
-    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
-INSERT INTO schema_version (version, description)
-VALUES ('1.0.0', 'Initial schema with 5-level RBAC, user management, bookmarks, favorites, and notifications');
-
 -- ============================================================================
 -- END OF SCHEMA
 -- ============================================================================
@@ -0,0 +1,29 @@
+-- NMB Bank BI Portal Database Migration 1.0.1
+-- Background export jobs
+-- Export requests queued from the account list dashboards, their progress and artifacts
+
+-- Export jobs: Background exports requested from the dashboards
+CREATE TABLE IF NOT EXISTS export_jobs (
+    job_id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(user_id) ON DELETE CASCADE,
+    username VARCHAR(100),
+    export_name VARCHAR(100) NOT NULL,  -- 'active_email_accounts', 'active_accounts', 'inactive_accounts'
+    dashboard VARCHAR(100),
+    export_format VARCHAR(20) NOT NULL DEFAULT 'csv.gz',  -- 'csv.gz', 'parquet', 'xlsx'
+    parameters JSONB,  -- Filter state the export was requested with
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',  -- 'queued', 'running', 'done', 'failed', 'expired'
+    rows_total INTEGER,
+    rows_written INTEGER DEFAULT 0,
+    artifact_path TEXT,
+    artifact_bytes BIGINT,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Export job indexes
+CREATE INDEX IF NOT EXISTS idx_export_jobs_user_id ON export_jobs(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_export_jobs_status ON export_jobs(status);
+
+COMMENT ON TABLE export_jobs IS 'Background export requests, their progress and artifacts';
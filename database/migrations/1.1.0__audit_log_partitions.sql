@@ -0,0 +1,182 @@
+-- NMB Bank BI Portal Database Migration 1.1.0
+-- Monthly audit_log partitions and daily activity rollup
+-- Converts audit_log to monthly range partitions (copying rows from the 1.0 table) and reports activity from audit_daily_rollup
+
+-- Audit log: Track all user actions, partitioned by month (audit_log_YYYYMM)
+-- Partitions are created ahead and dropped after the retention period by
+-- maintain_audit_log(); rows outside every monthly partition land in audit_log_default.
+
+-- An unpartitioned audit_log from schema 1.0 is renamed here and copied in below
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+               WHERE c.relname = 'audit_log' AND c.relkind = 'r' AND n.nspname = current_schema()) THEN
+        DROP INDEX IF EXISTS idx_audit_log_user_id, idx_audit_log_timestamp, idx_audit_log_action;
+        -- Would follow the rename and block dropping the legacy table; recreated below on the rollup
+        DROP VIEW IF EXISTS v_user_activity_summary;
+        ALTER TABLE audit_log RENAME TO audit_log_legacy;
+        ALTER TABLE audit_log_legacy RENAME CONSTRAINT audit_log_pkey TO audit_log_legacy_pkey;
+        ALTER SEQUENCE IF EXISTS audit_log_log_id_seq RENAME TO audit_log_legacy_log_id_seq;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS audit_log (
+    log_id BIGSERIAL,
+    user_id INTEGER REFERENCES users(user_id) ON DELETE SET NULL,
+    username VARCHAR(100),  -- Denormalized for deleted users
+    action VARCHAR(100) NOT NULL,  -- 'login', 'logout', 'page_view', 'export', 'update_profile'
+    dashboard_accessed VARCHAR(100),
+    details JSONB,  -- Additional context (filters applied, exports generated, etc.)
+    ip_address VARCHAR(50),
+    user_agent TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (log_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT;
+
+-- Create the monthly partitions covering first_month..last_month that don't exist yet
+CREATE OR REPLACE FUNCTION create_audit_log_partitions(first_month DATE, last_month DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE := date_trunc('month', first_month)::DATE;
+    month_end DATE;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        month_end := (month_start + INTERVAL '1 month')::DATE;
+        partition_name := 'audit_log_' || to_char(month_start, 'YYYYMM');
+        IF to_regclass(partition_name) IS NULL THEN
+            -- Rows for the month already in the default partition move to the new one
+            EXECUTE format('CREATE TABLE %I (LIKE audit_log INCLUDING DEFAULTS)', partition_name);
+            EXECUTE format('WITH moved AS (DELETE FROM audit_log_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                           'INSERT INTO %I SELECT * FROM moved', month_start, month_end, partition_name);
+            EXECUTE format('ALTER TABLE audit_log ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           partition_name, month_start, month_end);
+            created := created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop monthly partitions (and default-partition rows) older than retain_months
+CREATE OR REPLACE FUNCTION drop_audit_log_partitions(retain_months INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    cutoff DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => retain_months))::DATE;
+    part RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'audit_log'::regclass
+          AND c.relname ~ '^audit_log_[0-9]{6}$'
+          AND to_date(substring(c.relname FROM 11), 'YYYYMM') < cutoff
+    LOOP
+        EXECUTE format('DROP TABLE %I', part.relname);
+        dropped := dropped + 1;
+    END LOOP;
+    DELETE FROM audit_log_default WHERE created_at < cutoff;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partition upkeep: months_ahead partitions beyond the current month, retain_months of history
+CREATE OR REPLACE FUNCTION maintain_audit_log(months_ahead INTEGER DEFAULT 3, retain_months INTEGER DEFAULT 24)
+RETURNS VOID AS $$
+BEGIN
+    -- One app process at a time
+    PERFORM pg_advisory_xact_lock(hashtext('maintain_audit_log'));
+    PERFORM create_audit_log_partitions(CURRENT_DATE, (CURRENT_DATE + make_interval(months => months_ahead))::DATE);
+    PERFORM drop_audit_log_partitions(retain_months);
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_audit_log_partitions(CURRENT_DATE, (CURRENT_DATE + INTERVAL '3 months')::DATE);
+
+-- Copy rows from a schema 1.0 audit_log, then drop it
+DO $$
+BEGIN
+    IF to_regclass('audit_log_legacy') IS NOT NULL THEN
+        PERFORM create_audit_log_partitions(
+            COALESCE((SELECT MIN(created_at)::DATE FROM audit_log_legacy), CURRENT_DATE), CURRENT_DATE);
+        INSERT INTO audit_log (log_id, user_id, username, action, dashboard_accessed, details,
+                               ip_address, user_agent, created_at)
+        SELECT log_id, user_id, username, action, dashboard_accessed, details,
+               ip_address, user_agent, COALESCE(created_at, CURRENT_TIMESTAMP)
+        FROM audit_log_legacy;
+        PERFORM setval(pg_get_serial_sequence('audit_log', 'log_id'),
+                       COALESCE((SELECT MAX(log_id) FROM audit_log), 0) + 1, false);
+        DROP TABLE audit_log_legacy;
+    END IF;
+END $$;
+
+-- Daily activity rollup: action counts per user, day, dashboard and action,
+-- maintained incrementally from audit_log inserts (events without a user are not counted)
+CREATE TABLE IF NOT EXISTS audit_daily_rollup (
+    activity_date DATE NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    dashboard VARCHAR(100) NOT NULL DEFAULT '',  -- '' for actions outside a dashboard (login, logout)
+    action VARCHAR(100) NOT NULL,
+    action_count INTEGER NOT NULL DEFAULT 0,
+    last_activity TIMESTAMP,
+    PRIMARY KEY (activity_date, user_id, dashboard, action)
+);
+
+-- One aggregated upsert per INSERT statement (the audit writer inserts in batches)
+CREATE OR REPLACE FUNCTION rollup_audit_log_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO audit_daily_rollup AS r (activity_date, user_id, dashboard, action, action_count, last_activity)
+    SELECT created_at::DATE, user_id, COALESCE(dashboard_accessed, ''), action, COUNT(*), MAX(created_at)
+    FROM new_rows
+    WHERE user_id IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (activity_date, user_id, dashboard, action) DO UPDATE
+    SET action_count = r.action_count + EXCLUDED.action_count,
+        last_activity = GREATEST(r.last_activity, EXCLUDED.last_activity);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS rollup_audit_log ON audit_log;
+CREATE TRIGGER rollup_audit_log AFTER INSERT ON audit_log
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_audit_log_insert();
+
+-- Backfill from existing audit_log rows when the rollup is first created
+INSERT INTO audit_daily_rollup (activity_date, user_id, dashboard, action, action_count, last_activity)
+SELECT created_at::DATE, user_id, COALESCE(dashboard_accessed, ''), action, COUNT(*), MAX(created_at)
+FROM audit_log
+WHERE user_id IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM audit_daily_rollup)
+GROUP BY 1, 2, 3, 4;
+
+-- Audit log indexes (created on every partition)
+CREATE INDEX IF NOT EXISTS idx_audit_log_user_id ON audit_log(user_id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_log_action ON audit_log(action);
+CREATE INDEX IF NOT EXISTS idx_audit_daily_rollup_user ON audit_daily_rollup(user_id, activity_date);
+
+-- User activity summary (from the daily rollup, so its cost doesn't grow with audit_log)
+CREATE OR REPLACE VIEW v_user_activity_summary AS
+SELECT 
+    u.user_id,
+    u.username,
+    r.role_name,
+    COUNT(DISTINCT d.activity_date) as active_days,
+    COALESCE(SUM(d.action_count), 0) as total_actions,
+    MAX(d.last_activity) as last_activity,
+    array_agg(DISTINCT d.dashboard) FILTER (WHERE d.dashboard <> '') as dashboards_accessed
+FROM users u
+JOIN roles r ON u.role_level = r.role_level
+LEFT JOIN audit_daily_rollup d ON u.user_id = d.user_id
+GROUP BY u.user_id, u.username, r.role_name;
+
+COMMENT ON TABLE audit_log IS 'Complete audit trail of user actions, partitioned by month';
+COMMENT ON TABLE audit_daily_rollup IS 'Daily per-user action counts by dashboard, maintained from audit_log inserts';
@@ -0,0 +1,20 @@
+-- NMB Bank BI Portal Database Migration 1.2.0
+-- Notification change events
+-- Keyset and unread indexes for notifications, and NOTIFY on notifications_changed when they change
+
+CREATE INDEX IF NOT EXISTS idx_notifications_user_page ON notifications(user_id, created_at DESC, notification_id DESC);
+CREATE INDEX IF NOT EXISTS idx_notifications_unread ON notifications(user_id) WHERE is_read = FALSE;
+
+-- Publish the user id on 'notifications_changed' when a user's notifications change,
+-- so app processes can drop their cached unread counts (utils/notifications.py)
+CREATE OR REPLACE FUNCTION notify_notifications_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('notifications_changed', COALESCE(NEW.user_id, OLD.user_id)::TEXT);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS notifications_changed ON notifications;
+CREATE TRIGGER notifications_changed AFTER INSERT OR DELETE OR UPDATE OF is_read ON notifications
+    FOR EACH ROW EXECUTE FUNCTION notify_notifications_changed();
@@ -0,0 +1,5 @@
+-- NMB Bank BI Portal Database Migration 1.2.1
+-- Hashed session tokens
+-- user_sessions.session_token holds a hash; the browser keeps the token itself
+
+COMMENT ON COLUMN user_sessions.session_token IS 'SHA-256 hash of the token held in the browser cookie';
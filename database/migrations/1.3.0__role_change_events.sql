@@ -0,0 +1,16 @@
+-- NMB Bank BI Portal Database Migration 1.3.0
+-- Role change events
+-- NOTIFY on roles_changed so app processes recompile role permission bitmasks
+
+-- Tell app processes to recompile role permission bitmasks (utils/permissions.py)
+CREATE OR REPLACE FUNCTION notify_roles_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('roles_changed', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS roles_changed ON roles;
+CREATE TRIGGER roles_changed AFTER INSERT OR UPDATE OR DELETE ON roles
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_roles_changed();
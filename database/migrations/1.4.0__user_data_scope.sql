@@ -0,0 +1,33 @@
+-- NMB Bank BI Portal Database Migration 1.4.0
+-- Row-level data scopes
+-- Branches, products and currencies whose accounts a user may see (utils/data_scope.py)
+
+-- One row per restricted user; users without a row see all data.
+-- A NULL list leaves that dimension unrestricted; an empty list allows nothing.
+CREATE TABLE IF NOT EXISTS user_data_scope (
+    user_id INTEGER PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    branches JSONB,    -- Branch codes (ACNTS_BRN_CODE), e.g. [12, 15]
+    products JSONB,    -- Product codes or names (ACNTS_PROD_CODE / Product Name)
+    currencies JSONB,  -- Currency codes (ACNTS_CURR_CODE), e.g. ["USD"]
+    updated_by VARCHAR(100),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+DROP TRIGGER IF EXISTS update_user_data_scope_updated_at ON user_data_scope;
+CREATE TRIGGER update_user_data_scope_updated_at BEFORE UPDATE ON user_data_scope
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Tell app processes to reload data scopes
+CREATE OR REPLACE FUNCTION notify_data_scopes_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('data_scopes_changed', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS data_scopes_changed ON user_data_scope;
+CREATE TRIGGER data_scopes_changed AFTER INSERT OR UPDATE OR DELETE ON user_data_scope
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_data_scopes_changed();
+
+COMMENT ON TABLE user_data_scope IS 'Row-level security: branches, products and currencies a user may see';
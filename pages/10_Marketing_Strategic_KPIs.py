@@ -4,10 +4,14 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
 from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer, create_professional_banner
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
 import numpy as np
 
 st.set_page_config(page_title="Marketing Strategic KPIs", page_icon="📊", layout="wide")
 apply_nmb_branding()
+audit_page_view("Marketing Strategic KPIs")
+show_notification_badge()
 
 show_nmb_logo()
 
@@ -0,0 +1,206 @@
+import streamlit as st
+from utils.data_loader import get_shared_loader
+from utils.cache_manager import cache_manager, EVICTION_POLICIES
+from utils.disk_cache import default_cache
+from utils.exporter import exporter
+from utils.warmup import warmer
+from utils.audit import audit_writer, audit_page_view, AUDIT_PAGE_VIEWS
+from utils.auth import init_session, require_auth
+from utils.visualization import VisualizationHelper as vh
+from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer, create_professional_banner
+from utils.notifications import show_notification_badge
+
+st.set_page_config(page_title="Cache Administration", page_icon="🗄️", layout="wide")
+apply_nmb_branding()
+
+init_session()
+require_auth(dashboard="Cache Administration")
+audit_page_view("Cache Administration")
+show_notification_badge()
+
+show_nmb_logo()
+
+st.markdown(create_professional_banner(
+    "Cache Administration",
+    "Result Cache Memory, Hit Rates and Time Saved",
+    "🗄️"
+), unsafe_allow_html=True)
+
+
+def format_bytes(n):
+    """Human-readable byte count"""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(n) < 1024:
+            return f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+# Memory budget
+st.markdown("### 💾 Memory Budget")
+
+stats = cache_manager.get_stats()
+used = cache_manager.total_bytes
+budget = cache_manager.budget_bytes
+
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    st.metric("Cached Results", format_bytes(used), f"{used / budget * 100:.1f}% of budget" if budget else None)
+
+with col2:
+    st.metric("Memory Budget", format_bytes(budget))
+
+with col3:
+    hits = int(stats['hits'].sum()) if len(stats) > 0 else 0
+    lookups = hits + (int(stats['misses'].sum()) if len(stats) > 0 else 0)
+    st.metric("Hit Rate", f"{hits / lookups * 100:.1f}%" if lookups > 0 else "N/A", f"{lookups:,} lookups")
+
+with col4:
+    saved = stats['saved_seconds'].sum() if len(stats) > 0 else 0.0
+    st.metric("Compute Time Saved", f"{saved:,.1f}s", f"Policy: {cache_manager.policy.upper()}")
+
+# Per-namespace statistics
+st.markdown("### 📊 Cache Statistics by Namespace")
+
+if len(stats) > 0:
+    display_stats = stats.copy()
+    display_stats['bytes'] = display_stats['bytes'].apply(format_bytes)
+    display_stats['hit_rate'] = display_stats['hit_rate'].apply(lambda x: f"{x:.1f}%")
+    display_stats['compute_seconds'] = display_stats['compute_seconds'].apply(lambda x: f"{x:,.2f}s")
+    display_stats['saved_seconds'] = display_stats['saved_seconds'].apply(lambda x: f"{x:,.2f}s")
+    display_stats.columns = ['Namespace', 'Entries', 'Memory', 'Hits', 'Misses', 'Compute Time',
+                             'Time Saved', 'Evictions', 'Hit Rate']
+    st.dataframe(display_stats, use_container_width=True, hide_index=True)
+else:
+    st.info("No cached results yet.")
+
+# Largest entries
+entries = cache_manager.get_entries()
+
+if len(entries) > 0:
+    col1, col2 = st.columns(2)
+
+    with col1:
+        by_namespace = entries.groupby('namespace', as_index=False)['bytes'].sum()
+        by_namespace['megabytes'] = by_namespace['bytes'] / 1024 ** 2
+        fig = vh.create_pie_chart(by_namespace, 'namespace', 'megabytes', 'Memory by Namespace (MB)')
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        largest = entries.nlargest(10, 'bytes').copy()
+        largest['megabytes'] = largest['bytes'] / 1024 ** 2
+        largest['entry'] = largest['key'].str.slice(0, 40)
+        fig = vh.create_bar_chart(largest, 'entry', 'megabytes', 'Largest Entries (MB)', orientation='h')
+        st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("📋 All Cached Entries"):
+        display_entries = entries.copy()
+        display_entries['bytes'] = display_entries['bytes'].apply(format_bytes)
+        display_entries['compute_seconds'] = display_entries['compute_seconds'].round(3)
+        display_entries['saved_seconds'] = display_entries['saved_seconds'].round(3)
+        st.dataframe(display_entries.drop(columns=['score']), use_container_width=True, hide_index=True)
+
+# Data model
+st.markdown("---")
+st.markdown("### 🗃️ Data Model")
+
+loader = get_shared_loader()
+usage = loader.get_memory_usage()
+
+col1, col2 = st.columns([1, 2])
+
+with col1:
+    st.metric("Loaded Data", format_bytes(usage['bytes'].sum()), f"{usage['rows'].sum():,} rows")
+    st.metric("Process Total (Data + Cache)", format_bytes(usage['bytes'].sum() + used))
+
+with col2:
+    display_usage = usage[usage['rows'] > 0].copy()
+    display_usage['bytes'] = display_usage['bytes'].apply(format_bytes)
+    display_usage.columns = ['Source', 'Rows', 'Memory', 'Version']
+    st.dataframe(display_usage, use_container_width=True, hide_index=True)
+
+# Disk cache and warm-up
+st.markdown("---")
+st.markdown("### 💿 Disk Cache & Warm-up")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    disk_stats = default_cache.stats
+    disk_lookups = disk_stats['hits'] + disk_stats['misses']
+    st.markdown(f"""
+    **Directory:** `{default_cache.cache_dir}`  
+    **Size:** {format_bytes(default_cache.size())} of {format_bytes(default_cache.max_bytes)}  
+    **Hit Rate (this process):** {disk_stats['hits'] / disk_lookups * 100 if disk_lookups else 0:.1f}% ({disk_lookups:,} lookups)  
+    **Writes / Evictions / Errors:** {disk_stats['writes']:,} / {disk_stats['evictions']:,} / {disk_stats['errors']:,}
+    """)
+    st.markdown(f"""
+    **Export Artifacts:** `{exporter.export_dir}`  
+    **Size:** {format_bytes(exporter.size())} of {format_bytes(exporter.max_bytes)}  
+    **Served from Cache / Written (this process):** {exporter.stats['hits']:,} / {exporter.stats['misses']:,}
+    """)
+
+with col2:
+    progress = warmer.progress()
+    st.markdown(f"**Warm-up:** {progress['state'].title()} ({progress['completed']}/{progress['total']} steps)")
+    st.progress(progress['fraction'])
+    if progress['started_at'] is not None and progress['finished_at'] is not None:
+        st.caption(f"Took {(progress['finished_at'] - progress['started_at']).total_seconds():.1f}s "
+                   f"for data version {progress['data_version']}")
+    for step, error in progress['errors'].items():
+        st.warning(f"{step}: {error}")
+
+# Audit writer
+st.markdown("---")
+st.markdown("### 📝 Audit Log Writer")
+
+audit_stats = audit_writer.stats
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    st.metric("Events Written", f"{audit_stats['written']:,}", f"{audit_stats['batches']:,} batches")
+
+with col2:
+    st.metric("Pending", f"{audit_writer.pending():,}")
+
+with col3:
+    st.metric("Dropped", f"{audit_stats['dropped']:,}", f"{audit_stats['failed_batches']:,} failed writes",
+              delta_color="inverse")
+
+with col4:
+    st.metric("Page-View Auditing", "On" if AUDIT_PAGE_VIEWS else "Off")
+
+# Controls
+st.markdown("---")
+st.markdown("### ⚙️ Controls")
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    budget_mb = st.number_input("Memory Budget (MB)", min_value=64, value=int(budget / 1024 ** 2), step=256)
+    policy = st.selectbox("Eviction Policy", EVICTION_POLICIES, index=EVICTION_POLICIES.index(cache_manager.policy),
+                          format_func=lambda p: {'lru': 'Least Recently Used', 'cost': 'Cost-Aware'}[p])
+    if st.button("Apply"):
+        cache_manager.set_budget(int(budget_mb * 1024 ** 2), policy)
+        st.rerun()
+
+with col2:
+    namespaces = ['All'] + (stats['namespace'].tolist() if len(stats) > 0 else [])
+    namespace = st.selectbox("Namespace", namespaces)
+    if st.button("🗑️ Clear Memory Cache"):
+        removed = cache_manager.invalidate(None if namespace == 'All' else namespace)
+        st.success(f"Removed {removed:,} entries")
+
+with col3:
+    if st.button("🔥 Re-run Warm-up", disabled=progress['state'] == 'running'):
+        warmer.start(force=True)
+        st.rerun()
+    if st.button("🗑️ Clear Disk Cache"):
+        default_cache.clear()
+        st.success("Disk cache cleared")
+    if st.button("🗑️ Clear Export Artifacts"):
+        exporter.clear()
+        st.success("Export artifacts cleared")
+
+show_nmb_footer()
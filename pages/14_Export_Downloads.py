@@ -0,0 +1,100 @@
+import streamlit as st
+import pandas as pd
+from pathlib import Path
+from utils.database import get_user_export_jobs
+from utils.exporter import EXPORT_FORMATS
+from utils.export_jobs import job_queue
+from utils.auth import init_session, require_auth
+from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer, create_professional_banner
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
+
+st.set_page_config(page_title="Export Downloads", page_icon="📦", layout="wide")
+apply_nmb_branding()
+
+init_session()
+require_auth(dashboard="Export Downloads")
+audit_page_view("Export Downloads")
+show_notification_badge()
+
+show_nmb_logo()
+
+st.markdown(create_professional_banner(
+    "Export Downloads",
+    "Background Exports and Their Files",
+    "📦"
+), unsafe_allow_html=True)
+
+STATUS_ICONS = {
+    'queued': '⏳',
+    'running': '⚙️',
+    'done': '✅',
+    'failed': '❌',
+    'expired': '🗑️'
+}
+
+
+def format_bytes(n):
+    """Human-readable byte count"""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(n) < 1024:
+            return f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+try:
+    job_queue.resume()
+    jobs = get_user_export_jobs(st.session_state.user_id)
+except Exception as e:
+    st.error(f"Could not load export jobs: {e}")
+    st.stop()
+
+highlight = st.query_params.get('job')
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    active = sum(job.status in ('queued', 'running') for job in jobs)
+    st.markdown(f"### 📋 My Exports ({len(jobs)}, {active} in progress)")
+with col2:
+    if st.button("🔄 Refresh", use_container_width=True):
+        st.rerun()
+
+if not jobs:
+    st.info("No exports yet. Use 'Export in the background' on the account list dashboards.")
+
+for job in jobs:
+    label, suffix, mime = EXPORT_FORMATS.get(job.export_format, EXPORT_FORMATS['csv.gz'])
+    title = f"{STATUS_ICONS.get(job.status, '')} #{job.job_id} {job.export_name.replace('_', ' ').title()} ({label})"
+
+    with st.expander(title, expanded=str(job.job_id) == highlight or job.status in ('queued', 'running')):
+        st.caption(f"Requested {pd.Timestamp(job.created_at):%Y-%m-%d %H:%M} from {job.dashboard or 'a dashboard'}")
+
+        if job.status == 'running':
+            total = job.rows_total or 0
+            written = job.rows_written or 0
+            st.progress(written / total if total else 0.0, text=f"{written:,} of {total:,} rows written")
+        elif job.status == 'queued':
+            st.info("Waiting for a free export worker")
+        elif job.status == 'failed':
+            st.error(job.error or "Export failed")
+        elif job.status == 'expired':
+            st.warning("This file has been removed. Request the export again.")
+        elif job.status == 'done':
+            path = Path(job.artifact_path or '')
+            if path.is_file():
+                elapsed = (job.finished_at - job.started_at).total_seconds() if job.started_at and job.finished_at else 0
+                st.markdown(f"**{job.rows_total or 0:,} rows**, {format_bytes(job.artifact_bytes or 0)}, "
+                            f"built in {elapsed:.1f}s")
+                st.download_button(
+                    label="📥 Download",
+                    data=lambda path=path: path.read_bytes(),
+                    file_name=f"{job.export_name}_{pd.Timestamp(job.created_at):%Y%m%d}{suffix}",
+                    mime=mime,
+                    key=f"download_job_{job.job_id}",
+                    on_click='ignore'
+                )
+            else:
+                st.warning("The export file is no longer available. Request the export again.")
+
+show_nmb_footer()
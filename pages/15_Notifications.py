@@ -0,0 +1,103 @@
+import streamlit as st
+import pandas as pd
+from pathlib import Path
+from utils.notifications import notification_service, show_notification_badge, NOTIFICATIONS_PAGE_SIZE
+from utils.auth import init_session, require_auth
+from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer, create_professional_banner
+from utils.audit import audit_page_view
+
+st.set_page_config(page_title="Notifications", page_icon="🔔", layout="wide")
+apply_nmb_branding()
+
+init_session()
+require_auth(dashboard="Notifications")
+audit_page_view("Notifications")
+show_notification_badge()
+
+show_nmb_logo()
+
+st.markdown(create_professional_banner(
+    "Notifications",
+    "Alerts and Updates for Your Account",
+    "🔔"
+), unsafe_allow_html=True)
+
+TYPE_ICONS = {
+    'info': 'ℹ️',
+    'warning': '⚠️',
+    'alert': '🚨',
+    'success': '✅'
+}
+
+
+def page_file(link):
+    """Page script for a notification link such as 'Export_Downloads?job=12'; (path, query params)"""
+    url_path, _, query = link.partition('?')
+    matches = sorted(Path('pages').glob(f'*_{url_path}.py'))
+    if not matches:
+        return None, None
+    params = dict(pair.split('=', 1) for pair in query.split('&') if '=' in pair)
+    return matches[0].as_posix(), params
+
+
+user_id = st.session_state.user_id
+
+# Keyset pagination: cursors[i] is where page i starts (None for the newest)
+if 'notification_cursors' not in st.session_state:
+    st.session_state.notification_cursors = [None]
+
+col1, col2, col3 = st.columns([2, 1, 1])
+with col1:
+    unread_only = st.toggle("Unread only", key="notifications_unread_only",
+                            on_change=lambda: st.session_state.update(notification_cursors=[None]))
+
+try:
+    unread = notification_service.unread_count(user_id)
+    rows, next_cursor = notification_service.page(user_id, st.session_state.notification_cursors[-1],
+                                                  NOTIFICATIONS_PAGE_SIZE, unread_only)
+except Exception as e:
+    st.error(f"Could not load notifications: {e}")
+    st.stop()
+
+with col2:
+    st.metric("Unread", f"{unread:,}")
+with col3:
+    if st.button("✔️ Mark all as read", disabled=unread == 0, use_container_width=True):
+        notification_service.mark_all_read(user_id)
+        st.rerun()
+
+if not rows:
+    st.info("No unread notifications." if unread_only else "No notifications yet.")
+
+for notification in rows:
+    icon = TYPE_ICONS.get(notification.notification_type, 'ℹ️')
+    with st.container(border=True):
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            weight = '' if notification.is_read else '**'
+            st.markdown(f"{icon} {weight}{notification.title}{weight}")
+            st.write(notification.message)
+            st.caption(f"{pd.Timestamp(notification.created_at):%Y-%m-%d %H:%M}")
+            if notification.link_to_dashboard:
+                page, params = page_file(notification.link_to_dashboard)
+                if page:
+                    st.page_link(page, label="Open", icon="➡️", query_params=params)
+        with col2:
+            if not notification.is_read and st.button("Mark read", key=f"read_{notification.notification_id}"):
+                notification_service.mark_read(user_id, notification.notification_id)
+                st.rerun()
+
+page_number = len(st.session_state.notification_cursors)
+col1, col2, col3 = st.columns([1, 2, 1])
+with col1:
+    if st.button("⬅️ Newer", disabled=page_number == 1, use_container_width=True):
+        st.session_state.notification_cursors.pop()
+        st.rerun()
+with col2:
+    st.caption(f"Page {page_number}")
+with col3:
+    if st.button("Older ➡️", disabled=next_cursor is None, use_container_width=True):
+        st.session_state.notification_cursors.append(next_cursor)
+        st.rerun()
+
+show_nmb_footer()
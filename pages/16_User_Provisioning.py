@@ -0,0 +1,83 @@
+import streamlit as st
+import pandas as pd
+from utils.provisioning import provision_users, PROVISIONING_COLUMNS, PROVISIONING_MAX_ROWS, HASH_WORKERS
+from utils.auth import init_session, require_auth, get_current_user
+from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer, create_professional_banner
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
+
+st.set_page_config(page_title="User Provisioning", page_icon="👥", layout="wide")
+apply_nmb_branding()
+
+init_session()
+require_auth(dashboard="User Provisioning")
+audit_page_view("User Provisioning")
+show_notification_badge()
+
+show_nmb_logo()
+
+st.markdown(create_professional_banner(
+    "User Provisioning",
+    "Create User Accounts in Bulk from a CSV",
+    "👥"
+), unsafe_allow_html=True)
+
+st.markdown(f"""
+Upload a CSV with the columns **{', '.join(PROVISIONING_COLUMNS)}**. `username` and `email` are required.
+`role_level` defaults to 4 (Read-Only). Rows with a blank `password` get a generated temporary password,
+which is shown once in the report below. Up to {PROVISIONING_MAX_ROWS:,} users per file; passwords of
+large files are hashed across up to {HASH_WORKERS} processes.
+""")
+
+st.download_button(
+    "📄 Download CSV template",
+    pd.DataFrame(columns=PROVISIONING_COLUMNS).to_csv(index=False),
+    file_name="user_provisioning_template.csv",
+    mime="text/csv"
+)
+
+uploaded = st.file_uploader("Users CSV", type=["csv"])
+
+if uploaded is not None:
+    try:
+        users = pd.read_csv(uploaded, dtype=str, keep_default_na=False)
+    except Exception as e:
+        st.error(f"Could not read the file: {e}")
+        st.stop()
+
+    st.caption(f"{len(users):,} rows")
+    st.dataframe(users.drop(columns=[c for c in users.columns if c.strip().lower() == 'password']).head(20),
+                 use_container_width=True, hide_index=True)
+
+    if st.button(f"👥 Provision {len(users):,} users", type="primary", disabled=users.empty):
+        with st.spinner("Validating, hashing passwords and creating accounts..."):
+            try:
+                st.session_state.provisioning_report = provision_users(users, get_current_user())
+            except ValueError as e:
+                st.error(str(e))
+                st.stop()
+
+report = st.session_state.get('provisioning_report')
+if report is not None:
+    st.markdown("---")
+    st.markdown("### Provisioning Report")
+
+    created = int((report['status'] == 'created').sum())
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Created", f"{created:,}")
+    with col2:
+        st.metric("Errors", f"{len(report) - created:,}")
+
+    st.dataframe(report, use_container_width=True, hide_index=True)
+
+    if (report['temporary_password'] != '').any():
+        st.warning("⚠️ The report contains temporary passwords. Share them securely and ask users to change them.")
+    st.download_button(
+        "📥 Download report",
+        report.to_csv(index=False),
+        file_name="user_provisioning_report.csv",
+        mime="text/csv"
+    )
+
+show_nmb_footer()
@@ -1,14 +1,21 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import DataLoader
-from utils.data_processor import DataProcessor
-from utils.metrics_calculator import MetricsCalculator
+from utils.data_loader import get_shared_loader
+from utils.warmup import start_warmup
+from utils.data_processor import get_shared_processor
+from utils.data_scope import current_data_scope, show_data_scope
+from utils.metrics_calculator import get_shared_calculator
+from utils.kpis import get_kpi, get_kpis
 from utils.visualization import VisualizationHelper as vh
 from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
 import plotly.graph_objects as go
 
 st.set_page_config(page_title="Executive Summary", page_icon="📊", layout="wide")
 apply_nmb_branding()
+audit_page_view("Executive Summary")
+show_notification_badge()
 
 # NMB Logo
 show_nmb_logo()
@@ -21,12 +28,15 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Load data
+# Load data (taken on every run: reloading the data files replaces the shared loader)
 @st.cache_resource
 def load_data():
-    return DataLoader()
+    loader = get_shared_loader()
+    start_warmup()
+    return loader
 
-loader = load_data()
+load_data()
+loader = get_shared_loader()
 
 if loader.get_accounts_data() is None:
     st.error("⚠️ No account data available. Please upload the accounts data file to the 'data' folder.")
@@ -38,14 +48,22 @@ if loader.get_accounts_data() is None:
     """)
     st.stop()
 
-processor = DataProcessor(loader)
-calculator = MetricsCalculator(processor)
-
-# Get key metrics
-total_customers = processor.get_unique_customer_count()
-avg_products = processor.get_avg_products_per_customer()
-active_accounts, inactive_accounts = processor.get_account_activity_segments()
-quarterly_data = processor.get_quarterly_funded_accounts(2025)
+data_scope = current_data_scope()
+show_data_scope(data_scope)  # stops the page when the user may see no data
+processor = get_shared_processor(loader, data_scope)
+calculator = get_shared_calculator(loader, data_scope)
+
+# Get key metrics (shared, versioned KPI cache)
+kpis = get_kpis(
+    ['total_customers', 'avg_products_per_customer', 'activity_split', 'quarterly_funded_accounts'],
+    calculator,
+    days_threshold=90,
+    year=2025
+)
+total_customers = kpis['total_customers']
+avg_products = kpis['avg_products_per_customer']
+activity = kpis['activity_split']
+quarterly_data = kpis['quarterly_funded_accounts']
 
 # Key Performance Indicators
 st.markdown("### 🎯 Key Performance Indicators")
@@ -63,7 +81,7 @@ with col1:
 with col2:
     st.metric(
         label="Active Accounts",
-        value=f"{len(active_accounts):,}",
+        value=f"{activity['active']:,}",
         delta=None,
         help="Accounts with transactions in last 90 days"
     )
@@ -114,7 +132,7 @@ with col2:
     
     activity_data = pd.DataFrame({
         'Status': ['Active', 'Inactive'],
-        'Count': [len(active_accounts), len(inactive_accounts)]
+        'Count': [activity['active'], activity['inactive']]
     })
     
     fig = vh.create_pie_chart(
@@ -130,7 +148,7 @@ st.markdown("---")
 # Product penetration analysis
 st.markdown("### 📊 Product Penetration Analysis")
 
-product_penetration = calculator.calculate_product_penetration()
+product_penetration = get_kpi('product_penetration', calculator)
 
 if len(product_penetration) > 0:
     # Show top 10 products
@@ -169,7 +187,7 @@ st.markdown("---")
 # Channel adoption metrics
 st.markdown("### 📱 Digital Channel Adoption")
 
-channel_data = calculator.calculate_channel_adoption()
+channel_data = get_kpi('channel_adoption', calculator)
 
 if len(channel_data) > 0:
     col1, col2 = st.columns(2)
@@ -195,6 +213,34 @@ if len(channel_data) > 0:
                 thresholds=[40, 70]
             )
             st.plotly_chart(fig, use_container_width=True)
+    
+    # Channel combinations and digital vs branch segments (same bitmask histogram)
+    channel_combinations = get_kpi('channel_combinations', calculator).head(10)
+    channel_segments = get_kpi('channel_segments', calculator)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if len(channel_combinations) > 0:
+            fig = vh.create_bar_chart(
+                channel_combinations,
+                'combination',
+                'accounts',
+                'Top 10 Channel Combinations',
+                orientation='h',
+                color='#FFD700'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        if len(channel_segments) > 0:
+            fig = vh.create_pie_chart(
+                channel_segments[channel_segments['accounts'] > 0],
+                'segment',
+                'accounts',
+                'Digital vs Branch Segments'
+            )
+            st.plotly_chart(fig, use_container_width=True)
 else:
     st.info("No channel adoption data available")
 
@@ -203,7 +249,7 @@ st.markdown("---")
 # Account concentration
 st.markdown("### 🎯 Customer Concentration Analysis")
 
-concentration = calculator.calculate_account_concentration()
+concentration = get_kpi('account_concentration', calculator)
 
 if concentration:
     col1, col2, col3 = st.columns(3)
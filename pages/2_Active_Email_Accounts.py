@@ -1,12 +1,21 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import DataLoader
-from utils.data_processor import DataProcessor
+from utils.data_loader import get_shared_loader
+from utils.warmup import start_warmup
+from utils.data_processor import get_shared_processor
+from utils.data_scope import current_data_scope, show_data_scope
+from utils.paged_table import PAGE_SIZES
+from utils.exporter import show_export, position_chunks
+from utils.export_jobs import show_background_export
 from utils.visualization import VisualizationHelper as vh
 from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
 
 st.set_page_config(page_title="Active Email Accounts", page_icon="📧", layout="wide")
 apply_nmb_branding()
+audit_page_view("Active Email Accounts")
+show_notification_badge()
 
 # NMB Logo
 show_nmb_logo()
@@ -19,69 +28,65 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Load data
+# Load data (taken on every run: reloading the data files replaces the shared loader)
 @st.cache_resource
 def load_data():
-    return DataLoader()
+    loader = get_shared_loader()
+    start_warmup()
+    return loader
 
-loader = load_data()
+load_data()
+loader = get_shared_loader()
 
 if loader.get_accounts_data() is None:
     st.error("⚠️ No account data available.")
     st.stop()
 
-processor = DataProcessor(loader)
-accounts_df = loader.get_accounts_data()
+data_scope = current_data_scope()
+show_data_scope(data_scope)  # stops the page when the user may see no data
+processor = get_shared_processor(loader, data_scope)
+accounts_df = processor.accounts_df
 
 # Filters in sidebar
 st.sidebar.markdown("### 🔍 Filters")
 
 # Branch filter
 if 'ACNTS_BRN_CODE' in accounts_df.columns:
-    branches = ['All'] + sorted(accounts_df['ACNTS_BRN_CODE'].dropna().unique().tolist())
+    branches = ['All'] + sorted(processor.get_filter_codes('ACNTS_BRN_CODE')[1].tolist())
     selected_branch = st.sidebar.selectbox("Branch", branches)
 else:
     selected_branch = 'All'
 
 # Product type filter
 if 'Product Name' in accounts_df.columns:
-    products = ['All'] + sorted(accounts_df['Product Name'].dropna().unique().tolist())
+    products = ['All'] + sorted(processor.get_filter_codes('Product Name')[1].tolist())
     selected_product = st.sidebar.selectbox("Product Type", products)
 else:
     selected_product = 'All'
 
 # Currency filter
 if 'ACNTS_CURR_CODE' in accounts_df.columns:
-    currencies = ['All'] + sorted(accounts_df['ACNTS_CURR_CODE'].dropna().unique().tolist())
+    currencies = ['All'] + sorted(processor.get_filter_codes('ACNTS_CURR_CODE')[1].tolist())
     selected_currency = st.sidebar.selectbox("Currency", currencies)
 else:
     selected_currency = 'All'
 
 # Account status filter
 if 'ACNTS_CREATION_STATUS' in accounts_df.columns:
-    statuses = ['All'] + sorted(accounts_df['ACNTS_CREATION_STATUS'].dropna().unique().tolist())
+    statuses = ['All'] + sorted(processor.get_filter_codes('ACNTS_CREATION_STATUS')[1].tolist())
     selected_status = st.sidebar.selectbox("Account Status", statuses)
 else:
     selected_status = 'All'
 
-# Apply filters
-filtered_df = accounts_df.copy()
-
-if selected_branch != 'All' and 'ACNTS_BRN_CODE' in filtered_df.columns:
-    filtered_df = filtered_df[filtered_df['ACNTS_BRN_CODE'] == selected_branch]
-
-if selected_product != 'All' and 'Product Name' in filtered_df.columns:
-    filtered_df = filtered_df[filtered_df['Product Name'] == selected_product]
-
-if selected_currency != 'All' and 'ACNTS_CURR_CODE' in filtered_df.columns:
-    filtered_df = filtered_df[filtered_df['ACNTS_CURR_CODE'] == selected_currency]
-
-if selected_status != 'All' and 'ACNTS_CREATION_STATUS' in filtered_df.columns:
-    filtered_df = filtered_df[filtered_df['ACNTS_CREATION_STATUS'] == selected_status]
-
-# Filter for active accounts only (not closed)
-if 'ACNTS_CLOSURE_DATE' in filtered_df.columns:
-    filtered_df = filtered_df[filtered_df['ACNTS_CLOSURE_DATE'].isna()]
+# Active (not closed) accounts for the filters: cached positions and per-value counts,
+# so paging and sorting reruns don't scan the accounts data again
+table_filters = {
+    'ACNTS_BRN_CODE': selected_branch,
+    'Product Name': selected_product,
+    'ACNTS_CURR_CODE': selected_currency,
+    'ACNTS_CREATION_STATUS': selected_status
+}
+active_rows = processor.select_table_rows(filters=table_filters, open_only=True)
 
 # Summary metrics
 st.markdown("### 📊 Summary Metrics")
@@ -91,15 +96,22 @@ col1, col2, col3, col4 = st.columns(4)
 with col1:
     st.metric(
         label="Total Active Accounts",
-        value=f"{len(filtered_df):,}"
+        value=f"{len(active_rows):,}"
     )
 
 with col2:
-    if 'ACNTS_CLIENT_NUM' in filtered_df.columns:
-        unique_customers = filtered_df['ACNTS_CLIENT_NUM'].nunique()
+    if 'ACNTS_CLIENT_NUM' in accounts_df.columns:
+        unique_customers = processor.count_unique_customers(
+            branch=selected_branch,
+            product=selected_product,
+            currency=selected_currency,
+            status=selected_status,
+            open_only=True
+        )
         st.metric(
             label="Unique Customers",
-            value=f"{unique_customers:,}"
+            value=f"{unique_customers:,}",
+            help="Exact for small selections, sketch estimate (±2%) for large ones"
         )
     else:
         st.metric(label="Unique Customers", value="N/A")
@@ -109,13 +121,13 @@ with col3:
     # For now, we show accounts that could have email
     st.metric(
         label="Accounts with Contact Info",
-        value=f"{len(filtered_df):,}",
+        value=f"{len(active_rows):,}",
         help="Accounts eligible for email communication"
     )
 
 with col4:
-    if 'ACNTS_CURR_CODE' in filtered_df.columns:
-        currencies_count = filtered_df['ACNTS_CURR_CODE'].nunique()
+    if 'ACNTS_CURR_CODE' in accounts_df.columns:
+        currencies_count = len(processor.count_table_values('ACNTS_CURR_CODE', table_filters, open_only=True))
         st.metric(
             label="Currencies",
             value=currencies_count
@@ -131,8 +143,8 @@ st.markdown("### 📈 Account Distribution")
 col1, col2 = st.columns(2)
 
 with col1:
-    if 'Product Name' in filtered_df.columns:
-        product_dist = filtered_df['Product Name'].value_counts().head(10).reset_index()
+    if 'Product Name' in accounts_df.columns:
+        product_dist = processor.count_table_values('Product Name', table_filters, open_only=True).head(10).reset_index()
         product_dist.columns = ['Product', 'Count']
         
         fig = vh.create_bar_chart(
@@ -148,8 +160,8 @@ with col1:
         st.info("Product distribution not available")
 
 with col2:
-    if 'ACNTS_CURR_CODE' in filtered_df.columns:
-        currency_dist = filtered_df['ACNTS_CURR_CODE'].value_counts().reset_index()
+    if 'ACNTS_CURR_CODE' in accounts_df.columns:
+        currency_dist = processor.count_table_values('ACNTS_CURR_CODE', table_filters, open_only=True).reset_index()
         currency_dist.columns = ['Currency', 'Count']
         
         fig = vh.create_pie_chart(
@@ -165,14 +177,20 @@ with col2:
 st.markdown("---")
 
 # Branch-level analysis
-if 'ACNTS_BRN_CODE' in filtered_df.columns:
+if 'ACNTS_BRN_CODE' in accounts_df.columns:
     st.markdown("### 🏢 Branch-Level Analysis")
     
-    branch_stats = filtered_df.groupby('ACNTS_BRN_CODE').agg({
-        'ACNTS_ACCOUNT_NUMBER': 'count',
-        'ACNTS_CLIENT_NUM': 'nunique'
-    }).reset_index()
-    branch_stats.columns = ['Branch', 'Total Accounts', 'Unique Customers']
+    branch_stats = processor.count_table_values('ACNTS_BRN_CODE', table_filters, open_only=True) \
+        .rename('Total Accounts').to_frame()
+    branch_stats['Unique Customers'] = processor.count_unique_customers_by(
+        'ACNTS_BRN_CODE',
+        branch=selected_branch,
+        product=selected_product,
+        currency=selected_currency,
+        status=selected_status,
+        open_only=True
+    ).reindex(branch_stats.index).fillna(0).astype(int)
+    branch_stats = branch_stats.rename_axis('Branch').reset_index()
     branch_stats = branch_stats.sort_values('Total Accounts', ascending=False).head(15)
     
     fig = vh.create_bar_chart(
@@ -191,27 +209,24 @@ st.markdown("### 📋 Account Details")
 
 # Select columns to display
 display_columns = []
-if 'ACNTS_ACCOUNT_NUMBER' in filtered_df.columns:
+if 'ACNTS_ACCOUNT_NUMBER' in accounts_df.columns:
     display_columns.append('ACNTS_ACCOUNT_NUMBER')
-if 'ACNTS_AC_NAME1' in filtered_df.columns:
+if 'ACNTS_AC_NAME1' in accounts_df.columns:
     display_columns.append('ACNTS_AC_NAME1')
-if 'Product Name' in filtered_df.columns:
+if 'Product Name' in accounts_df.columns:
     display_columns.append('Product Name')
-if 'ACNTS_CURR_CODE' in filtered_df.columns:
+if 'ACNTS_CURR_CODE' in accounts_df.columns:
     display_columns.append('ACNTS_CURR_CODE')
-if 'ACNTS_BRN_CODE' in filtered_df.columns:
+if 'ACNTS_BRN_CODE' in accounts_df.columns:
     display_columns.append('ACNTS_BRN_CODE')
-if 'ACNTS_OPENING_DATE' in filtered_df.columns:
+if 'ACNTS_OPENING_DATE' in accounts_df.columns:
     display_columns.append('ACNTS_OPENING_DATE')
-if 'ACNTS_LAST_TRAN_DATE' in filtered_df.columns:
+if 'ACNTS_LAST_TRAN_DATE' in accounts_df.columns:
     display_columns.append('ACNTS_LAST_TRAN_DATE')
-if 'ACNTS_CREATION_STATUS' in filtered_df.columns:
+if 'ACNTS_CREATION_STATUS' in accounts_df.columns:
     display_columns.append('ACNTS_CREATION_STATUS')
 
 if display_columns:
-    # Rename columns for better display
-    display_df = filtered_df[display_columns].copy()
-    
     column_mapping = {
         'ACNTS_ACCOUNT_NUMBER': 'Account Number',
         'ACNTS_AC_NAME1': 'Account Name',
@@ -223,44 +238,69 @@ if display_columns:
         'ACNTS_CREATION_STATUS': 'Status'
     }
     
-    display_df = display_df.rename(columns=column_mapping)
-    
     # Search functionality
-    search_term = st.text_input("🔍 Search accounts (by name or account number)")
+    search_term = st.text_input("🔍 Search accounts (by name, email, account or client number)")
     
-    if search_term:
-        mask = display_df.astype(str).apply(lambda x: x.str.contains(search_term, case=False, na=False)).any(axis=1)
-        display_df = display_df[mask]
+    # Sorting and pagination
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_by = st.selectbox("Sort by", [None] + display_columns,
+                               format_func=lambda c: 'Default order' if c is None else column_mapping.get(c, c))
+    with col2:
+        ascending = st.radio("Order", ['Ascending', 'Descending'], horizontal=True) == 'Ascending'
+    with col3:
+        page_size = st.selectbox("Records per page", PAGE_SIZES, index=1)
     
-    # Pagination
-    page_size = st.selectbox("Records per page", [25, 50, 100, 250], index=1)
-    total_pages = len(display_df) // page_size + (1 if len(display_df) % page_size > 0 else 0)
+    # Filtered, sorted positions are cached; only the requested page is materialized
+    positions = processor.select_table_rows(
+        filters=table_filters,
+        sort_by=sort_by,
+        ascending=ascending,
+        search=search_term,
+        open_only=True
+    )
+    total_pages = len(positions) // page_size + (1 if len(positions) % page_size > 0 else 0)
     
     if total_pages > 0:
         page = st.number_input("Page", min_value=1, max_value=total_pages, value=1)
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
+        table = processor.get_table_page(positions, display_columns, page, page_size)
         
         st.dataframe(
-            display_df.iloc[start_idx:end_idx],
+            table['rows'].rename(columns=column_mapping),
             use_container_width=True,
             hide_index=True
         )
         
-        st.caption(f"Showing {start_idx + 1} to {min(end_idx, len(display_df))} of {len(display_df):,} records")
+        st.caption(f"Showing {table['start'] + 1} to {table['stop']} of {table['total']:,} records")
     else:
         st.info("No records to display")
     
-    # Export button
+    # Export button (serialized only when clicked, cached per filter state and data version)
     st.markdown("### 📥 Export Data")
     
-    csv = display_df.to_csv(index=False)
-    st.download_button(
-        label="📄 Download CSV",
-        data=csv,
-        file_name=f"active_email_accounts_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv",
-        use_container_width=True
+    export_format = show_export(
+        "📄 Download",
+        f"active_email_accounts_{pd.Timestamp.now().strftime('%Y%m%d')}",
+        key=('active_email_accounts', selected_branch, selected_product, selected_currency, selected_status,
+             sort_by, ascending, search_term.strip().lower(), loader.get_data_version(['accounts']), data_scope),
+        chunks=lambda: position_chunks(processor.accounts_df, positions, display_columns, column_mapping)
+    )
+    
+    # Full-bank exports can run on the server instead of blocking this page
+    show_background_export(
+        'active_email_accounts',
+        'Active Email Accounts',
+        {
+            'filters': table_filters,
+            'sort_by': sort_by,
+            'ascending': ascending,
+            'search': search_term,
+            'options': {'open_only': True},
+            'columns': display_columns,
+            'rename': column_mapping
+        },
+        export_format,
+        len(positions)
     )
 else:
     st.warning("No data columns available for display")
@@ -1,13 +1,21 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import DataLoader
-from utils.data_processor import DataProcessor
+from utils.data_loader import get_shared_loader
+from utils.warmup import start_warmup
+from utils.data_processor import get_shared_processor
+from utils.data_scope import current_data_scope, show_data_scope
+from utils.exporter import show_export, position_chunks
+from utils.export_jobs import show_background_export
 from utils.visualization import VisualizationHelper as vh
 from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
 from datetime import datetime, timedelta
 
 st.set_page_config(page_title="Account Activity", page_icon="⚡", layout="wide")
 apply_nmb_branding()
+audit_page_view("Account Activity")
+show_notification_badge()
 
 # NMB Logo
 show_nmb_logo()
@@ -20,19 +28,24 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Load data
+# Load data (taken on every run: reloading the data files replaces the shared loader)
 @st.cache_resource
 def load_data():
-    return DataLoader()
+    loader = get_shared_loader()
+    start_warmup()
+    return loader
 
-loader = load_data()
+load_data()
+loader = get_shared_loader()
 
 if loader.get_accounts_data() is None:
     st.error("⚠️ No account data available.")
     st.stop()
 
-processor = DataProcessor(loader)
-accounts_df = loader.get_accounts_data()
+data_scope = current_data_scope()
+show_data_scope(data_scope)  # stops the page when the user may see no data
+processor = get_shared_processor(loader, data_scope)
+accounts_df = processor.accounts_df
 
 # Activity threshold control
 st.sidebar.markdown("### ⚙️ Activity Settings")
@@ -121,11 +134,15 @@ with col3:
 
 with col4:
     if 'ACNTS_CLIENT_NUM' in accounts_df.columns:
-        all_filtered = pd.concat([active_filtered, inactive_filtered])
-        unique_customers = all_filtered['ACNTS_CLIENT_NUM'].nunique() if len(all_filtered) > 0 else 0
+        unique_customers = processor.count_unique_customers(
+            branch=selected_branch,
+            product=selected_product,
+            currency=selected_currency
+        )
         st.metric(
             label="Unique Customers",
-            value=f"{unique_customers:,}"
+            value=f"{unique_customers:,}",
+            help="Exact for small selections, sketch estimate (±2%) for large ones"
         )
     else:
         st.metric(label="Unique Customers", value="N/A")
@@ -249,31 +266,56 @@ st.markdown("### 📋 Account Details")
 
 tab1, tab2 = st.tabs(["✅ Active Accounts", "⏸️ Inactive Accounts"])
 
-def show_account_list(df, title):
-    if len(df) == 0:
+def show_account_list(activity, title):
+    # Filtered, sorted positions are cached; only the requested page is materialized
+    sort_labels = {
+        None: 'Default order',
+        'ACNTS_LAST_TRAN_DATE': 'Most recent transaction',
+        'ACNTS_ACCOUNT_NUMBER': 'Account number',
+        'ACNTS_AC_NAME1': 'Account name'
+    }
+    sort_options = [c for c in sort_labels if c is None or c in accounts_df.columns]
+    col1, col2 = st.columns(2)
+    with col1:
+        search = st.text_input(f"🔍 Search {title.lower()} (name, email, account or client number)",
+                               key=f"search_{title}")
+    with col2:
+        sort_by = st.selectbox(f"Sort by ({title})", sort_options, format_func=sort_labels.get, key=f"sort_{title}")
+    
+    positions = processor.select_table_rows(
+        filters={
+            'ACNTS_BRN_CODE': selected_branch,
+            'Product Name': selected_product,
+            'ACNTS_CURR_CODE': selected_currency
+        },
+        sort_by=sort_by,
+        ascending=sort_by != 'ACNTS_LAST_TRAN_DATE',
+        search=search,
+        activity=activity,
+        days_threshold=activity_threshold
+    )
+    
+    if len(positions) == 0:
         st.info(f"No {title.lower()} found with current filters")
         return
     
     # Select columns
     display_columns = []
-    if 'ACNTS_ACCOUNT_NUMBER' in df.columns:
+    if 'ACNTS_ACCOUNT_NUMBER' in accounts_df.columns:
         display_columns.append('ACNTS_ACCOUNT_NUMBER')
-    if 'ACNTS_AC_NAME1' in df.columns:
+    if 'ACNTS_AC_NAME1' in accounts_df.columns:
         display_columns.append('ACNTS_AC_NAME1')
-    if 'Product Name' in df.columns:
+    if 'Product Name' in accounts_df.columns:
         display_columns.append('Product Name')
-    if 'ACNTS_BRN_CODE' in df.columns:
+    if 'ACNTS_BRN_CODE' in accounts_df.columns:
         display_columns.append('ACNTS_BRN_CODE')
-    if 'ACNTS_LAST_TRAN_DATE' in df.columns:
+    if 'ACNTS_LAST_TRAN_DATE' in accounts_df.columns:
         display_columns.append('ACNTS_LAST_TRAN_DATE')
-    if 'days_since_last_txn' in df.columns:
         display_columns.append('days_since_last_txn')
-    if 'ACNTS_CURR_CODE' in df.columns:
+    if 'ACNTS_CURR_CODE' in accounts_df.columns:
         display_columns.append('ACNTS_CURR_CODE')
     
     if display_columns:
-        display_df = df[display_columns].copy()
-        
         column_mapping = {
             'ACNTS_ACCOUNT_NUMBER': 'Account Number',
             'ACNTS_AC_NAME1': 'Account Name',
@@ -284,46 +326,58 @@ def show_account_list(df, title):
             'ACNTS_CURR_CODE': 'Currency'
         }
         
-        display_df = display_df.rename(columns=column_mapping)
-        
-        # Search
-        search = st.text_input(f"🔍 Search {title.lower()}", key=f"search_{title}")
-        if search:
-            mask = display_df.astype(str).apply(lambda x: x.str.contains(search, case=False, na=False)).any(axis=1)
-            display_df = display_df[mask]
-        
         # Pagination
         page_size = 50
-        total_pages = len(display_df) // page_size + (1 if len(display_df) % page_size > 0 else 0)
+        total_pages = len(positions) // page_size + (1 if len(positions) % page_size > 0 else 0)
         
-        if total_pages > 0:
-            page = st.number_input(f"Page ({title})", min_value=1, max_value=total_pages, value=1, key=f"page_{title}")
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
-            
-            st.dataframe(
-                display_df.iloc[start_idx:end_idx],
-                use_container_width=True,
-                hide_index=True
-            )
-            
-            st.caption(f"Showing {start_idx + 1} to {min(end_idx, len(display_df))} of {len(display_df):,} records")
+        page = st.number_input(f"Page ({title})", min_value=1, max_value=total_pages, value=1, key=f"page_{title}")
+        table = processor.get_table_page(positions, display_columns, page, page_size)
+        
+        st.dataframe(
+            table['rows'].rename(columns=column_mapping),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        st.caption(f"Showing {table['start'] + 1} to {table['stop']} of {table['total']:,} records")
+        
+        # Export (serialized only when clicked, cached per filter state, day and data version)
+        today = pd.Timestamp.now().strftime('%Y%m%d')
+        export_format = show_export(
+            f"📄 Download {title}",
+            f"{title.lower().replace(' ', '_')}_{today}",
+            key=(activity, activity_threshold, selected_branch, selected_product, selected_currency, sort_by,
+                 (search or '').strip().lower(), today, loader.get_data_version(['accounts']), data_scope),
+            chunks=lambda: position_chunks(processor.accounts_df, positions, display_columns, column_mapping),
+            widget_key=f"export_{title}"
+        )
         
-        # Export
-        csv = display_df.to_csv(index=False)
-        st.download_button(
-            label=f"📄 Download {title} CSV",
-            data=csv,
-            file_name=f"{title.lower().replace(' ', '_')}_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv",
-            key=f"download_{title}"
+        # Full-bank exports can run on the server instead of blocking this page
+        show_background_export(
+            title.lower().replace(' ', '_'),
+            'Account Activity',
+            {
+                'filters': {
+                    'ACNTS_BRN_CODE': selected_branch,
+                    'Product Name': selected_product,
+                    'ACNTS_CURR_CODE': selected_currency
+                },
+                'sort_by': sort_by,
+                'ascending': sort_by != 'ACNTS_LAST_TRAN_DATE',
+                'search': search,
+                'options': {'activity': activity, 'days_threshold': activity_threshold},
+                'columns': display_columns,
+                'rename': column_mapping
+            },
+            export_format,
+            len(positions)
         )
 
 with tab1:
-    show_account_list(active_filtered, "Active Accounts")
+    show_account_list('active', "Active Accounts")
 
 with tab2:
-    show_account_list(inactive_filtered, "Inactive Accounts")
+    show_account_list('inactive', "Inactive Accounts")
 
 # Footer
 show_nmb_footer()
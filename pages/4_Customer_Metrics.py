@@ -1,14 +1,21 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import DataLoader
-from utils.data_processor import DataProcessor
-from utils.metrics_calculator import MetricsCalculator
+from utils.data_loader import get_shared_loader
+from utils.warmup import start_warmup
+from utils.data_processor import get_shared_processor
+from utils.data_scope import current_data_scope, show_data_scope
+from utils.metrics_calculator import get_shared_calculator
+from utils.kpis import get_kpi, get_kpis
 from utils.visualization import VisualizationHelper as vh
 from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
 from datetime import datetime, timedelta
 
 st.set_page_config(page_title="Customer Metrics", page_icon="👥", layout="wide")
 apply_nmb_branding()
+audit_page_view("Customer Metrics")
+show_notification_badge()
 
 # NMB Logo
 show_nmb_logo()
@@ -21,42 +28,37 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Load data
+# Load data (taken on every run: reloading the data files replaces the shared loader)
 @st.cache_resource
 def load_data():
-    return DataLoader()
+    loader = get_shared_loader()
+    start_warmup()
+    return loader
 
-@st.cache_data
-def get_cached_churn_data(_loader):
-    """Cache expensive churn calculation"""
-    processor = DataProcessor(_loader)
-    return processor.calculate_monthly_churn_rate()
-
-@st.cache_data
-def get_cached_basic_metrics(_loader):
-    """Cache basic customer metrics"""
-    processor = DataProcessor(_loader)
-    return {
-        'total_customers': processor.get_unique_customer_count(),
-        'avg_products': processor.get_avg_products_per_customer()
-    }
-
-loader = load_data()
+load_data()
+loader = get_shared_loader()
 
 if loader.get_accounts_data() is None:
     st.error("⚠️ No account data available.")
     st.stop()
 
 # Create processor and calculator instances
-processor = DataProcessor(loader)
-calculator = MetricsCalculator(processor)
+data_scope = current_data_scope()
+show_data_scope(data_scope)  # stops the page when the user may see no data
+processor = get_shared_processor(loader, data_scope)
+calculator = get_shared_calculator(loader, data_scope)
 
-# Get cached metrics
+# Get shared KPIs (computed once per data version across all sessions)
 with st.spinner('Loading customer metrics...'):
-    basic_metrics = get_cached_basic_metrics(loader)
+    basic_metrics = get_kpis(
+        ['total_customers', 'avg_products_per_customer', 'open_customers', 'transacting_customers',
+         'customer_tenure_years'],
+        calculator,
+        active_since=(pd.Timestamp.now() - pd.DateOffset(months=3)).strftime('%Y-%m')
+    )
     total_customers = basic_metrics['total_customers']
-    avg_products = basic_metrics['avg_products']
-    churn_data = get_cached_churn_data(loader)
+    avg_products = basic_metrics['avg_products_per_customer']
+    churn_data = get_kpi('monthly_churn', calculator)
 
 # Summary metrics
 st.markdown("### 📊 Key Customer Metrics")
@@ -93,13 +95,29 @@ with col3:
 
 with col4:
     # Customer lifetime value (in years)
-    clv = calculator.calculate_customer_lifetime_value()
+    clv = basic_metrics['customer_tenure_years']
     st.metric(
         label="Avg Customer Tenure",
         value=f"{clv:.1f} years",
         help="Average customer relationship duration"
     )
 
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    st.metric(
+        label="Customers with Open Accounts",
+        value=f"{basic_metrics['open_customers']:,}",
+        help="Unique customers holding at least one open account (sketch estimate)"
+    )
+
+with col2:
+    st.metric(
+        label="Transacting Customers (3 Months)",
+        value=f"{basic_metrics['transacting_customers']:,}",
+        help="Unique customers with an open account transacting in the last three calendar months (sketch estimate)"
+    )
+
 st.markdown("---")
 
 # Churn analysis
@@ -160,16 +178,15 @@ st.markdown("---")
 # Product holding analysis
 st.markdown("### 🎯 Product Holding Analysis")
 
-accounts_df = loader.get_accounts_data()
+products_per_customer = get_kpi('products_per_customer', calculator)
 
-if 'ACNTS_CLIENT_NUM' in accounts_df.columns and 'ACNTS_PROD_CODE' in accounts_df.columns:
-    # Calculate products per customer distribution
-    products_per_customer = accounts_df.groupby('ACNTS_CLIENT_NUM')['ACNTS_PROD_CODE'].nunique().reset_index()
-    products_per_customer.columns = ['customer', 'product_count']
-    
-    # Create distribution
-    distribution = products_per_customer['product_count'].value_counts().sort_index().reset_index()
-    distribution.columns = ['Number of Products', 'Number of Customers']
+if len(products_per_customer) > 0:
+    # Distribution of products per customer
+    distribution = products_per_customer.rename(columns={
+        'product_count': 'Number of Products',
+        'customers': 'Number of Customers'
+    })
+    customers_by_count = products_per_customer.set_index('product_count')['customers']
     
     col1, col2 = st.columns(2)
     
@@ -195,10 +212,10 @@ if 'ACNTS_CLIENT_NUM' in accounts_df.columns and 'ACNTS_PROD_CODE' in accounts_d
                 'Max Products Held'
             ],
             'Value': [
-                f"{len(products_per_customer[products_per_customer['product_count'] == 1]):,}",
-                f"{len(products_per_customer[products_per_customer['product_count'] == 2]):,}",
-                f"{len(products_per_customer[products_per_customer['product_count'] >= 3]):,}",
-                f"{products_per_customer['product_count'].max()}"
+                f"{customers_by_count.get(1, 0):,}",
+                f"{customers_by_count.get(2, 0):,}",
+                f"{customers_by_count[customers_by_count.index >= 3].sum():,}",
+                f"{customers_by_count.index.max()}"
             ]
         })
         
@@ -211,33 +228,17 @@ st.markdown("---")
 # Customer segmentation
 st.markdown("### 🎯 Customer Segmentation")
 
-if 'ACNTS_CLIENT_NUM' in accounts_df.columns:
-    # Segment by number of accounts
-    accounts_per_customer = accounts_df.groupby('ACNTS_CLIENT_NUM').size().reset_index(name='account_count')
-    
-    # Create segments
-    def segment_customer(count):
-        if count == 1:
-            return 'Single Account'
-        elif count <= 3:
-            return '2-3 Accounts'
-        elif count <= 5:
-            return '4-5 Accounts'
-        else:
-            return '6+ Accounts'
-    
-    accounts_per_customer['segment'] = accounts_per_customer['account_count'].apply(segment_customer)
-    
-    segment_dist = accounts_per_customer['segment'].value_counts().reset_index()
-    segment_dist.columns = ['Segment', 'Customer Count']
-    
-    # Ensure proper order
-    segment_order = ['Single Account', '2-3 Accounts', '4-5 Accounts', '6+ Accounts']
-    segment_dist['Segment'] = pd.Categorical(segment_dist['Segment'], categories=segment_order, ordered=True)
-    segment_dist = segment_dist.sort_values('Segment')
+customer_segments = get_kpi('customer_segments', calculator)
+
+if len(customer_segments) > 0:
+    # Segments are already in display order
+    segment_dist = customer_segments[['segment', 'customers']].rename(columns={
+        'segment': 'Segment',
+        'customers': 'Customer Count'
+    })
     
     fig = vh.create_pie_chart(
-        segment_dist,
+        segment_dist[segment_dist['Customer Count'] > 0],
         'Segment',
         'Customer Count',
         'Customer Segmentation by Number of Accounts'
@@ -246,13 +247,10 @@ if 'ACNTS_CLIENT_NUM' in accounts_df.columns:
     
     # Detailed segment analysis
     with st.expander("📋 View Detailed Segment Analysis"):
-        segment_analysis = accounts_per_customer.groupby('segment').agg({
-            'account_count': ['count', 'mean', 'min', 'max']
-        }).reset_index()
-        
+        segment_analysis = customer_segments[
+            ['segment', 'customers', 'avg_accounts', 'min_accounts', 'max_accounts']
+        ]
         segment_analysis.columns = ['Segment', 'Number of Customers', 'Avg Accounts', 'Min Accounts', 'Max Accounts']
-        segment_analysis['Segment'] = pd.Categorical(segment_analysis['Segment'], categories=segment_order, ordered=True)
-        segment_analysis = segment_analysis.sort_values('Segment')
         
         st.dataframe(segment_analysis, use_container_width=True, hide_index=True)
 
@@ -261,7 +259,7 @@ st.markdown("---")
 # Product penetration
 st.markdown("### 📊 Product Penetration Rates")
 
-product_penetration = calculator.calculate_product_penetration()
+product_penetration = get_kpi('product_penetration', calculator)
 
 if len(product_penetration) > 0:
     # Show top 15 products
@@ -299,7 +297,7 @@ st.markdown("---")
 # Account concentration
 st.markdown("### 🎯 Customer Concentration Metrics")
 
-concentration = calculator.calculate_account_concentration()
+concentration = get_kpi('account_concentration', calculator)
 
 if concentration:
     col1, col2 = st.columns(2)
@@ -336,6 +334,65 @@ if concentration:
             'Account Concentration Distribution'
         )
         st.plotly_chart(fig, use_container_width=True)
+    
+    # Full distribution: Lorenz curve, Gini and HHI
+    concentration_basis = st.radio(
+        "Concentration basis",
+        ['Accounts', 'Balances'],
+        horizontal=True,
+        help="Distribution of accounts or of total balances across customers"
+    )
+    value = 'balance' if concentration_basis == 'Balances' else 'accounts'
+    distribution = get_kpi('balance_concentration' if value == 'balance' else 'customer_concentration', calculator)
+    
+    if distribution is not None:
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric(
+                label="Gini Coefficient",
+                value=f"{distribution.gini():.3f}",
+                help="0 = evenly spread across customers, 1 = held by a single customer"
+            )
+        
+        with col2:
+            st.metric(
+                label="HHI",
+                value=f"{distribution.hhi():,.1f}",
+                help="Herfindahl-Hirschman index (0-10,000)"
+            )
+        
+        with col3:
+            top_pct = st.number_input("Top % of customers", min_value=1, max_value=100, value=5, step=1)
+            _, _, top_share = distribution.top_share(top_pct / 100)
+            st.metric(label=f"Top {top_pct}% Share", value=f"{top_share:.1f}%")
+        
+        lorenz = distribution.lorenz_curve()
+        fig = vh.create_line_chart(
+            lorenz,
+            'population_share',
+            'value_share',
+            f'Lorenz Curve ({concentration_basis})',
+            show_markers=False
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    branch_concentration = get_kpi('branch_concentration', calculator, concentration_value=value)
+    if len(branch_concentration) > 0:
+        with st.expander("🏢 View Concentration by Branch"):
+            st.dataframe(
+                branch_concentration.sort_values('gini', ascending=False).rename(columns={
+                    'branch': 'Branch',
+                    'customers': 'Customers',
+                    'total': 'Total',
+                    'gini': 'Gini',
+                    'hhi': 'HHI',
+                    'top_10_pct_share': 'Top 10% Share (%)',
+                    'top_20_pct_share': 'Top 20% Share (%)'
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
 
 # Footer
 show_nmb_footer()
@@ -1,13 +1,21 @@
 import streamlit as st
 import pandas as pd
-from utils.data_loader import DataLoader
-from utils.data_processor import DataProcessor
-from utils.metrics_calculator import MetricsCalculator
+from utils.data_loader import get_shared_loader
+from utils.warmup import start_warmup
+from utils.data_processor import get_shared_processor
+from utils.data_scope import current_data_scope, show_data_scope
+from utils.metrics_calculator import get_shared_calculator
+from utils.kpis import get_kpi
+from utils.exporter import show_export, frame_chunks
 from utils.visualization import VisualizationHelper as vh
 from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
 
 st.set_page_config(page_title="Quarterly Performance", page_icon="📅", layout="wide")
 apply_nmb_branding()
+audit_page_view("Quarterly Performance")
+show_notification_badge()
 
 # NMB Logo
 show_nmb_logo()
@@ -20,19 +28,24 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Load data
+# Load data (taken on every run: reloading the data files replaces the shared loader)
 @st.cache_resource
 def load_data():
-    return DataLoader()
+    loader = get_shared_loader()
+    start_warmup()
+    return loader
 
-loader = load_data()
+load_data()
+loader = get_shared_loader()
 
 if loader.get_accounts_data() is None:
     st.error("⚠️ No account data available.")
     st.stop()
 
-processor = DataProcessor(loader)
-calculator = MetricsCalculator(processor)
+data_scope = current_data_scope()
+show_data_scope(data_scope)  # stops the page when the user may see no data
+processor = get_shared_processor(loader, data_scope)
+calculator = get_shared_calculator(loader, data_scope)
 
 # Year selection
 st.sidebar.markdown("### ⚙️ Settings")
@@ -188,12 +201,12 @@ st.markdown("---")
 # Product-wise quarterly analysis
 st.markdown("### 📊 Quarterly Performance by Product Type")
 
-accounts_df = loader.get_accounts_data()
+accounts_df = processor.accounts_df
 
 if 'Product Name' in accounts_df.columns and 'ACNTS_OPENING_DATE' in accounts_df.columns:
     # Filter accounts for the selected year
-    accounts_df['opening_year'] = pd.to_datetime(accounts_df['ACNTS_OPENING_DATE']).dt.year
-    year_accounts = accounts_df[accounts_df['opening_year'] <= selected_year].copy()
+    opening_year = pd.to_datetime(accounts_df['ACNTS_OPENING_DATE']).dt.year
+    year_accounts = accounts_df[opening_year <= selected_year].copy()
     
     # Filter out closed accounts
     if 'ACNTS_CLOSURE_DATE' in year_accounts.columns:
@@ -251,53 +264,38 @@ else:
 st.markdown("---")
 
 # Branch-wise quarterly performance
-if 'ACNTS_BRN_CODE' in accounts_df.columns and 'ACNTS_LAST_TRAN_DATE' in accounts_df.columns:
+group_kpis = get_kpi('group_kpi_matrix', calculator, year=selected_year)
+
+if group_kpis is not None and 'ACNTS_BRN_CODE' in group_kpis.dims and 'Q1' in group_kpis.period_labels:
     st.markdown("### 🏢 Quarterly Performance by Branch")
     
-    # Filter for funded accounts (those with transactions)
-    funded_accounts = accounts_df[accounts_df['ACNTS_LAST_TRAN_DATE'].notna()].copy()
+    quarters = group_kpis.period_labels
+    branch_matrix = group_kpis.get('ACNTS_BRN_CODE')
     
-    branch_quarterly = []
-    for q in range(1, 4):
-        q_start = pd.Timestamp(f'{selected_year}-{(q-1)*3+1:02d}-01')
-        q_end = pd.Timestamp(f'{selected_year}-{q*3:02d}-01') + pd.offsets.MonthEnd(0)
-        
-        # Count accounts with transactions in this quarter
-        active_in_q = funded_accounts[
-            (funded_accounts['ACNTS_LAST_TRAN_DATE'] >= q_start) &
-            (funded_accounts['ACNTS_LAST_TRAN_DATE'] <= q_end)
-        ]
-        
-        branch_counts = active_in_q['ACNTS_BRN_CODE'].value_counts().head(10)
-        
-        for branch, count in branch_counts.items():
-            branch_quarterly.append({
-                'Quarter': f'Q{q}',
-                'Branch': str(branch),
-                'Accounts': count
-            })
+    # Top 10 branches by funded accounts across the quarters
+    branch_totals = branch_matrix[quarters].sum(axis=1)
+    branch_pivot = branch_matrix.loc[branch_totals[branch_totals > 0].nlargest(10).index, quarters]
+    branch_pivot = branch_pivot.rename_axis('Branch').reset_index()
+    branch_pivot['Branch'] = branch_pivot['Branch'].astype(str)
     
-    if branch_quarterly:
-        branch_df = pd.DataFrame(branch_quarterly)
-        
-        # Get top 10 branches
-        top_branches = branch_df.groupby('Branch')['Accounts'].sum().nlargest(10).index
-        branch_df_filtered = branch_df[branch_df['Branch'].isin(top_branches)]
-        
-        # Pivot
-        branch_pivot = branch_df_filtered.pivot(index='Branch', columns='Quarter', values='Accounts').fillna(0)
-        branch_pivot = branch_pivot.reset_index()
+    if len(branch_pivot) > 0:
+        fig = vh.create_stacked_bar_chart(
+            branch_pivot,
+            'Branch',
+            quarters,
+            f'Top 10 Branches: Quarterly Funded Accounts ({selected_year})'
+        )
+        st.plotly_chart(fig, use_container_width=True)
         
-        if len(branch_pivot) > 0:
-            quarters = [col for col in branch_pivot.columns if col.startswith('Q')]
+        # League table with rankings per quarter
+        with st.expander("🏆 View Branch League Table"):
+            league = group_kpis.get('ACNTS_BRN_CODE', with_ranks=True)
+            league = league[quarters + [f'rank_{q}' for q in quarters]].copy()
+            league['Total Funded'] = league[quarters].sum(axis=1)
+            league = league.sort_values('Total Funded', ascending=False).rename_axis('Branch').reset_index()
+            league = league.rename(columns={f'rank_{q}': f'{q} Rank' for q in quarters})
             
-            fig = vh.create_stacked_bar_chart(
-                branch_pivot,
-                'Branch',
-                quarters,
-                f'Top 10 Branches: Quarterly Funded Accounts ({selected_year})'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(league, use_container_width=True, hide_index=True)
 
 st.markdown("---")
 
@@ -305,12 +303,11 @@ st.markdown("---")
 st.markdown("### 📥 Export Quarterly Data")
 
 if len(quarterly_data) > 0:
-    csv = quarterly_data.to_csv(index=False)
-    st.download_button(
-        label="📄 Download Quarterly Performance CSV",
-        data=csv,
-        file_name=f"quarterly_performance_{selected_year}_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv"
+    show_export(
+        "📄 Download Quarterly Performance",
+        f"quarterly_performance_{selected_year}_{pd.Timestamp.now().strftime('%Y%m%d')}",
+        key=('quarterly_performance', selected_year, loader.get_data_version(['accounts']), data_scope),
+        chunks=lambda: frame_chunks(quarterly_data)
     )
 
 # Footer
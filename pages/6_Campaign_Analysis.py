@@ -1,14 +1,22 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from utils.data_loader import DataLoader
-from utils.data_processor import DataProcessor
+from utils.data_loader import get_shared_loader
+from utils.warmup import start_warmup
+from utils.data_processor import get_shared_processor
+from utils.data_scope import current_data_scope, show_data_scope
+from utils.metrics_calculator import get_shared_calculator
+from utils.kpis import get_kpi
+from utils.exporter import show_export, frame_chunks
 from utils.visualization import VisualizationHelper as vh
 from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
 from datetime import datetime, timedelta
 
 st.set_page_config(page_title="Campaign Analysis", page_icon="🎯", layout="wide")
 apply_nmb_branding()
+audit_page_view("Campaign Analysis")
+show_notification_badge()
 
 # NMB Logo
 show_nmb_logo()
@@ -21,19 +29,25 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Load data
+# Load data (taken on every run: reloading the data files replaces the shared loader)
 @st.cache_resource
 def load_data():
-    return DataLoader()
+    loader = get_shared_loader()
+    start_warmup()
+    return loader
 
-loader = load_data()
+load_data()
+loader = get_shared_loader()
 
 if loader.get_accounts_data() is None:
     st.error("⚠️ No account data available.")
     st.stop()
 
-processor = DataProcessor(loader)
-accounts_df = loader.get_accounts_data()
+data_scope = current_data_scope()
+show_data_scope(data_scope)  # stops the page when the user may see no data
+processor = get_shared_processor(loader, data_scope)
+calculator = get_shared_calculator(loader, data_scope)
+accounts_df = processor.accounts_df
 gl_df = loader.get_gl_data()
 
 # Campaign settings
@@ -85,22 +99,39 @@ if 'ACNTS_CURR_CODE' in accounts_df.columns:
 else:
     selected_currency = 'All'
 
+# Reporting currency for GL balances (requires FX rates in data/fx_rates.csv)
+converter = processor.get_currency_converter()
+if converter.has_rates():
+    reporting_currency = st.sidebar.selectbox("Reporting Currency", ['As Booked'] + converter.currencies)
+    reporting_currency = None if reporting_currency == 'As Booked' else reporting_currency
+else:
+    reporting_currency = None
+
 # Check for GL transaction data
 has_gl_data = gl_df is not None and len(gl_df) > 0
 
-# Get campaign revenue data
-campaign_revenue = processor.get_campaign_revenue_analysis(
+# Get revenue series from baseline start through campaign end
+revenue_series = processor.get_campaign_revenue_analysis(
     campaign_start=campaign_start.strftime('%Y-%m-%d'),
-    campaign_end=campaign_end.strftime('%Y-%m-%d')
+    campaign_end=campaign_end.strftime('%Y-%m-%d'),
+    baseline_start=baseline_start.strftime('%Y-%m-%d'),
+    branch=selected_branch,
+    currency=selected_currency,
+    measure='non_funded_income'  # the campaign targets non-funded income; 'revenue' includes interest income
 )
+campaign_revenue = revenue_series[revenue_series['period_type'] == 'Campaign'].reset_index(drop=True)
+
+# Revenue trends need dated GL balance extracts covering the campaign
+has_revenue_history = processor.has_revenue_history() and campaign_revenue['non_funded_income'].notna().any()
 
 # Information about data availability
-if not has_gl_data:
+if not has_revenue_history:
     st.warning("""
-    ⚠️ **Note:** GL transaction data is not available. 
+    ⚠️ **Note:** Dated GL balance extracts are not available for the campaign period. 
     
     This dashboard is designed to analyze non-funded income revenue from GL transactions. 
-    To see actual campaign performance, please ensure GL transaction data is loaded.
+    To see actual campaign performance, load monthly revenue_gls extracts with a PERIOD
+    column (or a date in the file name) into the data folder.
     
     **Required data includes:**
     - Fee income (account maintenance, transaction fees)
@@ -118,8 +149,8 @@ col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     # Total campaign revenue
-    if len(campaign_revenue) > 0 and has_gl_data:
-        total_revenue = campaign_revenue['revenue'].sum()
+    if len(campaign_revenue) > 0 and has_revenue_history:
+        total_revenue = campaign_revenue['non_funded_income'].sum()
         st.metric(
             label="Total Campaign Revenue",
             value=f"${total_revenue:,.2f}",
@@ -134,12 +165,12 @@ with col1:
 
 with col2:
     # Average monthly revenue
-    if len(campaign_revenue) > 0 and has_gl_data:
-        avg_monthly = campaign_revenue['revenue'].mean()
+    if len(campaign_revenue) > 0 and has_revenue_history:
+        avg_monthly = campaign_revenue['non_funded_income'].mean()
         st.metric(
             label="Avg Monthly Revenue",
             value=f"${avg_monthly:,.2f}",
-            help="Average monthly revenue during campaign"
+            help="Average monthly non-funded income during campaign"
         )
     else:
         st.metric(
@@ -149,7 +180,7 @@ with col2:
 
 with col3:
     # Month-on-month growth
-    if len(campaign_revenue) > 1 and has_gl_data:
+    if len(campaign_revenue) > 1 and has_revenue_history:
         latest_mom = campaign_revenue.iloc[-1]['mom_change']
         if pd.notna(latest_mom):
             st.metric(
@@ -164,12 +195,12 @@ with col3:
 
 with col4:
     # Best performing month
-    if len(campaign_revenue) > 0 and has_gl_data:
-        best_month = campaign_revenue.loc[campaign_revenue['revenue'].idxmax()]
+    if len(campaign_revenue) > 0 and has_revenue_history:
+        best_month = campaign_revenue.loc[campaign_revenue['non_funded_income'].idxmax()]
         st.metric(
             label="Best Month",
             value=best_month['month_name'],
-            help=f"Revenue: ${best_month['revenue']:,.2f}"
+            help=f"Non-funded income: ${best_month['non_funded_income']:,.2f}"
         )
     else:
         st.metric(label="Best Month", value="No Data")
@@ -180,38 +211,10 @@ st.markdown("---")
 st.markdown("### 📈 Revenue Trend Analysis")
 
 if len(campaign_revenue) > 0:
-    # Extend data to include baseline months
-    baseline_months = pd.period_range(
-        start=baseline_start.strftime('%Y-%m'),
-        end=campaign_start.strftime('%Y-%m'),
-        freq='M'
-    )
-    
-    # Create extended dataset
-    extended_revenue = campaign_revenue.copy()
-    
-    # Add baseline months if not already present
-    for month in baseline_months:
-        if month.to_timestamp() not in extended_revenue['month'].values:
-            extended_revenue = pd.concat([
-                pd.DataFrame({
-                    'month': [month.to_timestamp()],
-                    'month_name': [month.strftime('%B %Y')],
-                    'revenue': [0 if not has_gl_data else np.nan],
-                    'non_funded_income': [0 if not has_gl_data else np.nan],
-                    'mom_change': [0],
-                    'mom_change_abs': [0]
-                }),
-                extended_revenue
-            ])
-    
-    extended_revenue = extended_revenue.sort_values('month').reset_index(drop=True)
+    # Baseline and campaign months come back as one series with MoM deltas computed
+    extended_revenue = revenue_series.copy()
     extended_revenue['month_str'] = extended_revenue['month'].dt.strftime('%b %Y')
     
-    # Recalculate MoM changes
-    extended_revenue['mom_change'] = extended_revenue['revenue'].pct_change() * 100
-    extended_revenue['mom_change_abs'] = extended_revenue['revenue'].diff()
-    
     col1, col2 = st.columns([2, 1])
     
     with col1:
@@ -219,8 +222,8 @@ if len(campaign_revenue) > 0:
         fig = vh.create_line_chart(
             extended_revenue,
             'month_str',
-            'revenue',
-            'Monthly Revenue Trend (Baseline + Campaign Period)',
+            'non_funded_income',
+            'Monthly Non-Funded Income Trend (Baseline + Campaign Period)',
             color='#003366',
             show_markers=True
         )
@@ -229,11 +232,8 @@ if len(campaign_revenue) > 0:
     with col2:
         st.markdown("#### 📊 Campaign Statistics")
         
-        if has_gl_data and extended_revenue['revenue'].sum() > 0:
-            campaign_only = extended_revenue[
-                (extended_revenue['month'] >= pd.Timestamp(campaign_start)) &
-                (extended_revenue['month'] <= pd.Timestamp(campaign_end))
-            ]
+        if has_revenue_history and extended_revenue['non_funded_income'].sum() > 0:
+            campaign_only = extended_revenue[extended_revenue['period_type'] == 'Campaign']
             
             if len(campaign_only) > 0:
                 stats_df = pd.DataFrame({
@@ -245,10 +245,10 @@ if len(campaign_revenue) > 0:
                         'Avg MoM Growth'
                     ],
                     'Value': [
-                        f"${campaign_only['revenue'].sum():,.2f}",
-                        f"${campaign_only['revenue'].mean():,.2f}",
-                        f"${campaign_only['revenue'].max():,.2f}",
-                        f"${campaign_only['revenue'].min():,.2f}",
+                        f"${campaign_only['non_funded_income'].sum():,.2f}",
+                        f"${campaign_only['non_funded_income'].mean():,.2f}",
+                        f"${campaign_only['non_funded_income'].max():,.2f}",
+                        f"${campaign_only['non_funded_income'].min():,.2f}",
                         f"{campaign_only['mom_change'].mean():.2f}%"
                     ]
                 })
@@ -270,7 +270,7 @@ if len(campaign_revenue) > 0:
             extended_revenue[extended_revenue['mom_change'].notna()],
             'month_str',
             'mom_change',
-            'Month-on-Month Revenue Change (%)',
+            'Month-on-Month Non-Funded Income Change (%)',
             color='#FFD700'
         )
         st.plotly_chart(fig, use_container_width=True)
@@ -281,11 +281,29 @@ if len(campaign_revenue) > 0:
             extended_revenue[extended_revenue['mom_change_abs'].notna()],
             'month_str',
             'mom_change_abs',
-            'Month-on-Month Revenue Change (Absolute)',
+            'Month-on-Month Non-Funded Income Change (Absolute)',
             color='#003366'
         )
         st.plotly_chart(fig, use_container_width=True)
     
+    # Monthly income split by income type
+    if has_revenue_history:
+        income_split = processor.get_revenue_by_income_type(
+            baseline_start, campaign_end, branch=selected_branch, currency=selected_currency
+        )
+        
+        if len(income_split) > 0:
+            income_split = income_split.reset_index()
+            income_split['month_str'] = income_split['month'].dt.strftime('%b %Y')
+            
+            fig = vh.create_stacked_bar_chart(
+                income_split,
+                'month_str',
+                [col for col in income_split.columns if col not in ('month', 'month_str')],
+                'Monthly Income by Income Type'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    
 else:
     st.info("""
     Revenue trend analysis requires GL transaction data. 
@@ -302,30 +320,49 @@ st.markdown("---")
 # Revenue breakdown by income type
 st.markdown("### 💰 Non-Funded Income Breakdown")
 
-if has_gl_data and gl_df is not None:
-    # Filter GL data for income categories
-    income_categories = gl_df[gl_df['Gl Type'].isin(['I', 'Income'])] if 'Gl Type' in gl_df.columns else pd.DataFrame()
+income_breakdown = processor.get_income_breakdown(
+    level='L2',
+    branch=selected_branch,
+    currency=selected_currency,
+    reporting_currency=reporting_currency
+) if has_gl_data else pd.DataFrame()
+
+if len(income_breakdown) > 0:
+    income_breakdown = income_breakdown[income_breakdown['balance'] != 0]
     
-    if len(income_categories) > 0:
-        # Categorize income types
-        income_summary = income_categories.groupby('Gl Name').size().reset_index(name='Count')
-        income_summary = income_summary.nlargest(10, 'Count')
+    if len(income_breakdown) > 0:
+        # Subtree totals per L2 income line (LCY/FCY split of each category)
+        income_summary = income_breakdown.nlargest(10, 'balance')
         
         fig = vh.create_pie_chart(
             income_summary,
             'Gl Name',
-            'Count',
-            'Top 10 Non-Funded Income Categories'
+            'balance',
+            'Top 10 Non-Funded Income Lines by Balance'
         )
         st.plotly_chart(fig, use_container_width=True)
         
-        # Detailed breakdown
-        with st.expander("📋 View All Income Categories"):
-            full_summary = income_categories.groupby('Gl Name').size().reset_index(name='GL Accounts')
-            full_summary = full_summary.sort_values('GL Accounts', ascending=False)
-            st.dataframe(full_summary, use_container_width=True, hide_index=True)
+        # Detailed breakdown down to individual GL accounts
+        with st.expander("📋 View All Income GL Accounts"):
+            full_summary = processor.get_income_breakdown(
+                level='L3',
+                branch=selected_branch,
+                currency=selected_currency,
+                reporting_currency=reporting_currency
+            )
+            full_summary = full_summary[full_summary['balance'] != 0].rename(columns={
+                'gl_code': 'GL Account',
+                'Gl Name': 'GL Name',
+                'Gl Catg Code': 'Category',
+                'balance': 'Balance'
+            })
+            st.dataframe(
+                full_summary[['GL Account', 'GL Name', 'Category', 'Balance']],
+                use_container_width=True,
+                hide_index=True
+            )
     else:
-        st.info("Income category data not available in GL master")
+        st.info("No non-funded income balances for the selected branch and currency")
 else:
     st.info("""
     This section will show breakdown of non-funded income by category:
@@ -409,38 +446,41 @@ else:
 st.markdown("---")
 
 # Branch performance during campaign
-if 'ACNTS_BRN_CODE' in filtered_accounts.columns:
+campaign_kpis = get_kpi(
+    'group_kpi_matrix',
+    calculator,
+    window=(str(campaign_start), str(campaign_end)),
+    product=selected_product,
+    currency=selected_currency
+)
+
+if campaign_kpis is not None and 'ACNTS_BRN_CODE' in campaign_kpis.dims and \
+        'window_accounts' in campaign_kpis.get('ACNTS_BRN_CODE').columns:
     st.markdown("### 🏢 Branch Performance During Campaign")
     
-    if 'ACNTS_LAST_TRAN_DATE' in filtered_accounts.columns:
-        campaign_branches = campaign_accounts.groupby('ACNTS_BRN_CODE').agg({
-            'ACNTS_ACCOUNT_NUMBER': 'count',
-            'ACNTS_CLIENT_NUM': 'nunique'
-        }).reset_index()
-        
-        campaign_branches.columns = ['Branch', 'Active Accounts', 'Active Customers']
-        campaign_branches = campaign_branches.sort_values('Active Accounts', ascending=False).head(15)
+    # All branches are computed together; the branch filter is a row lookup
+    all_branches = campaign_kpis.league_table('ACNTS_BRN_CODE', 'window_accounts')
+    all_branches = all_branches[all_branches['window_accounts'] > 0]
+    if selected_branch != 'All':
+        all_branches = all_branches[all_branches['ACNTS_BRN_CODE'] == selected_branch]
+    
+    all_branches = all_branches[['rank', 'ACNTS_BRN_CODE', 'window_accounts', 'window_customers']]
+    all_branches.columns = ['Rank', 'Branch', 'Active Accounts', 'Active Customers']
+    campaign_branches = all_branches.head(15)
+    
+    if len(campaign_branches) > 0:
+        fig = vh.create_bar_chart(
+            campaign_branches,
+            'Branch',
+            'Active Accounts',
+            'Top 15 Branches by Activity (Campaign Period)',
+            color='#FFD700'
+        )
+        st.plotly_chart(fig, use_container_width=True)
         
-        if len(campaign_branches) > 0:
-            fig = vh.create_bar_chart(
-                campaign_branches,
-                'Branch',
-                'Active Accounts',
-                'Top 15 Branches by Activity (Campaign Period)',
-                color='#FFD700'
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Detailed table
-            with st.expander("📋 View All Branch Performance Data"):
-                all_branches = campaign_accounts.groupby('ACNTS_BRN_CODE').agg({
-                    'ACNTS_ACCOUNT_NUMBER': 'count',
-                    'ACNTS_CLIENT_NUM': 'nunique'
-                }).reset_index()
-                all_branches.columns = ['Branch', 'Active Accounts', 'Active Customers']
-                all_branches = all_branches.sort_values('Active Accounts', ascending=False)
-                
-                st.dataframe(all_branches, use_container_width=True, hide_index=True)
+        # Detailed table
+        with st.expander("📋 View All Branch Performance Data"):
+            st.dataframe(all_branches, use_container_width=True, hide_index=True)
 
 st.markdown("---")
 
@@ -452,21 +492,16 @@ col1, col2 = st.columns(2)
 with col1:
     st.markdown("#### 📊 Key Performance Indicators")
     
-    if has_gl_data and len(campaign_revenue) > 0:
+    if has_revenue_history and len(campaign_revenue) > 0:
         # Calculate campaign KPIs
-        campaign_period = campaign_revenue[
-            (campaign_revenue['month'] >= pd.Timestamp(campaign_start)) &
-            (campaign_revenue['month'] <= pd.Timestamp(campaign_end))
-        ]
-        
+        campaign_period = campaign_revenue[campaign_revenue['non_funded_income'].notna()]
         baseline_period = extended_revenue[
-            (extended_revenue['month'] >= pd.Timestamp(baseline_start)) &
-            (extended_revenue['month'] < pd.Timestamp(campaign_start))
+            (extended_revenue['period_type'] == 'Baseline') & extended_revenue['non_funded_income'].notna()
         ]
         
         if len(campaign_period) > 0 and len(baseline_period) > 0:
-            baseline_avg = baseline_period['revenue'].mean()
-            campaign_avg = campaign_period['revenue'].mean()
+            baseline_avg = baseline_period['non_funded_income'].mean()
+            campaign_avg = campaign_period['non_funded_income'].mean()
             
             if baseline_avg > 0:
                 improvement = ((campaign_avg - baseline_avg) / baseline_avg) * 100
@@ -483,8 +518,8 @@ with col1:
                         f"${baseline_avg:,.2f}",
                         f"${campaign_avg:,.2f}",
                         f"{improvement:+.1f}%",
-                        campaign_period.loc[campaign_period['revenue'].idxmax()]['month_name'],
-                        f"{(1 - campaign_period['revenue'].std() / campaign_avg):.1%}" if campaign_avg > 0 else "N/A"
+                        campaign_period.loc[campaign_period['non_funded_income'].idxmax()]['month_name'],
+                        f"{(1 - campaign_period['non_funded_income'].std() / campaign_avg):.1%}" if campaign_avg > 0 else "N/A"
                     ]
                 })
                 
@@ -499,24 +534,21 @@ with col1:
 with col2:
     st.markdown("#### 📈 Growth Analysis")
     
-    if has_gl_data and len(campaign_revenue) > 0:
-        campaign_period = campaign_revenue[
-            (campaign_revenue['month'] >= pd.Timestamp(campaign_start)) &
-            (campaign_revenue['month'] <= pd.Timestamp(campaign_end))
-        ]
+    if has_revenue_history and len(campaign_revenue) > 0:
+        campaign_period = campaign_revenue[campaign_revenue['non_funded_income'].notna()]
         
         if len(campaign_period) > 1:
             # Calculate cumulative growth
             campaign_period_copy = campaign_period.copy()
             campaign_period_copy['cumulative_growth'] = (
-                (campaign_period_copy['revenue'] / campaign_period_copy['revenue'].iloc[0] - 1) * 100
+                (campaign_period_copy['non_funded_income'] / campaign_period_copy['non_funded_income'].iloc[0] - 1) * 100
             )
             
             fig = vh.create_line_chart(
                 campaign_period_copy,
                 'month_name',
                 'cumulative_growth',
-                'Cumulative Revenue Growth During Campaign (%)',
+                'Cumulative Non-Funded Income Growth During Campaign (%)',
                 color='#003366',
                 show_markers=True
             )
@@ -553,12 +585,12 @@ if len(campaign_revenue) > 0:
     # Export functionality
     st.markdown("### 📥 Export Campaign Data")
     
-    csv = display_revenue.to_csv(index=False)
-    st.download_button(
-        label="📄 Download Campaign Analysis CSV",
-        data=csv,
-        file_name=f"campaign_analysis_{campaign_start.strftime('%Y%m%d')}_{campaign_end.strftime('%Y%m%d')}.csv",
-        mime="text/csv"
+    show_export(
+        "📄 Download Campaign Analysis",
+        f"campaign_analysis_{campaign_start.strftime('%Y%m%d')}_{campaign_end.strftime('%Y%m%d')}",
+        key=('campaign_analysis', str(baseline_start), str(campaign_start), str(campaign_end), selected_branch,
+             selected_currency, loader.get_data_version(), data_scope),
+        chunks=lambda: frame_chunks(display_revenue)
     )
 else:
     st.info("Revenue data will be displayed here when GL transactions are available")
@@ -569,7 +601,7 @@ st.markdown("---")
 st.markdown("### 💡 Insights & Recommendations")
 
 with st.expander("📊 View Campaign Insights"):
-    if has_gl_data and len(campaign_revenue) > 0:
+    if has_revenue_history and len(campaign_revenue) > 0:
         st.markdown("""
         Based on the campaign analysis:
         
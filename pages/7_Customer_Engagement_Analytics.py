@@ -3,9 +3,13 @@ import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from utils.branding import apply_nmb_branding, show_nmb_logo, show_nmb_footer, create_professional_banner
+from utils.audit import audit_page_view
+from utils.notifications import show_notification_badge
 
 st.set_page_config(page_title="Customer Engagement Analytics", page_icon="📱", layout="wide")
 apply_nmb_branding()
+audit_page_view("Customer Engagement Analytics")
+show_notification_badge()
 
 show_nmb_logo()
 
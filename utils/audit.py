@@ -0,0 +1,205 @@
+import os
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+import streamlit as st
+from sqlalchemy import insert
+from utils.database import AuditLog, get_database_engine, maintain_audit_log
+
+AUDIT_QUEUE_SIZE = int(os.environ.get('BI_AUDIT_QUEUE_SIZE', 10_000))
+AUDIT_BATCH_SIZE = int(os.environ.get('BI_AUDIT_BATCH_SIZE', 500))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get('BI_AUDIT_FLUSH_INTERVAL', 2.0))  # seconds
+AUDIT_RETENTION_MONTHS = int(os.environ.get('BI_AUDIT_RETENTION_MONTHS', 24))
+AUDIT_PAGE_VIEWS = os.environ.get('BI_AUDIT_PAGE_VIEWS', '0').lower() in ('1', 'true', 'yes')
+
+# Longest a caller blocks on a full queue before the event is dropped
+AUDIT_ENQUEUE_TIMEOUT = 0.05
+
+# Monthly audit_log partitions kept ready beyond the current month
+AUDIT_PARTITIONS_AHEAD = 3
+
+# Seconds between partition upkeep runs (create ahead, drop past retention)
+AUDIT_MAINTENANCE_INTERVAL = 6 * 3600
+
+# Attempts to write a batch before its events are counted as dropped
+AUDIT_MAX_ATTEMPTS = 3
+
+# Queue sentinel asking the writer thread to flush and stop
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Audit log entries written in batches on a background thread.
+
+    log() only enqueues, so callers never wait on the database. The writer
+    thread flushes when batch_size events are waiting or flush_interval
+    seconds after the first one arrived, using one multi-row INSERT per
+    batch. The queue is bounded: when it is full, log() blocks for up to
+    AUDIT_ENQUEUE_TIMEOUT and then drops the event, counting it in
+    stats['dropped']. A batch that fails to write is retried with the next
+    one, up to AUDIT_MAX_ATTEMPTS. Pending events are flushed at interpreter
+    exit. Every AUDIT_MAINTENANCE_INTERVAL the writer also runs audit_log
+    partition upkeep, keeping retention_months of history.
+    """
+
+    def __init__(self, max_queue=AUDIT_QUEUE_SIZE, batch_size=AUDIT_BATCH_SIZE,
+                 flush_interval=AUDIT_FLUSH_INTERVAL, retention_months=AUDIT_RETENTION_MONTHS):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_months = retention_months
+        self._maintained_at = None
+        self.stats = {'enqueued': 0, 'written': 0, 'batches': 0, 'dropped': 0, 'failed_batches': 0}
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._retry, self._attempts = [], 0
+
+    def _count(self, stat, n=1):
+        with self._stats_lock:
+            self.stats[stat] += n
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def log(self, user_id, username, action, dashboard=None, details=None):
+        """
+        Queue an audit entry.
+
+        Returns: bool - False if the event was dropped (queue full or writer closed)
+        """
+        if self._closed:
+            self._count('dropped')
+            return False
+        self._start()
+
+        event = {
+            'user_id': user_id,
+            'username': username,
+            'action': action,
+            'dashboard_accessed': dashboard,
+            'details': details,
+            'created_at': datetime.utcnow()
+        }
+        try:
+            self._queue.put(event, timeout=AUDIT_ENQUEUE_TIMEOUT)
+        except queue.Full:
+            self._count('dropped')
+            return False
+        self._count('enqueued')
+        return True
+
+    def pending(self):
+        """Events waiting to be written"""
+        return self._queue.qsize() + len(self._retry)
+
+    def _next_batch(self):
+        """Block for the first event, then collect until batch_size or flush_interval; (batch, stop)"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch, deadline = [first], time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if event is _STOP:
+                return batch, True
+            batch.append(event)
+        return batch, False
+
+    def _write(self, batch):
+        rows = self._retry + batch
+        if not rows:
+            return
+        try:
+            with get_database_engine().begin() as connection:
+                connection.execute(insert(AuditLog), rows)
+        except Exception:
+            self._count('failed_batches')
+            self._attempts += 1
+            if self._attempts >= AUDIT_MAX_ATTEMPTS:
+                self._count('dropped', len(rows))
+                self._retry, self._attempts = [], 0
+            else:
+                self._retry = rows
+            return
+        self._count('written', len(rows))
+        self._count('batches')
+        self._retry, self._attempts = [], 0
+
+    def _maintain(self):
+        """Partition upkeep, at most every AUDIT_MAINTENANCE_INTERVAL (best effort)"""
+        now = time.monotonic()
+        if self._maintained_at is not None and now - self._maintained_at < AUDIT_MAINTENANCE_INTERVAL:
+            return
+        self._maintained_at = now
+        try:
+            maintain_audit_log(AUDIT_PARTITIONS_AHEAD, self.retention_months)
+        except Exception:
+            pass
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            self._maintain()
+            self._write(batch)
+            if stop:
+                break
+
+        # Shutting down: write whatever arrived before the sentinel
+        remaining = []
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is not _STOP:
+                remaining.append(event)
+        for start in range(0, len(remaining), self.batch_size):
+            self._write(remaining[start:start + self.batch_size])
+        if self._retry:
+            self._write([])
+
+    def close(self, timeout=10.0):
+        """Flush pending events and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+
+
+# Process-wide audit writer
+audit_writer = AuditWriter()
+
+
+def audit_page_view(dashboard: str):
+    """
+    Record a dashboard view (once per visit, not on every rerun) when
+    BI_AUDIT_PAGE_VIEWS is enabled.
+    """
+    if not AUDIT_PAGE_VIEWS or st.session_state.get('_audit_last_page') == dashboard:
+        return
+    st.session_state._audit_last_page = dashboard
+    audit_writer.log(st.session_state.get('user_id'), st.session_state.get('username'), 'page_view', dashboard)
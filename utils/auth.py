@@ -4,56 +4,54 @@ Handles user authentication, password hashing, and session management
 """
 
 import streamlit as st
-import bcrypt
+import streamlit.components.v1 as components
 import re
 from datetime import datetime, timedelta
 from utils.database import (
+    unit_of_work,
     get_user_by_username,
-    get_user_by_email,
+    find_user_conflicts,
     create_user,
-    update_user_login,
+    record_login,
     log_user_action
 )
+from utils.passwords import hash_password, verify_password
+from utils.sessions import session_store, SESSION_COOKIE, SESSION_TTL_HOURS
+from utils.permissions import (
+    permission_cache,
+    dashboard_bit,
+    DASHBOARDS,
+    PERM_EXPORT_LIMITED
+)
 
-def hash_password(password: str) -> str:
-    """Hash password using bcrypt"""
-    salt = bcrypt.gensalt(rounds=12)
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
-
-def verify_password(password: str, password_hash: str) -> bool:
-    """Verify password against hash"""
-    try:
-        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
-    except Exception:
-        return False
+# Credential rules (also applied column-wise by utils/provisioning.py)
+USERNAME_PATTERN = r'^[a-zA-Z0-9_]+$'
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+MIN_PASSWORD_LENGTH = 12
+PASSWORD_RULES = [
+    (r'[A-Z]', "Password must contain at least one uppercase letter"),
+    (r'[a-z]', "Password must contain at least one lowercase letter"),
+    (r'\d', "Password must contain at least one number"),
+    (r'[!@#$%^&*(),.?":{}|<>]', "Password must contain at least one special character")
+]
 
 def validate_password_strength(password: str) -> tuple[bool, str]:
     """
     Validate password strength
     Returns: (is_valid, error_message)
     """
-    if len(password) < 12:
-        return False, "Password must be at least 12 characters long"
+    if len(password) < MIN_PASSWORD_LENGTH:
+        return False, f"Password must be at least {MIN_PASSWORD_LENGTH} characters long"
     
-    if not re.search(r'[A-Z]', password):
-        return False, "Password must contain at least one uppercase letter"
-    
-    if not re.search(r'[a-z]', password):
-        return False, "Password must contain at least one lowercase letter"
-    
-    if not re.search(r'\d', password):
-        return False, "Password must contain at least one number"
-    
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-        return False, "Password must contain at least one special character"
+    for pattern, message in PASSWORD_RULES:
+        if not re.search(pattern, password):
+            return False, message
     
     return True, ""
 
 def validate_email(email: str) -> bool:
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return re.match(EMAIL_PATTERN, email) is not None
 
 def validate_username(username: str) -> tuple[bool, str]:
     """
@@ -66,7 +64,7 @@ def validate_username(username: str) -> tuple[bool, str]:
     if len(username) > 50:
         return False, "Username must be less than 50 characters"
     
-    if not re.match(r'^[a-zA-Z0-9_]+$', username):
+    if not re.match(USERNAME_PATTERN, username):
         return False, "Username can only contain letters, numbers, and underscores"
     
     return True, ""
@@ -91,11 +89,8 @@ def authenticate_user(username: str, password: str) -> tuple[bool, str, dict]:
         if not verify_password(password, user.password_hash):
             return False, "Invalid username or password", None
         
-        # Update login timestamp
-        update_user_login(user.user_id)
-        
-        # Log successful login
-        log_user_action(user.user_id, user.username, 'login')
+        # Update login timestamp and log the login (one round-trip)
+        record_login(user.user_id, user.username)
         
         # Return user data
         user_data = {
@@ -134,30 +129,29 @@ def register_user(username: str, email: str, password: str, first_name: str = No
         if not valid:
             return False, msg
         
-        # Check if username already exists
-        if get_user_by_username(username):
+        # Check if username or email already exists
+        username_taken, email_taken = find_user_conflicts(username, email)
+        if username_taken:
             return False, "Username already exists"
-        
-        # Check if email already exists
-        if get_user_by_email(email):
+        if email_taken:
             return False, "Email already registered"
         
-        # Hash password
+        # Hash password (outside any transaction: bcrypt is deliberately slow)
         password_hash = hash_password(password)
         
-        # Create user
-        user = create_user(
-            username=username,
-            email=email,
-            password_hash=password_hash,
-            first_name=first_name,
-            last_name=last_name,
-            role_level=role_level,
-            department=department
-        )
-        
-        # Log registration
-        log_user_action(user.user_id, user.username, 'register')
+        # Create user and log registration in one transaction
+        with unit_of_work() as session:
+            user = create_user(
+                username=username,
+                email=email,
+                password_hash=password_hash,
+                first_name=first_name,
+                last_name=last_name,
+                role_level=role_level,
+                department=department,
+                session=session
+            )
+            log_user_action(user.user_id, user.username, 'register', session=session)
         
         return True, "Registration successful"
         
@@ -186,9 +180,11 @@ def init_session():
     
     if 'last_name' not in st.session_state:
         st.session_state.last_name = None
+    
+    restore_session()
+    _write_session_cookie()
 
-def login_user(user_data: dict):
-    """Set session state for logged-in user"""
+def _set_user_state(user_data: dict):
     st.session_state.authenticated = True
     st.session_state.user_id = user_data['user_id']
     st.session_state.username = user_data['username']
@@ -198,11 +194,75 @@ def login_user(user_data: dict):
     st.session_state.role_level = user_data['role_level']
     st.session_state.department = user_data.get('department')
 
+def _write_session_cookie():
+    """
+    Send a pending session cookie change (set at login, cleared at logout) to the browser.
+    The cookie is written by script, so it can't be HttpOnly; Secure keeps it off plain HTTP.
+    """
+    pending = st.session_state.pop('_session_cookie', None)
+    if pending is None:
+        return
+    token, max_age = pending
+    components.html(
+        f"<script>window.parent.document.cookie = "
+        f"'{SESSION_COOKIE}={token}; path=/; max-age={max_age}; SameSite=Strict; Secure';</script>",
+        height=0
+    )
+
+def restore_session() -> bool:
+    """
+    Log in from the session cookie after a browser refresh or reconnect
+    Returns: True if the user is (now) authenticated
+    """
+    if st.session_state.get('authenticated'):
+        return True
+    
+    token = st.context.cookies.get(SESSION_COOKIE)
+    if not isinstance(token, str) or not token or st.session_state.get('_rejected_session_token') == token:
+        return False
+    
+    try:
+        user_data = session_store.validate(token)
+    except Exception:
+        user_data = None
+    
+    if user_data is None:
+        # Don't look the same token up again on every rerun
+        st.session_state._rejected_session_token = token
+        return False
+    
+    _set_user_state(user_data)
+    st.session_state.session_token = token
+    return True
+
+def login_user(user_data: dict):
+    """Set session state for logged-in user and start a persistent session"""
+    _set_user_state(user_data)
+    
+    ip_address, user_agent = st.context.ip_address, st.context.headers.get('User-Agent')
+    try:
+        token = session_store.create(user_data, ip_address if isinstance(ip_address, str) else None,
+                                     user_agent if isinstance(user_agent, str) else None)
+        st.session_state.session_token = token
+        st.session_state._session_cookie = (token, SESSION_TTL_HOURS * 3600)
+    except Exception:
+        # Without a stored session the login still lasts for this browser session
+        pass
+
 def logout_user():
     """Clear session state and log out user"""
     if st.session_state.get('user_id') and st.session_state.get('username'):
         log_user_action(st.session_state.user_id, st.session_state.username, 'logout')
     
+    token = st.session_state.get('session_token')
+    if token:
+        try:
+            session_store.revoke(token)
+        except Exception:
+            pass
+        st.session_state._rejected_session_token = token
+        st.session_state._session_cookie = ('', 0)
+    
     st.session_state.authenticated = False
     st.session_state.user_id = None
     st.session_state.username = None
@@ -211,10 +271,11 @@ def logout_user():
     st.session_state.last_name = None
     st.session_state.role_level = None
     st.session_state.department = None
+    st.session_state.session_token = None
 
 def is_authenticated() -> bool:
-    """Check if user is authenticated"""
-    return st.session_state.get('authenticated', False)
+    """Check if user is authenticated (restoring a session from its cookie if needed)"""
+    return st.session_state.get('authenticated', False) or restore_session()
 
 def get_current_user() -> dict:
     """Get current user data from session"""
@@ -253,16 +314,22 @@ def check_permission(required_level: int) -> bool:
     user_level = st.session_state.get('role_level', 99)
     return user_level <= required_level
 
-def require_auth(required_level: int = 5):
+def require_auth(required_level: int = 5, dashboard: str = None):
     """
     Decorator/function to require authentication and minimum role level
-    Usage in dashboard: require_auth(3) to require Analyst level or higher
+    Usage in dashboard: require_auth(3) to require Analyst level or higher,
+    or require_auth(dashboard='Cache Administration') to require access to that dashboard
     """
     if not is_authenticated():
         st.warning("🔒 Please log in to access this dashboard")
         st.stop()
     
-    if not check_permission(required_level):
+    if dashboard is not None:
+        if not can_view_dashboard(dashboard):
+            st.error(f"⛔ Insufficient permissions. Your role doesn't include access to {dashboard}.")
+            st.info(f"Your access level: {get_role_name(st.session_state.get('role_level'))}")
+            st.stop()
+    elif not check_permission(required_level):
         st.error(f"⛔ Insufficient permissions. This dashboard requires {get_role_name(required_level)} level access or higher.")
         st.info(f"Your access level: {get_role_name(st.session_state.get('role_level'))}")
         st.stop()
@@ -272,51 +339,23 @@ def can_export() -> bool:
     if not is_authenticated():
         return False
     
-    role_level = st.session_state.get('role_level', 99)
-    # Executives (1) and Managers (2) can export
-    return role_level <= 2
+    # Roles with full or limited export (by default Executives and Managers)
+    return permission_cache.has(st.session_state.get('role_level', 99), PERM_EXPORT_LIMITED)
 
 def can_view_dashboard(dashboard_name: str) -> bool:
-    """Check if user can view specific dashboard based on role"""
+    """Check if user can view specific dashboard based on role permissions (roles table)"""
     if not is_authenticated():
         return False
     
-    role_level = st.session_state.get('role_level', 99)
-    
-    # Define dashboard access levels
-    dashboard_access = {
-        'Executive Summary': 5,  # All roles
-        'Active Email Accounts': 3,  # Analyst and above
-        'Account Activity': 3,  # Analyst and above
-        'Customer Metrics': 2,  # Manager and above
-        'Quarterly Performance': 5,  # All roles
-        'Campaign Analysis': 3,  # Analyst and above
-        'Customer Engagement Analytics': 2,  # Manager and above
-        'Sentiment Analysis': 2,  # Manager and above
-        'Social Media Analytics': 3,  # Analyst and above
-    }
-    
-    required_level = dashboard_access.get(dashboard_name, 1)  # Default to Executive only
-    return role_level <= required_level
+    return permission_cache.has(st.session_state.get('role_level', 99), dashboard_bit(dashboard_name))
 
 def get_accessible_dashboards() -> list:
     """Get list of dashboards accessible to current user"""
     if not is_authenticated():
         return []
     
-    all_dashboards = [
-        'Executive Summary',
-        'Active Email Accounts',
-        'Account Activity',
-        'Customer Metrics',
-        'Quarterly Performance',
-        'Campaign Analysis',
-        'Customer Engagement Analytics',
-        'Sentiment Analysis',
-        'Social Media Analytics'
-    ]
-    
-    return [d for d in all_dashboards if can_view_dashboard(d)]
+    mask = permission_cache.mask(st.session_state.get('role_level', 99))
+    return [d for d in DASHBOARDS if mask & dashboard_bit(d)]
 
 def display_user_info():
     """Display current user info in sidebar"""
@@ -0,0 +1,294 @@
+import os
+import sys
+import functools
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+import numpy as np
+from utils.disk_cache import find_data_version, find_scope, hash_value
+
+MEMORY_BUDGET_BYTES = int(os.environ.get('BI_CACHE_MEMORY_BYTES', 2 * 1024 ** 3))  # 2 GB
+EVICTION_POLICY = os.environ.get('BI_CACHE_EVICTION', 'cost')  # 'lru' or 'cost'
+
+EVICTION_POLICIES = ['lru', 'cost']
+
+# Namespace for memoized DataProcessor / MetricsCalculator methods
+ANALYTICS_NAMESPACE = 'analytics'
+
+
+def deep_sizeof(obj, _seen=None):
+    """
+    Approximate deep memory size of a cached value in bytes.
+    DataFrames and Series include their string contents; containers and
+    plain objects are walked recursively, counting shared objects once.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+class CacheEntry:
+    """A cached value with its size, cost and access history"""
+
+    __slots__ = ('namespace', 'key', 'value', 'size', 'compute_seconds', 'hits', 'created_at', 'last_access')
+
+    def __init__(self, namespace, key, value, size, compute_seconds):
+        self.namespace = namespace
+        self.key = key
+        self.value = value
+        self.size = size
+        self.compute_seconds = compute_seconds
+        self.hits = 0
+        self.created_at = time.time()
+        self.last_access = self.created_at
+
+    def score(self):
+        """Cost-aware retention score: recompute time per byte, weighted by reuse"""
+        return self.compute_seconds * (1 + self.hits) / max(self.size, 1)
+
+
+class CacheManager:
+    """
+    Central in-memory cache with accounting and a global memory budget.
+
+    Values live in named namespaces (e.g. 'kpi', 'analytics'). Every entry
+    records its deep size and how long it took to compute; every hit adds
+    that compute time to the namespace's time saved. When the total size
+    exceeds the budget, entries are evicted least recently used first
+    ('lru') or lowest compute-seconds-per-byte first ('cost').
+    """
+
+    def __init__(self, budget_bytes=MEMORY_BUDGET_BYTES, policy=EVICTION_POLICY):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}. Use one of {EVICTION_POLICIES}")
+        self.budget_bytes = budget_bytes
+        self.policy = policy
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+    def _namespace_stats(self, namespace):
+        if namespace not in self._stats:
+            self._stats[namespace] = {'hits': 0, 'misses': 0, 'compute_seconds': 0.0,
+                                      'saved_seconds': 0.0, 'evictions': 0}
+        return self._stats[namespace]
+
+    def get(self, namespace, key):
+        """Return (found, value), recording a hit or miss"""
+        with self._lock:
+            stats = self._namespace_stats(namespace)
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                stats['misses'] += 1
+                return False, None
+            entry.hits += 1
+            entry.last_access = time.time()
+            self._entries.move_to_end((namespace, key))
+            stats['hits'] += 1
+            stats['saved_seconds'] += entry.compute_seconds
+            return True, entry.value
+
+    def put(self, namespace, key, value, compute_seconds=0.0):
+        """Store a value, evicting other entries if the budget is exceeded"""
+        size = deep_sizeof(value)
+        with self._lock:
+            self._remove((namespace, key))
+            self._entries[(namespace, key)] = CacheEntry(namespace, key, value, size, compute_seconds)
+            self._total_bytes += size
+            self._namespace_stats(namespace)['compute_seconds'] += compute_seconds
+            self._evict(keep=(namespace, key))
+        return value
+
+    def get_or_compute(self, namespace, key, compute):
+        """Return the cached value or compute, time and store it"""
+        found, value = self.get(namespace, key)
+        if found:
+            return value
+        start = time.perf_counter()
+        value = compute()
+        return self.put(namespace, key, value, time.perf_counter() - start)
+
+    def _remove(self, full_key):
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+        return entry
+
+    def _evict(self, keep=None):
+        """Evict until within budget (the entry just stored is evicted last)"""
+        while self._total_bytes > self.budget_bytes and len(self._entries) > 1:
+            candidates = (k for k in self._entries if k != keep)
+            if self.policy == 'lru':
+                victim = next(candidates)
+            else:
+                victim = min(candidates, key=lambda k: (self._entries[k].score(), self._entries[k].last_access))
+            entry = self._remove(victim)
+            self._namespace_stats(entry.namespace)['evictions'] += 1
+
+    def invalidate(self, namespace=None, predicate=None):
+        """
+        Drop entries.
+
+        Args:
+            namespace: Namespace to clear (None = all namespaces)
+            predicate: Optional function of the key; only matching keys are dropped
+
+        Returns: int - number of entries removed
+        """
+        with self._lock:
+            doomed = [
+                full_key for full_key in self._entries
+                if (namespace is None or full_key[0] == namespace)
+                and (predicate is None or predicate(full_key[1]))
+            ]
+            for full_key in doomed:
+                self._remove(full_key)
+            return len(doomed)
+
+    def keys(self, namespace):
+        """Keys currently cached in a namespace"""
+        with self._lock:
+            return [key for ns, key in self._entries if ns == namespace]
+
+    def set_budget(self, budget_bytes=None, policy=None):
+        """Change the memory budget and/or eviction policy, evicting as needed"""
+        with self._lock:
+            if policy is not None:
+                if policy not in EVICTION_POLICIES:
+                    raise ValueError(f"Unknown eviction policy: {policy}. Use one of {EVICTION_POLICIES}")
+                self.policy = policy
+            if budget_bytes is not None:
+                self.budget_bytes = budget_bytes
+            self._evict()
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def namespace_stats(self, namespace):
+        """Counters for one namespace (hits, misses, compute/saved seconds, evictions)"""
+        with self._lock:
+            return dict(self._namespace_stats(namespace))
+
+    def get_stats(self):
+        """
+        Per-namespace summary.
+
+        Returns: DataFrame with entries, bytes, hits, misses, hit_rate,
+            compute_seconds, saved_seconds and evictions
+        """
+        with self._lock:
+            rows = []
+            for namespace, stats in self._stats.items():
+                entries = [e for e in self._entries.values() if e.namespace == namespace]
+                lookups = stats['hits'] + stats['misses']
+                rows.append({
+                    'namespace': namespace,
+                    'entries': len(entries),
+                    'bytes': sum(e.size for e in entries),
+                    **stats,
+                    'hit_rate': stats['hits'] / lookups * 100 if lookups > 0 else 0.0
+                })
+        return pd.DataFrame(rows)
+
+    def get_entries(self):
+        """
+        One row per cached entry, most recently used first.
+
+        Returns: DataFrame with namespace, key, bytes, compute_seconds, hits,
+            saved_seconds, score, created and last_access
+        """
+        with self._lock:
+            rows = [{
+                'namespace': e.namespace,
+                'key': repr(e.key),
+                'bytes': e.size,
+                'compute_seconds': e.compute_seconds,
+                'hits': e.hits,
+                'saved_seconds': e.compute_seconds * e.hits,
+                'score': e.score(),
+                'created': pd.Timestamp(e.created_at, unit='s'),
+                'last_access': pd.Timestamp(e.last_access, unit='s')
+            } for e in reversed(self._entries.values())]
+        return pd.DataFrame(rows)
+
+
+# Process-wide cache manager shared by all pages and sessions
+cache_manager = CacheManager()
+
+
+def _freeze(value):
+    """Hashable form of a method argument (unhashable values by content hash)"""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return hash_value(value)
+
+
+def memoized(sources=None, daily=False, namespace=ANALYTICS_NAMESPACE):
+    """
+    Method decorator memoizing results in the shared cache manager.
+
+    The key is the method, its arguments and the data version of `sources` the
+    instance was built from (self.get_data_version), so every instance bound
+    to the same data shares results, a reload misses and an instance over
+    older data never stores its results under a newer version.
+    Instances restricted to a data scope (self.scope or self.processor.scope)
+    add it to the key, so they share results only with the same scope.
+
+    Args:
+        sources: Data source name(s) the result depends on (None = all sources)
+        daily: Also key on today's date, for results computed against the clock
+        namespace: Cache manager namespace
+
+    Results are shared across sessions, so treat them as read-only.
+    """
+    source_key = tuple(sources) if isinstance(sources, (list, tuple)) else sources
+
+    def decorator(func):
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            version = find_data_version(self, sources)
+            version = version if version is not None else id(self)
+            key = (name, source_key, version,
+                   tuple(_freeze(a) for a in args),
+                   tuple((k, _freeze(v)) for k, v in sorted(kwargs.items())))
+            scope = find_scope(self)
+            if scope is not None:
+                key += (('scope', tuple(scope)),)
+            if daily:
+                key += (pd.Timestamp.now().strftime('%Y-%m-%d'),)
+            return cache_manager.get_or_compute(namespace, key, lambda: func(self, *args, **kwargs))
+
+        return wrapper
+    return decorator
+
+
+def prune_stale(loader, namespace=ANALYTICS_NAMESPACE):
+    """
+    Drop memoized results computed against older data versions of a loader.
+
+    Returns: int - number of entries removed
+    """
+    return cache_manager.invalidate(namespace, lambda key: loader.get_data_version(key[1]) != key[2])
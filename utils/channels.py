@@ -0,0 +1,115 @@
+import pandas as pd
+import numpy as np
+
+# Channel enablement flags, in bit order (bit 0 = first entry)
+CHANNEL_COLUMNS = {
+    'ACNTS_INET_OPERN': 'Internet Banking',
+    'ACNTS_MBLBNK_OPERN': 'Mobile Banking',
+    'ACNTS_ATM_OPERN': 'ATM',
+    'ACNTS_SMS_OPERN': 'SMS Banking',
+    'ACNTS_CALL_CENTER_OPERN': 'Call Center',
+    'ACNTS_TELLER_OPERN': 'Teller/Branch',
+    'ACNTS_KIOSK_BANKING': 'Kiosk Banking'
+}
+
+CHANNEL_BITS = {col: 1 << i for i, col in enumerate(CHANNEL_COLUMNS)}
+N_COMBINATIONS = 1 << len(CHANNEL_COLUMNS)
+
+DIGITAL_CHANNELS = ['ACNTS_INET_OPERN', 'ACNTS_MBLBNK_OPERN', 'ACNTS_SMS_OPERN']
+BRANCH_CHANNELS = ['ACNTS_TELLER_OPERN']
+
+DIGITAL_MASK = sum(CHANNEL_BITS[c] for c in DIGITAL_CHANNELS)
+BRANCH_MASK = sum(CHANNEL_BITS[c] for c in BRANCH_CHANNELS)
+
+SEGMENT_ORDER = ['Digital Only', 'Branch Only', 'Digital + Branch', 'Other Channels Only', 'No Channels']
+
+
+def pack_channel_flags(df):
+    """
+    Pack the 'Y'/'N' channel flags into one uint8 bitmask per account.
+
+    Returns: (numpy uint8 array of masks, list of flag columns present in df)
+    """
+    mask = np.zeros(len(df), dtype=np.uint8)
+    present = [col for col in CHANNEL_COLUMNS if col in df.columns]
+    for col in present:
+        enabled = df[col].astype(str).str.strip().str.upper().eq('Y').to_numpy()
+        mask |= enabled.astype(np.uint8) * np.uint8(CHANNEL_BITS[col])
+    return mask, present
+
+
+def channel_histogram(mask):
+    """Number of accounts per channel combination (index = bitmask)"""
+    return np.bincount(mask, minlength=N_COMBINATIONS)
+
+
+def combination_labels():
+    """Channel names for every bitmask value"""
+    bits = np.arange(N_COMBINATIONS)[:, None] & np.array(list(CHANNEL_BITS.values()))[None, :]
+    names = np.array(list(CHANNEL_COLUMNS.values()))
+    return [' + '.join(names[row > 0]) or 'None' for row in bits]
+
+
+def segment_lookup():
+    """Digital/branch segment name for every bitmask value"""
+    combos = np.arange(N_COMBINATIONS)
+    digital = (combos & DIGITAL_MASK) > 0
+    branch = (combos & BRANCH_MASK) > 0
+    segments = np.select(
+        [digital & ~branch, branch & ~digital, digital & branch, combos > 0],
+        SEGMENT_ORDER[:4],
+        default='No Channels'
+    )
+    return pd.Series(segments, index=combos)
+
+
+def adoption_table(histogram, present):
+    """
+    Per-channel enabled accounts and adoption rate from the combination histogram.
+
+    Returns: DataFrame with channel, enabled_accounts and adoption_rate
+    """
+    total_accounts = histogram.sum()
+    combos = np.arange(len(histogram))
+    enabled = np.array([histogram[(combos & CHANNEL_BITS[col]) > 0].sum() for col in present])
+
+    adoption = pd.DataFrame({
+        'channel': [CHANNEL_COLUMNS[col] for col in present],
+        'enabled_accounts': enabled,
+        'adoption_rate': enabled / total_accounts * 100 if total_accounts > 0 else 0.0
+    })
+    return adoption.sort_values('adoption_rate', ascending=False)
+
+
+def combination_table(histogram, top_n=None):
+    """
+    Non-empty channel combinations ordered by number of accounts.
+
+    Returns: DataFrame with mask, combination, channel_count, accounts and share
+    """
+    total_accounts = histogram.sum()
+    combos = np.flatnonzero(histogram)
+    combinations = pd.DataFrame({
+        'mask': combos,
+        'combination': np.array(combination_labels(), dtype=object)[combos],
+        'channel_count': np.array([bin(c).count('1') for c in combos], dtype=np.int64),
+        'accounts': histogram[combos]
+    })
+    combinations['share'] = combinations['accounts'] / total_accounts * 100 if total_accounts > 0 else 0.0
+    combinations = combinations.sort_values('accounts', ascending=False)
+    return combinations.head(top_n) if top_n is not None else combinations
+
+
+def segment_table(histogram):
+    """
+    Accounts per digital/branch segment.
+
+    Returns: DataFrame with segment, accounts and share
+    """
+    total_accounts = histogram.sum()
+    segments = pd.Series(histogram).groupby(segment_lookup()).sum().reindex(SEGMENT_ORDER, fill_value=0)
+    return pd.DataFrame({
+        'segment': segments.index,
+        'accounts': segments.values,
+        'share': segments.values / total_accounts * 100 if total_accounts > 0 else 0.0
+    })
@@ -0,0 +1,219 @@
+import pandas as pd
+import numpy as np
+
+# Customer segments by number of accounts: [lower edge, next edge) -> label
+ACCOUNT_SEGMENT_EDGES = [1, 2, 4, 6]
+ACCOUNT_SEGMENT_LABELS = ['Single Account', '2-3 Accounts', '4-5 Accounts', '6+ Accounts']
+
+# Integer distributions up to this multiple of the entity count use a counting sort
+COUNTING_SORT_RANGE = 4
+
+
+def _sorted_ascending(values):
+    """Sort non-negative values, using a counting sort for small integer ranges"""
+    values = np.asarray(values)
+    if len(values) == 0:
+        return values.astype(np.float64)
+
+    if np.issubdtype(values.dtype, np.integer) and values.min() >= 0 \
+            and values.max() <= COUNTING_SORT_RANGE * len(values):
+        frequency = np.bincount(values)
+        return np.repeat(np.arange(len(frequency)), frequency)
+
+    return np.sort(values)
+
+
+class Concentration:
+    """
+    Concentration of a per-entity quantity (e.g. accounts or balance per customer).
+
+    Values are sorted once (counting sort for account counts) and held as a
+    single ascending cumulative array; the Lorenz curve, Gini, HHI, any top-k
+    share and segment summaries are all lookups or reductions on that array.
+    """
+
+    def __init__(self, values):
+        """
+        Args:
+            values: One non-negative value per entity (negatives are clipped to 0)
+        """
+        values = np.asarray(values)
+        if not np.issubdtype(values.dtype, np.integer):
+            values = np.clip(np.nan_to_num(values.astype(np.float64)), 0, None)
+        else:
+            values = np.clip(values, 0, None)
+
+        self.sorted = _sorted_ascending(values)
+        self.cumulative = np.concatenate([[0], np.cumsum(self.sorted)])
+        self.count = len(self.sorted)
+        self.total = self.cumulative[-1]
+
+    def top_k_total(self, k):
+        """Total held by the k largest entities"""
+        k = int(min(max(k, 0), self.count))
+        return self.total - self.cumulative[self.count - k]
+
+    def top_share(self, fraction):
+        """
+        Share (%) of the total held by the top fraction of entities.
+
+        Returns: (number of entities, their total, share %)
+        """
+        k = int(self.count * fraction)
+        top_total = self.top_k_total(k)
+        share = top_total / self.total * 100 if self.total > 0 else 0.0
+        return k, top_total, share
+
+    def lorenz_curve(self, points=101):
+        """
+        Lorenz curve sampled at evenly spaced population shares.
+
+        Returns: DataFrame with population_share and value_share (both %)
+        """
+        population = np.linspace(0, 1, points)
+        if self.count == 0 or self.total == 0:
+            return pd.DataFrame({'population_share': population * 100, 'value_share': population * 100})
+
+        position = population * self.count
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, self.count)
+        weight = position - lower
+        cumulative = self.cumulative[lower] + weight * (self.cumulative[upper] - self.cumulative[lower])
+
+        return pd.DataFrame({
+            'population_share': population * 100,
+            'value_share': cumulative / self.total * 100
+        })
+
+    def gini(self):
+        """Gini coefficient (0 = perfectly even, 1 = fully concentrated)"""
+        if self.count == 0 or self.total == 0:
+            return 0.0
+        return float((self.count + 1 - 2 * self.cumulative[1:].sum() / self.total) / self.count)
+
+    def hhi(self):
+        """Herfindahl-Hirschman index on the 0-10,000 scale"""
+        if self.total == 0:
+            return 0.0
+        shares = self.sorted / self.total
+        return float((shares * shares).sum() * 10000)
+
+    def segment_summary(self, edges=ACCOUNT_SEGMENT_EDGES, labels=ACCOUNT_SEGMENT_LABELS):
+        """
+        Bin entities into segments by value; each segment is a contiguous
+        slice of the sorted array, so boundaries come from searchsorted.
+
+        Args:
+            edges: Ascending lower edges of each segment
+            labels: Segment names (one per edge)
+
+        Returns: DataFrame with segment, entities, avg, min, max, total and share (%)
+        """
+        bounds = np.searchsorted(self.sorted, np.append(edges, np.inf), side='left')
+        start, end = bounds[:-1], bounds[1:]
+        entities = end - start
+        totals = self.cumulative[end] - self.cumulative[start]
+        has_rows = entities > 0
+        last = max(self.count - 1, 0)
+        values = self.sorted if self.count else np.array([np.nan])
+
+        return pd.DataFrame({
+            'segment': labels,
+            'entities': entities,
+            'avg': np.where(has_rows, totals / np.maximum(entities, 1), np.nan),
+            'min': np.where(has_rows, values[np.minimum(start, last)], np.nan),
+            'max': np.where(has_rows, values[np.clip(end - 1, 0, last)], np.nan),
+            'total': totals,
+            'share': totals / self.total * 100 if self.total > 0 else 0.0
+        })
+
+
+def concentration_summary(concentration):
+    """
+    Headline concentration figures (top 10%/20% of customers, Gini, HHI).
+
+    Returns: dict with the account concentration keys used by the dashboards
+    """
+    top_10_pct_count, top_10_pct_accounts, top_10_pct_share = concentration.top_share(0.1)
+    top_20_pct_count, top_20_pct_accounts, top_20_pct_share = concentration.top_share(0.2)
+
+    return {
+        'total_customers': concentration.count,
+        'total_accounts': int(concentration.total),
+        'top_10_pct_customers': top_10_pct_count,
+        'top_10_pct_accounts': int(top_10_pct_accounts),
+        'top_10_pct_share': top_10_pct_share,
+        'top_20_pct_customers': top_20_pct_count,
+        'top_20_pct_accounts': int(top_20_pct_accounts),
+        'top_20_pct_share': top_20_pct_share,
+        'gini': concentration.gini(),
+        'hhi': concentration.hhi()
+    }
+
+
+def account_segment_table(concentration):
+    """
+    Customers binned by number of accounts.
+
+    Returns: DataFrame with segment, customers, account statistics and account share
+    """
+    return concentration.segment_summary().rename(columns={
+        'entities': 'customers',
+        'avg': 'avg_accounts',
+        'min': 'min_accounts',
+        'max': 'max_accounts',
+        'total': 'accounts',
+        'share': 'account_share'
+    })
+
+
+def grouped_concentration(groups, values, fractions=(0.1, 0.2)):
+    """
+    Concentration metrics for every group in one sorted pass.
+
+    Args:
+        groups: Group key per entity (e.g. branch of each customer)
+        values: Non-negative value per entity
+        fractions: Top fractions to report shares for
+
+    Returns: DataFrame with group, entities, total, gini, hhi and top_<p>_pct_share columns
+    """
+    codes, uniques = pd.factorize(pd.Series(groups), sort=True)
+    values = np.clip(np.nan_to_num(np.asarray(values, dtype=np.float64)), 0, None)
+    keep = codes >= 0
+    codes, values = codes[keep], values[keep]
+
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+
+    n = np.bincount(codes, minlength=len(uniques))
+    start = np.concatenate([[0], np.cumsum(n)[:-1]])
+    totals = np.bincount(codes, weights=values, minlength=len(uniques))
+
+    # Within-group ascending cumulative sums from one global cumsum
+    running = np.cumsum(values)
+    offset = np.concatenate([[0], running])[start]
+    cumulative = running - offset[codes]
+    cumulative_sum = np.bincount(codes, weights=cumulative, minlength=len(uniques))
+    squares = np.bincount(codes, weights=values * values, minlength=len(uniques))
+
+    safe_totals = np.where(totals > 0, totals, 1)
+    safe_n = np.maximum(n, 1)
+    result = pd.DataFrame({
+        'group': uniques,
+        'entities': n,
+        'total': totals,
+        'gini': np.where(totals > 0, (n + 1 - 2 * cumulative_sum / safe_totals) / safe_n, 0.0),
+        'hhi': np.where(totals > 0, squares / safe_totals ** 2 * 10000, 0.0)
+    })
+
+    padded = np.concatenate([[0], running])
+    for fraction in fractions:
+        k = (n * fraction).astype(np.int64)
+        # Top-k total = group total - cumulative of the first (n - k) values
+        bottom = padded[start + n - k] - padded[start]
+        result[f'top_{int(round(fraction * 100))}_pct_share'] = np.where(
+            totals > 0, (totals - bottom) / safe_totals * 100, 0.0
+        )
+
+    return result
@@ -0,0 +1,169 @@
+import hashlib
+import pandas as pd
+import numpy as np
+
+BASE_CURRENCY = 'USD'
+LOCAL_CURRENCY = 'ZIG'
+
+
+class CurrencyConverter:
+    """
+    Dated FX rates table with vectorized as-of conversion.
+
+    Rates are quoted as units of currency per one unit of BASE_CURRENCY
+    (e.g. ZIG 26.8 per USD). Converting a column is a single merge_asof on
+    (currency, date) over the whole frame; latest-rate lookups are cached per
+    rates version so repeated conversions cost a dictionary hit.
+    """
+
+    def __init__(self, rates_df=None, currencies=None, base_currency=BASE_CURRENCY):
+        """
+        Args:
+            rates_df: DataFrame with RATE_DATE, CURR_CODE and RATE columns
+            currencies: Known currency codes (CCY lookup); the base currency
+                always converts at 1
+            base_currency: Currency the rates are quoted against
+        """
+        self.base_currency = base_currency
+        self.currencies = sorted(set(currencies or []) | {base_currency})
+        self.rates = self._normalize_rates(rates_df)
+        self.version = hashlib.sha1(
+            pd.util.hash_pandas_object(self.rates, index=False).values.tobytes()
+        ).hexdigest()[:12]
+        self._rate_cache = {}
+
+    def _normalize_rates(self, rates_df):
+        """Clean the rates table and add identity rows for the base currency"""
+        if rates_df is not None and len(rates_df) > 0:
+            rates = pd.DataFrame({
+                'rate_date': pd.to_datetime(rates_df['RATE_DATE'], errors='coerce'),
+                'currency': rates_df['CURR_CODE'].astype(str).str.strip().str.upper(),
+                'rate': pd.to_numeric(rates_df['RATE'].astype(str).str.replace(',', ''), errors='coerce')
+            })
+            rates = rates.dropna()
+            rates = rates[(rates['rate'] > 0) & (rates['currency'] != self.base_currency)]
+        else:
+            rates = pd.DataFrame({'rate_date': pd.Series(dtype='datetime64[ns]'),
+                                  'currency': pd.Series(dtype='object'),
+                                  'rate': pd.Series(dtype='float64')})
+
+        identity = pd.DataFrame({'rate_date': [pd.Timestamp('1900-01-01')],
+                                 'currency': [self.base_currency], 'rate': [1.0]})
+        rates = pd.concat([rates, identity], ignore_index=True)
+        rates['rate_date'] = rates['rate_date'].astype('datetime64[ns]')
+        rates['currency'] = rates['currency'].astype(object)
+        rates = rates.drop_duplicates(['currency', 'rate_date'], keep='last')
+        return rates.sort_values('rate_date').reset_index(drop=True)
+
+    def has_rates(self):
+        """Check whether any non-base currency rates are loaded"""
+        return (self.rates['currency'] != self.base_currency).any()
+
+    def get_missing_currencies(self, currencies=None):
+        """Currencies (default: CCY lookup) that have no rate in the table"""
+        known = set(self.rates['currency'])
+        return [c for c in (currencies if currencies is not None else self.currencies) if c not in known]
+
+    def get_rates(self, currencies, dates=None):
+        """
+        Vectorized as-of rate lookup.
+
+        Args:
+            currencies: Array-like of currency codes
+            dates: Array-like of dates (or a single date); None uses the latest rates
+
+        Returns: numpy array of rates per BASE_CURRENCY (NaN where no rate exists)
+        """
+        currencies = pd.Series(np.asarray(currencies, dtype=object)).astype(str).str.upper()
+        n = len(currencies)
+
+        if dates is None or np.ndim(dates) == 0:
+            latest = self.get_latest_rates(dates)
+            return currencies.map(latest).to_numpy(dtype='float64')
+
+        left = pd.DataFrame({
+            'date': pd.to_datetime(pd.Series(dates), errors='coerce').astype('datetime64[ns]').values,
+            'currency': currencies.astype(object).values,
+            'row': np.arange(n)
+        })
+        rates = np.full(n, np.nan)
+
+        # Undated rows fall back to the latest rate
+        undated = left['date'].isna().to_numpy()
+        if undated.any():
+            rates[undated] = currencies[undated].map(self.get_latest_rates()).to_numpy(dtype='float64')
+
+        dated = left[~undated].sort_values('date')
+        dated['currency'] = dated['currency'].astype(object)
+        if len(dated) > 0:
+            merged = pd.merge_asof(dated, self.rates, left_on='date', right_on='rate_date',
+                                   by='currency', direction='backward')
+            # Dates before the first quote use the earliest available rate
+            missing = merged['rate'].isna()
+            if missing.any():
+                earliest = self.rates.groupby('currency')['rate'].first()
+                merged.loc[missing, 'rate'] = merged.loc[missing, 'currency'].map(earliest)
+            rates[merged['row'].to_numpy()] = merged['rate'].to_numpy(dtype='float64')
+
+        return rates
+
+    def get_latest_rates(self, as_of=None):
+        """Rate per currency as of a date (latest when None), cached per rates version"""
+        key = (self.version, None if as_of is None else pd.Timestamp(as_of))
+        if key not in self._rate_cache:
+            rates = self.rates
+            if as_of is not None:
+                rates = rates[rates['rate_date'] <= pd.Timestamp(as_of)]
+            self._rate_cache[key] = rates.groupby('currency')['rate'].last()
+        return self._rate_cache[key]
+
+    def convert(self, df, amount_cols, currency_col, to_currency=BASE_CURRENCY, date_col=None, as_of=None):
+        """
+        Convert amount columns to a reporting currency in one vectorized pass.
+
+        Args:
+            df: DataFrame with amounts in mixed currencies
+            amount_cols: Column name or list of column names to convert
+            currency_col: Column holding each row's currency code
+            to_currency: Reporting currency
+            date_col: Column with the conversion date per row (as-of join)
+            as_of: Single conversion date when date_col is not given (latest if None)
+
+        Returns: DataFrame copy with converted columns (NaN where a rate is missing);
+            the currency column is left as the original currency
+        """
+        amount_cols = [amount_cols] if isinstance(amount_cols, str) else list(amount_cols)
+        dates = df[date_col].values if date_col is not None else as_of
+
+        from_rates = self.get_rates(df[currency_col].values, dates)
+        if to_currency == self.base_currency:
+            factor = 1.0 / from_rates
+        else:
+            to_rates = self.get_rates(np.full(len(df), to_currency, dtype=object), dates)
+            factor = to_rates / from_rates
+
+        result = df.copy()
+        for col in amount_cols:
+            result[col] = pd.to_numeric(result[col], errors='coerce') * factor
+        return result
+
+    def convert_totals(self, df, group_cols, amount_col, currency_col, to_currency=BASE_CURRENCY,
+                       date_col=None, as_of=None):
+        """
+        Aggregate amounts per group in a single reporting currency.
+
+        Returns: DataFrame with group columns, total, and the number of rows
+            that could not be converted (missing rates)
+        """
+        group_cols = [group_cols] if isinstance(group_cols, str) else list(group_cols)
+        # A group column may be the currency (or date) column itself; select it once
+        columns = list(dict.fromkeys(group_cols + [amount_col, currency_col] + ([date_col] if date_col else [])))
+        converted = self.convert(df[columns], amount_col, currency_col, to_currency, date_col, as_of)
+        converted['unconverted'] = converted[amount_col].isna() & df[amount_col].notna().values
+
+        totals = converted.groupby(group_cols).agg(
+            total=(amount_col, 'sum'),
+            unconverted_rows=('unconverted', 'sum')
+        ).reset_index()
+        totals['currency'] = to_currency
+        return totals
@@ -2,7 +2,48 @@ import pandas as pd
 import streamlit as st
 from pathlib import Path
 import glob
+import re
+import hashlib
+import threading
 from datetime import datetime
+from utils.revenue_store import PERIOD_COLUMNS
+
+# Data source name -> DataLoader attribute, used for per-source data versions
+DATA_SOURCES = {
+    'accounts': 'accounts_df',
+    'sector': 'sector_df',
+    'gl': 'gl_df',
+    'products': 'product_df',
+    'product_volume': 'product_volume_df',
+    'revenue': 'revenue_df',
+    'revenue_history': 'revenue_history_df',
+    'churn': 'churn_df',
+    'currency': 'currency_df',
+    'fx_rates': 'fx_rates_df',
+    'transactions': 'transactions_df'
+}
+
+def combine_data_versions(versions, sources=None):
+    """
+    Version string of some data sources.
+    
+    Args:
+        versions: Source name -> version (DataLoader.data_versions)
+        sources: Source name or list of names; None for all
+        
+    Returns: str - the source's version, or a hash of several
+    """
+    if sources is None:
+        sources = sorted(versions)
+    elif isinstance(sources, str):
+        sources = [sources]
+    
+    if len(sources) == 1:
+        return versions.get(sources[0], 'missing')
+    
+    combined = '|'.join(f"{source}:{versions.get(source, 'missing')}" for source in sorted(sources))
+    return hashlib.sha1(combined.encode()).hexdigest()[:12]
+
 
 class DataLoader:
     """
@@ -18,11 +59,17 @@ class DataLoader:
         self.product_df = None
         self.product_volume_df = None
         self.revenue_df = None
+        self.revenue_history_df = None
         self.churn_df = None
         self.transactions_df = None
+        self.currency_df = None
+        self.fx_rates_df = None
+        self.accounts_schema = None
+        self.data_versions = {}
         
         self._load_all_data()
         self._create_data_model()
+        self._compute_data_versions()
     
     def _find_csv_file(self, pattern):
         """Find CSV file matching pattern in data folder"""
@@ -76,7 +123,6 @@ class DataLoader:
         dict_path = self._find_csv_file("*accounts_datadictionary*.csv")
         if dict_path:
             self.accounts_schema = pd.read_csv(dict_path)
-            st.session_state['accounts_schema'] = self.accounts_schema
         
         # Load actual accounts data
         accounts_data_path = self._find_csv_file("accounts_data.csv")
@@ -218,6 +264,24 @@ class DataLoader:
         else:
             self.revenue_df = None
     
+    def _load_revenue_history(self):
+        """
+        Load periodic GL balance extracts (revenue_gls format) for time-series analysis.
+        The balance date comes from a period column or a date in the file name,
+        e.g. cbvas_revenue_gls_2025-10-08T15_24_46.csv; undated extracts are skipped.
+        """
+        extracts = []
+        for file_path in sorted(glob.glob(str(self.data_folder / "*revenue_gls*.csv"))):
+            df = pd.read_csv(file_path)
+            if not any(col in df.columns for col in PERIOD_COLUMNS):
+                match = re.search(r'(\d{4}-\d{2}-\d{2})', Path(file_path).name)
+                if not match:
+                    continue
+                df['PERIOD'] = pd.Timestamp(match.group(1))
+            extracts.append(df)
+        
+        self.revenue_history_df = pd.concat(extracts, ignore_index=True) if extracts else None
+    
     def _load_churn_data(self):
         """Load customer churn data"""
         file_path = self._find_csv_file("churn_customers.csv")
@@ -235,6 +299,31 @@ class DataLoader:
         else:
             self.churn_df = None
     
+    def _load_currency_data(self):
+        """Load CCY lookup table (CSV or Excel)"""
+        file_path = self._find_csv_file("*CCY LOOKUP*.csv")
+        if file_path:
+            df = pd.read_csv(file_path)
+        else:
+            files = glob.glob(str(self.data_folder / "*CCY LOOKUP*.xlsx"))
+            df = pd.read_excel(files[0]) if files else None
+        
+        if df is not None:
+            df.columns = df.columns.str.strip()
+            df = df.rename(columns={df.columns[0]: 'CCY'})
+            df['CCY'] = df['CCY'].astype(str).str.strip().str.upper()
+        self.currency_df = df
+    
+    def _load_fx_rates(self):
+        """Load dated FX rates (RATE_DATE, CURR_CODE, RATE per USD)"""
+        file_path = self._find_csv_file("fx_rates*.csv")
+        if file_path:
+            df = pd.read_csv(file_path)
+            df.columns = df.columns.str.strip()
+            self.fx_rates_df = df
+        else:
+            self.fx_rates_df = None
+    
     def _load_transactions(self):
         """Load transaction data"""
         file_path = self._find_csv_file("transactions.csv")
@@ -259,7 +348,10 @@ class DataLoader:
         self._load_product_types()
         self._load_product_volume()
         self._load_revenue_data()
+        self._load_revenue_history()
         self._load_churn_data()
+        self._load_currency_data()
+        self._load_fx_rates()
         self._load_transactions()
     
     def _create_data_model(self):
@@ -285,6 +377,53 @@ class DataLoader:
             # This is a simplified approach - actual matching would require customer master data
             pass
     
+    def _frame_version(self, df):
+        """Content hash of a dataframe (columns and values)"""
+        if df is None:
+            return 'missing'
+        digest = hashlib.sha1(','.join(map(str, df.columns)).encode())
+        try:
+            digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        except TypeError:
+            # Unhashable cell values: fall back to the string representation
+            digest.update(pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes())
+        return digest.hexdigest()[:12]
+    
+    def _compute_data_versions(self):
+        """Version every data source so caches can be invalidated per source"""
+        self.data_versions = {
+            source: self._frame_version(getattr(self, attr))
+            for source, attr in DATA_SOURCES.items()
+        }
+    
+    def get_data_version(self, sources=None):
+        """
+        Get a version string for the loaded data.
+        
+        Args:
+            sources: Source name or list of names (see DATA_SOURCES); None for all
+            
+        Returns: str - changes whenever any of the given sources change
+        """
+        return combine_data_versions(self.data_versions, sources)
+    
+    def get_memory_usage(self):
+        """
+        Get in-memory size of each loaded data source.
+        
+        Returns: DataFrame with source, rows, bytes and version
+        """
+        rows = []
+        for source, attr in DATA_SOURCES.items():
+            df = getattr(self, attr)
+            rows.append({
+                'source': source,
+                'rows': len(df) if df is not None else 0,
+                'bytes': int(df.memory_usage(deep=True).sum()) if df is not None else 0,
+                'version': self.data_versions.get(source, 'missing')
+            })
+        return pd.DataFrame(rows)
+    
     def get_accounts_data(self):
         """Get accounts dataframe"""
         return self.accounts_df
@@ -297,6 +436,10 @@ class DataLoader:
         """Get GL categories dataframe - returns revenue GL data if available"""
         return self.revenue_df if self.revenue_df is not None else self.gl_df
     
+    def get_gl_master(self):
+        """Get GL master (chart of accounts) dataframe"""
+        return self.gl_df
+    
     def get_product_data(self):
         """Get product types dataframe"""
         return self.product_df
@@ -309,10 +452,22 @@ class DataLoader:
         """Get revenue GL data"""
         return self.revenue_df
     
+    def get_revenue_history(self):
+        """Get periodic GL balance extracts (revenue_gls format with a PERIOD column)"""
+        return self.revenue_history_df
+    
     def get_churn_data(self):
         """Get churn customer data"""
         return self.churn_df
     
+    def get_currency_data(self):
+        """Get CCY lookup dataframe"""
+        return self.currency_df
+    
+    def get_fx_rates(self):
+        """Get dated FX rates dataframe"""
+        return self.fx_rates_df
+    
     def get_transactions(self):
         """Get transactions dataframe"""
         return self.transactions_df
@@ -336,3 +491,46 @@ class DataLoader:
             'churn_count': len(self.churn_df) if self.churn_df is not None else 0,
         }
         return summary
+
+
+_shared_loader = None
+_shared_loader_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+
+def get_shared_loader():
+    """
+    Process-wide DataLoader shared by every page, session and the cache warm-up.
+    Loaded on first use and never modified afterwards; reload_shared_loader()
+    replaces it with a new one, so take it again on every run rather than
+    holding on to it.
+    """
+    global _shared_loader
+    with _shared_loader_lock:
+        if _shared_loader is None:
+            _shared_loader = DataLoader()
+        return _shared_loader
+
+
+def reload_shared_loader():
+    """
+    Load the data folder into a new DataLoader and publish it as the shared loader.
+    
+    Frames and data versions are built off to the side and swapped in together,
+    so sessions still running against the previous loader keep a consistent
+    set of frames and versions until their next run.
+    
+    Returns: (previous loader, current loader, list of source names whose version
+        changed); the previous loader stays shared when nothing changed
+    """
+    global _shared_loader
+    with _reload_lock:
+        previous = get_shared_loader()
+        loader = DataLoader()
+        changed = [source for source, version in loader.data_versions.items()
+                   if previous.data_versions.get(source) != version]
+        if not changed:
+            return previous, previous, changed
+        with _shared_loader_lock:
+            _shared_loader = loader
+    return previous, loader, changed
@@ -1,17 +1,52 @@
 import pandas as pd
 import numpy as np
+import threading
 from datetime import datetime, timedelta
+from utils.gl_hierarchy import GLHierarchy
+from utils.revenue_store import RevenueStore
+from utils.currency import CurrencyConverter, BASE_CURRENCY, LOCAL_CURRENCY
+from utils.sketches import DistinctCountCube
+from utils.channels import pack_channel_flags, channel_histogram
+from utils.group_kpis import GroupKPIMatrix, quarter_periods
+from utils.search_index import AccountSearchIndex
+from utils.paged_table import (filter_codes, value_mask, sort_order, sorted_selection, page_bounds,
+                               materialize, table_filters, DERIVED_COLUMNS)
+from utils.disk_cache import disk_cache
+from utils.cache_manager import memoized, prune_stale
+from utils.data_loader import get_shared_loader, combine_data_versions
+from utils.data_scope import ACCOUNT_SCOPE_COLUMNS, GL_SCOPE_COLUMNS, PRODUCT_VOLUME_SCOPE_COLUMNS
 
 class DataProcessor:
     """
     Data processing utilities for transforming and preparing data for visualizations.
+    
+    A processor built with a DataScope (row-level security) holds only the
+    accounts inside the scope, selected by row_mask before anything else is
+    computed, so every method aggregates scoped rows. Its memoized results are
+    keyed by the scope as well (see cache_manager.memoized).
     """
     
-    def __init__(self, data_loader):
+    def __init__(self, data_loader, scope=None, row_mask=None):
         self.loader = data_loader
+        self.scope = scope
+        # Versions of the frames taken below; results are cached under these, never the loader's later ones
+        self.data_versions = dict(data_loader.data_versions)
+        self.data_version = combine_data_versions(self.data_versions)
         self.accounts_df = data_loader.get_accounts_data()
+        if row_mask is not None and self.accounts_df is not None:
+            self.accounts_df = self.accounts_df[row_mask].reset_index(drop=True)
         self.product_df = data_loader.get_product_data()
+        self._gl_hierarchies = {}
+        self._revenue_store = None
+        self._currency_converter = None
+        self._customer_sketches = None
+        self._channel_mask = None
+    
+    def get_data_version(self, sources=None):
+        """Version of the data this processor was built from (see DataLoader.get_data_version)"""
+        return combine_data_versions(self.data_versions, sources)
     
+    @memoized(sources=['accounts'])
     def get_active_email_accounts(self):
         """
         Get accounts with email addresses that are currently active.
@@ -37,6 +72,7 @@ class DataProcessor:
         
         return df
     
+    @memoized(sources=['accounts'], daily=True)
     def get_account_activity_segments(self, days_threshold=90):
         """
         Segment accounts by activity (last transaction date).
@@ -68,6 +104,45 @@ class DataProcessor:
         
         return pd.DataFrame(), pd.DataFrame()
     
+    @memoized(sources=['accounts'], daily=True)
+    def get_account_activity_counts(self, days_threshold=90):
+        """
+        Count active/inactive accounts without materializing the segments.
+        Uses the same rule as get_account_activity_segments.
+        
+        Returns: dict with active and inactive counts
+        """
+        if self.accounts_df is None or 'ACNTS_LAST_TRAN_DATE' not in self.accounts_df.columns:
+            return {'active': 0, 'inactive': 0}
+        
+        days_since_last_txn = (pd.Timestamp.now() - self.accounts_df['ACNTS_LAST_TRAN_DATE']).dt.days
+        active = int((days_since_last_txn <= days_threshold).sum())
+        return {'active': active, 'inactive': len(self.accounts_df) - active}
+    
+    @memoized(sources=['accounts'])
+    def get_products_per_customer_distribution(self):
+        """
+        Distribution of distinct products held per customer.
+        
+        Returns: DataFrame with product_count and customers
+        """
+        if self.accounts_df is None:
+            return pd.DataFrame()
+        if 'ACNTS_CLIENT_NUM' not in self.accounts_df.columns or 'ACNTS_PROD_CODE' not in self.accounts_df.columns:
+            return pd.DataFrame()
+        
+        pairs = self.accounts_df[['ACNTS_CLIENT_NUM', 'ACNTS_PROD_CODE']].dropna().drop_duplicates()
+        customer_codes, _ = pd.factorize(pairs['ACNTS_CLIENT_NUM'])
+        products_per_customer = np.bincount(customer_codes)
+        distribution = np.bincount(products_per_customer)
+        
+        product_counts = np.flatnonzero(distribution)
+        return pd.DataFrame({
+            'product_count': product_counts,
+            'customers': distribution[product_counts]
+        })
+    
+    @memoized(sources=['accounts'])
     def get_unique_customer_count(self):
         """
         Get count of unique customers (not accounts).
@@ -81,6 +156,288 @@ class DataProcessor:
         
         return 0
     
+    def get_customer_sketches(self):
+        """
+        Distinct-customer sketches per (branch, product, currency, status,
+        open flag, last transaction month) cell, built once per processor.
+
+        Returns: DistinctCountCube or None when client numbers are unavailable
+        """
+        if self._customer_sketches is None:
+            if self.accounts_df is None or 'ACNTS_CLIENT_NUM' not in self.accounts_df.columns:
+                return None
+
+            df = self.accounts_df
+            dims = [c for c in ['ACNTS_BRN_CODE', 'Product Name', 'ACNTS_CURR_CODE', 'ACNTS_CREATION_STATUS']
+                    if c in df.columns]
+            cells = df[dims + ['ACNTS_CLIENT_NUM']].copy()
+
+            if 'ACNTS_CLOSURE_DATE' in df.columns:
+                cells['is_open'] = df['ACNTS_CLOSURE_DATE'].isna()
+                dims.append('is_open')
+            if 'ACNTS_LAST_TRAN_DATE' in df.columns:
+                cells['last_txn_month'] = df['ACNTS_LAST_TRAN_DATE'].dt.to_period('M').dt.to_timestamp()
+                dims.append('last_txn_month')
+
+            self._customer_sketches = DistinctCountCube(cells, dims, 'ACNTS_CLIENT_NUM')
+
+        return self._customer_sketches
+
+    def _customer_filters(self, sketches, branch=None, product=None, currency=None, status=None,
+                          open_only=False, active_since=None):
+        """Map page filter values onto cube dimensions"""
+        filters = {
+            'ACNTS_BRN_CODE': branch,
+            'Product Name': product,
+            'ACNTS_CURR_CODE': currency,
+            'ACNTS_CREATION_STATUS': status
+        }
+        filters = {dim: value for dim, value in filters.items() if dim in sketches.dims}
+        if open_only and 'is_open' in sketches.dims:
+            filters['is_open'] = True
+        if active_since is not None and 'last_txn_month' in sketches.dims:
+            months = sketches.cells['last_txn_month']
+            filters['last_txn_month'] = months[months >= pd.Timestamp(active_since).to_period('M').to_timestamp()].unique()
+        return filters
+
+    @memoized(sources=['accounts'])
+    def count_unique_customers(self, branch=None, product=None, currency=None, status=None,
+                               open_only=False, active_since=None, exact=None):
+        """
+        Unique customers for a filtered slice, answered from the per-cell sketches.
+        Small slices are exact; large ones are HyperLogLog estimates (~2% error).
+
+        Args:
+            branch, product, currency, status: Filter values (None/'All' for every value)
+            open_only: Only count accounts without a closure date
+            active_since: Only count accounts with a transaction in or after this month
+            exact: False to always use the sketch estimate
+
+        Returns: int - number of unique customers
+        """
+        sketches = self.get_customer_sketches()
+        if sketches is None:
+            return 0
+
+        filters = self._customer_filters(sketches, branch, product, currency, status, open_only, active_since)
+        return sketches.count(exact=exact, **filters)
+
+    @memoized(sources=['accounts'])
+    def count_unique_customers_by(self, dim='ACNTS_BRN_CODE', branch=None, product=None, currency=None,
+                                  status=None, open_only=False, active_since=None):
+        """
+        Unique customers per value of one dimension for a filtered slice.
+
+        Returns: Series indexed by dimension value (empty when unavailable)
+        """
+        sketches = self.get_customer_sketches()
+        if sketches is None or dim not in sketches.dims:
+            return pd.Series(dtype='int64')
+
+        filters = self._customer_filters(sketches, branch, product, currency, status, open_only, active_since)
+        return sketches.count_by(dim, **filters)
+
+    def get_channel_mask(self):
+        """
+        Channel enablement flags packed into one uint8 bitmask per account, built once.
+
+        Returns: (numpy array of masks, list of flag columns present)
+        """
+        if self._channel_mask is None:
+            if self.accounts_df is None:
+                return np.zeros(0, dtype=np.uint8), []
+            self._channel_mask = pack_channel_flags(self.accounts_df)
+        return self._channel_mask
+
+    def get_channel_histogram(self):
+        """
+        Accounts per channel combination from a single bincount over the masks.
+
+        Returns: (numpy array indexed by bitmask, list of flag columns present)
+        """
+        mask, present = self.get_channel_mask()
+        return channel_histogram(mask), present
+
+    @memoized(sources=['accounts'])
+    def get_search_index(self):
+        """
+        N-gram search index over account number, name, email and client number,
+        built once per data version.
+
+        Returns: AccountSearchIndex or None when no account data is loaded
+        """
+        if self.accounts_df is None:
+            return None
+        return AccountSearchIndex(self.accounts_df)
+
+    def search_accounts(self, df, query):
+        """
+        Rows of df (accounts data, or any filtered subset of it) matching a search query.
+
+        Args:
+            df: Accounts rows to search within
+            query: Text matched against account number, name, email and client number
+
+        Returns: DataFrame - the matching rows of df
+        """
+        index = self.get_search_index()
+        if index is None or not (query or '').strip():
+            return df
+        return index.filter(df, query)
+
+    @memoized(sources=['accounts'])
+    def get_filter_codes(self, column):
+        """
+        Integer-coded filter column, built once per data version.
+
+        Returns: (numpy int32 codes per account, Index of values by code)
+        """
+        return filter_codes(self.accounts_df[column])
+
+    @memoized(sources=['accounts'])
+    def get_sort_order(self, column, ascending=True):
+        """
+        Account positions sorted by one column, built once per data version.
+
+        Returns: numpy int64 array of positions (missing values last)
+        """
+        return sort_order(self.accounts_df[column], ascending)
+
+    @memoized(sources=['accounts'])
+    def get_scope_mask(self, scope):
+        """
+        Row bitmap of the accounts a DataScope may see, built once per scope and
+        data version from the cached filter codes (call on the unscoped processor).
+
+        Returns: numpy bool array over the accounts data
+        """
+        if self.accounts_df is None:
+            return np.zeros(0, dtype=bool)
+        return scope.row_mask(self.accounts_df, ACCOUNT_SCOPE_COLUMNS, codes=self.get_filter_codes)
+
+    def _table_mask(self, filters, open_only=False, activity=None, days_threshold=90):
+        """Boolean row mask over accounts for equality filters, open status and activity"""
+        df = self.accounts_df
+        mask = np.ones(len(df), dtype=bool)
+        for column, value in filters:
+            if column in df.columns:
+                codes, uniques = self.get_filter_codes(column)
+                mask &= value_mask(codes, uniques, value)
+        if open_only and 'ACNTS_CLOSURE_DATE' in df.columns:
+            mask &= df['ACNTS_CLOSURE_DATE'].isna().to_numpy()
+        if activity is not None and 'ACNTS_LAST_TRAN_DATE' in df.columns:
+            # Same rule as get_account_activity_segments
+            days = (pd.Timestamp.now() - df['ACNTS_LAST_TRAN_DATE']).dt.days
+            active = (days <= days_threshold).to_numpy(dtype=bool, na_value=False)
+            mask &= active if activity == 'active' else ~active
+        return mask
+
+    @memoized(sources=['accounts'], daily=True)
+    def get_table_rows(self, filters=(), sort_by=None, ascending=True, open_only=False,
+                       activity=None, days_threshold=90):
+        """
+        Account positions for a filter state, in display order.
+
+        Args:
+            filters: Tuple of (column, value) equality filters
+            sort_by: Column to sort by (None keeps the data order)
+            ascending: Sort direction
+            open_only: Only accounts without a closure date
+            activity: 'active' or 'inactive' relative to days_threshold (None for all)
+            days_threshold: Days since last transaction for an account to count as active
+
+        Returns: numpy int64 array of positions into the accounts data
+        """
+        if self.accounts_df is None:
+            return np.zeros(0, dtype=np.int64)
+
+        mask = self._table_mask(filters, open_only, activity, days_threshold)
+        if sort_by in DERIVED_COLUMNS:
+            sort_by, reverse = DERIVED_COLUMNS[sort_by]
+            ascending = ascending != reverse
+        if sort_by is None or sort_by not in self.accounts_df.columns:
+            return np.flatnonzero(mask).astype(np.int64)
+        return sorted_selection(self.get_sort_order(sort_by, ascending), mask)
+
+    def select_table_rows(self, filters=None, sort_by=None, ascending=True, search=None, **options):
+        """
+        Account positions for the account list pages, in display order.
+
+        Args:
+            filters: Dict of column -> value equality filters (None/'All' for every value)
+            sort_by, ascending: Sort column (may be 'days_since_last_txn') and direction
+            search: Optional search text, matched through the account search index
+            **options: open_only, activity and days_threshold for get_table_rows
+
+        Returns: numpy int64 array of positions into the accounts data
+        """
+        positions = self.get_table_rows(table_filters(filters), sort_by, ascending, **options)
+
+        index = self.get_search_index() if (search or '').strip() else None
+        if index is not None:
+            positions = positions[np.isin(positions, index.search(search))]
+        return positions
+
+    @memoized(sources=['accounts'], daily=True)
+    def get_table_value_counts(self, column, filters=(), open_only=False, activity=None, days_threshold=90):
+        """
+        Accounts per value of a column for a filter state (value_counts of the
+        selected rows), counted over the cached positions and filter codes.
+
+        Args:
+            column: Column to count values of
+            filters, open_only, activity, days_threshold: As for get_table_rows
+
+        Returns: Series of account counts indexed by value, largest first
+        """
+        if self.accounts_df is None or column not in self.accounts_df.columns:
+            return pd.Series(dtype='int64')
+
+        positions = self.get_table_rows(filters, None, True, open_only, activity, days_threshold)
+        codes, uniques = self.get_filter_codes(column)
+        selected = codes[positions]
+        counts = pd.Series(np.bincount(selected[selected >= 0], minlength=len(uniques)), index=uniques)
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def count_table_values(self, column, filters=None, **options):
+        """
+        Account counts per value of a column for the account list pages.
+
+        Args:
+            column: Column to count values of
+            filters: Dict of column -> value equality filters (None/'All' for every value)
+            **options: open_only, activity and days_threshold for get_table_rows
+
+        Returns: Series of account counts indexed by value, largest first
+        """
+        return self.get_table_value_counts(column, table_filters(filters), **options)
+
+    def get_table_page(self, positions, columns=None, page=1, page_size=50):
+        """
+        One page of an account list, materializing only that page's rows and columns.
+        Positions are cached per filter state (and sort orders per column), so
+        moving between pages is a slice of a cached array.
+
+        Args:
+            positions: Positions from select_table_rows
+            columns: Columns to show (may include 'days_since_last_txn')
+            page, page_size: 1-based page number and rows per page
+
+        Returns: dict with rows (DataFrame), total, page, total_pages, start and stop
+        """
+        page, start, stop, total_pages = page_bounds(len(positions), page, page_size)
+        rows = materialize(self.accounts_df, positions[start:stop], columns) \
+            if self.accounts_df is not None else pd.DataFrame()
+        return {
+            'rows': rows,
+            'total': len(positions),
+            'page': page,
+            'total_pages': total_pages,
+            'start': start,
+            'stop': stop
+        }
+
+    @memoized(sources=['accounts', 'products'])
     def get_avg_products_per_customer(self):
         """
         Calculate average number of products per customer.
@@ -104,6 +461,8 @@ class DataProcessor:
         
         return 0
     
+    @memoized(sources=['accounts', 'churn'])
+    @disk_cache(sources=['accounts', 'churn'])
     def calculate_monthly_churn_rate(self):
         """
         Calculate monthly churn rate (lost customers month-on-month).
@@ -111,8 +470,8 @@ class DataProcessor:
         
         Returns: DataFrame with monthly churn rates
         """
-        # Try to get actual churn data first
-        churn_data = self.loader.get_churn_data()
+        # Try to get actual churn data first (bank-wide, so not for scoped processors)
+        churn_data = self.loader.get_churn_data() if self.scope is None else None
         if churn_data is not None and len(churn_data) > 0:
             # Use actual churn data from the system
             result = churn_data.copy()
@@ -178,6 +537,8 @@ class DataProcessor:
         
         return pd.DataFrame()
     
+    @memoized(sources=['accounts'])
+    @disk_cache(sources=['accounts'])
     def get_quarterly_funded_accounts(self, year=2025):
         """
         Get funded (active) accounts count by quarter for specified year.
@@ -220,7 +581,31 @@ class DataProcessor:
         
         return pd.DataFrame(quarters)
     
-    def get_campaign_revenue_analysis(self, campaign_start='2025-06-01', campaign_end='2025-09-30'):
+    def get_revenue_store(self):
+        """
+        Get the revenue time-series store built from periodic GL balance extracts.
+        
+        Returns: RevenueStore (empty when no dated extracts are loaded)
+        """
+        if self._revenue_store is None:
+            store = RevenueStore(self.loader.get_gl_master())
+            history = self.loader.get_revenue_history()
+            if self.scope is not None:
+                history = self.scope.filter(history, GL_SCOPE_COLUMNS)
+            if history is not None and len(history) > 0:
+                store.ingest(history)
+            self._revenue_store = store
+        
+        return self._revenue_store
+    
+    def has_revenue_history(self):
+        """Check whether dated GL balance extracts are available"""
+        return len(self.get_revenue_store().store) > 0
+    
+    @memoized(sources=['gl', 'revenue_history'])
+    @disk_cache(sources=['gl', 'revenue_history'])
+    def get_campaign_revenue_analysis(self, campaign_start='2025-06-01', campaign_end='2025-09-30',
+                                      baseline_start=None, branch=None, currency=None, measure='revenue'):
         """
         Analyze revenue trends during campaign period.
         Focus on non-funded income campaign (June-September 2025).
@@ -228,37 +613,37 @@ class DataProcessor:
         Args:
             campaign_start: Campaign start date
             campaign_end: Campaign end date
+            baseline_start: Start of the comparison period (defaults to campaign start,
+                i.e. campaign months only)
+            branch: Branch code or None/'All'
+            currency: Currency code or None/'All'
+            measure: Income column the MoM and baseline figures use (see
+                RevenueStore.get_campaign_analysis)
             
-        Returns: DataFrame with monthly revenue trends
+        Returns: DataFrame with monthly revenue trends, one row per month, with
+            period_type marking Baseline vs Campaign months
         """
-        # This would require transaction/revenue data which isn't in the provided schema
-        # We'll create a structure that can be populated when transaction data is available
-        
-        campaign_start = pd.Timestamp(campaign_start)
-        campaign_end = pd.Timestamp(campaign_end)
-        
-        # Generate monthly periods
-        months = pd.period_range(start=campaign_start, end=campaign_end, freq='M')
-        
-        # Placeholder structure - would be populated with actual GL transaction data
-        revenue_data = []
-        for month in months:
-            revenue_data.append({
-                'month': month.to_timestamp(),
-                'month_name': month.strftime('%B %Y'),
-                'revenue': 0,  # Would be calculated from GL transactions
-                'non_funded_income': 0  # Commission, fees, etc.
-            })
-        
-        df = pd.DataFrame(revenue_data)
-        
-        # Calculate month-on-month change
-        if len(df) > 0:
-            df['mom_change'] = df['revenue'].pct_change() * 100
-            df['mom_change_abs'] = df['revenue'].diff()
+        store = self.get_revenue_store()
+        
+        return store.get_campaign_analysis(
+            campaign_start,
+            campaign_end,
+            baseline_start=baseline_start if baseline_start is not None else campaign_start,
+            branch=branch,
+            currency=currency,
+            measure=measure
+        )
+    
+    @memoized(sources=['gl', 'revenue_history'])
+    def get_revenue_by_income_type(self, start, end, branch=None, currency=None):
+        """
+        Get monthly income split by income type (interest, fees, FX, ...).
         
-        return df
+        Returns: DataFrame indexed by month with one column per income type
+        """
+        return self.get_revenue_store().get_income_by_type(start, end, branch, currency)
     
+    @memoized(sources=['accounts', 'products'])
     def get_account_balances_summary(self):
         """
         Get summary of account balances by product type and currency.
@@ -291,25 +676,218 @@ class DataProcessor:
         
         return pd.DataFrame()
     
+    @memoized(sources=['accounts', 'currency', 'fx_rates'], daily=True)
+    def get_group_kpi_matrix(self, days_threshold=90, window=None, year=None, product=None, currency=None):
+        """
+        KPI-by-group matrices for every branch, product and currency, computed
+        in one grouped pass per dimension (memoized per parameter set and day).
+        
+        Args:
+            days_threshold: Days since last transaction for an account to count as active
+            window: (start, end) activity window, e.g. a campaign period
+            year: Adds Q1-Q3 funded account counts for this year
+            product: Restrict to one product (None/'All' for every product)
+            currency: Restrict to one currency (None/'All' for every currency)
+            
+        Returns: GroupKPIMatrix or None when no account data is loaded
+        """
+        if self.accounts_df is None:
+            return None
+        
+        window = tuple(str(pd.Timestamp(d).date()) for d in window) if window is not None else None
+        df = self.accounts_df
+        if product is not None and product != 'All' and 'Product Name' in df.columns:
+            df = df[df['Product Name'] == product]
+        if currency is not None and currency != 'All' and 'ACNTS_CURR_CODE' in df.columns:
+            df = df[df['ACNTS_CURR_CODE'] == currency]
+        
+        # Balances in USD when FX rates are available, so branch totals are comparable
+        balance = None
+        converter = self.get_currency_converter()
+        if converter.has_rates() and 'BASE_CURR_BAL' in df.columns and 'ACNTS_CURR_CODE' in df.columns:
+            balance = converter.convert(df[['BASE_CURR_BAL', 'ACNTS_CURR_CODE']], 'BASE_CURR_BAL',
+                                        'ACNTS_CURR_CODE')['BASE_CURR_BAL'].to_numpy()
+        
+        return GroupKPIMatrix(
+            df,
+            days_threshold=days_threshold,
+            window=window,
+            periods=quarter_periods(year) if year is not None else None,
+            balance=balance
+        )
+    
+    @memoized(sources=['accounts', 'currency', 'fx_rates'], daily=True)
     def get_branch_performance(self):
         """
         Get account statistics by branch.
         
-        Returns: DataFrame with branch-level metrics
+        Returns: DataFrame with branch-level metrics and rankings
         """
-        if self.accounts_df is None:
+        matrix = self.get_group_kpi_matrix()
+        if matrix is None or 'ACNTS_BRN_CODE' not in matrix.dims:
             return pd.DataFrame()
         
-        df = self.accounts_df.copy()
+        branch_stats = matrix.get('ACNTS_BRN_CODE', with_ranks=True).reset_index()
+        return branch_stats.rename(columns={'ACNTS_BRN_CODE': 'branch_code'})
+    
+    def get_currency_converter(self):
+        """
+        Get the FX converter built from the CCY lookup and the local rates file.
         
-        if 'ACNTS_BRN_CODE' in df.columns:
-            branch_stats = df.groupby('ACNTS_BRN_CODE').agg({
-                'ACNTS_ACCOUNT_NUMBER': 'count',
-                'ACNTS_CLIENT_NUM': 'nunique'
-            }).reset_index()
+        Returns: CurrencyConverter
+        """
+        if self._currency_converter is None:
+            currency_df = self.loader.get_currency_data()
+            currencies = currency_df['CCY'].tolist() if currency_df is not None else []
+            self._currency_converter = CurrencyConverter(self.loader.get_fx_rates(), currencies)
+        
+        return self._currency_converter
+    
+    def get_gl_hierarchy(self, reporting_currency=None):
+        """
+        Get the GL hierarchy with revenue balances joined by GL account code.
+        Built once per processor and reporting currency; subtree totals are
+        O(1) lookups afterwards.
+        
+        Args:
+            reporting_currency: Convert balances to this currency before rollup
+                (None keeps each balance in its own currency)
+        
+        Returns: GLHierarchy or None if the GL master is not loaded
+        """
+        converter = self.get_currency_converter()
+        key = (reporting_currency, converter.version if reporting_currency else None)
+        
+        if key not in self._gl_hierarchies:
+            gl_master = self.loader.get_gl_master()
+            if gl_master is None or 'Gl Number' not in gl_master.columns:
+                return None
             
-            branch_stats.columns = ['branch_code', 'total_accounts', 'unique_customers']
+            balances = self.loader.get_revenue_data()
+            if self.scope is not None:
+                balances = self.scope.filter(balances, GL_SCOPE_COLUMNS)
+            if reporting_currency and balances is not None:
+                balances = converter.convert(
+                    balances, 'SUM(GLBALH_AC_BAL)', 'GLBALH_CURR_CODE', to_currency=reporting_currency
+                )
+            self._gl_hierarchies[key] = GLHierarchy(gl_master, balances)
+        
+        return self._gl_hierarchies[key]
+    
+    @memoized(sources=['gl', 'revenue', 'currency', 'fx_rates'])
+    @disk_cache(sources=['gl', 'revenue', 'currency', 'fx_rates'])
+    def get_income_breakdown(self, level='L2', branch=None, currency=None, non_funded_only=True,
+                             reporting_currency=None):
+        """
+        Get income balances rolled up to a GL hierarchy level.
+        
+        Args:
+            level: Hierarchy level to report ('L1', 'L2' or 'L3')
+            branch: Branch code or None/'All' for every branch
+            currency: Currency code or None/'All' for every currency
+            non_funded_only: Restrict to non-funded income categories
+            reporting_currency: Report balances in this currency (None = as booked)
             
-            return branch_stats
+        Returns: DataFrame with GL code, name, category and balance
+        """
+        hierarchy = self.get_gl_hierarchy(reporting_currency)
+        if hierarchy is None:
+            return pd.DataFrame()
         
-        return pd.DataFrame()
+        if non_funded_only:
+            return hierarchy.get_non_funded_income(level=level, branch=branch, currency=currency)
+        
+        return hierarchy.rollup(level=level, gl_type='I', branch=branch, currency=currency)
+    
+    @memoized(sources=['accounts', 'currency', 'fx_rates'])
+    def get_balance_totals(self, group_by='ACNTS_BRN_CODE', reporting_currency=BASE_CURRENCY,
+                           amount_col='BASE_CURR_BAL', as_of=None):
+        """
+        Get account balance totals per group in a single reporting currency.
+        BASE_CURR_BAL is held in the account currency (ACNTS_CURR_CODE).
+        
+        Args:
+            group_by: Column or list of columns to group by (e.g. branch, product)
+            reporting_currency: Currency to report totals in
+            amount_col: Balance column to convert
+            as_of: Rate date (latest rates if None)
+            
+        Returns: DataFrame with group columns, total and unconverted_rows
+        """
+        if self.accounts_df is None or amount_col not in self.accounts_df.columns \
+                or 'ACNTS_CURR_CODE' not in self.accounts_df.columns:
+            return pd.DataFrame()
+        
+        group_cols = [group_by] if isinstance(group_by, str) else list(group_by)
+        return self.get_currency_converter().convert_totals(
+            self.accounts_df, group_cols, amount_col, 'ACNTS_CURR_CODE',
+            to_currency=reporting_currency, as_of=as_of
+        )
+    
+    @memoized(sources=['product_volume', 'currency', 'fx_rates'])
+    def get_product_volume_totals(self, reporting_currency=BASE_CURRENCY, as_of=None):
+        """
+        Get product volume balances in a reporting currency.
+        TOTAL_LOCAL_CURR_BAL in product_volume.csv is held in the local currency.
+        
+        Returns: DataFrame with product code, name, accounts and converted balance
+        """
+        product_volume = self.loader.get_product_volume()
+        if product_volume is None or 'TOTAL_LOCAL_CURR_BAL' not in product_volume.columns:
+            return pd.DataFrame()
+        
+        df = product_volume.copy() if self.scope is None else self.scope.filter(product_volume, PRODUCT_VOLUME_SCOPE_COLUMNS)
+        df['currency'] = LOCAL_CURRENCY
+        df = self.get_currency_converter().convert(
+            df, 'TOTAL_LOCAL_CURR_BAL', 'currency', to_currency=reporting_currency, as_of=as_of
+        )
+        
+        return df.rename(columns={'TOTAL_LOCAL_CURR_BAL': f'TOTAL_BAL_{reporting_currency}'}).drop(columns='currency')
+
+
+_shared_processors = {}
+_scoped_processors = {}
+_shared_processors_lock = threading.Lock()
+
+
+def get_shared_processor(loader=None, scope=None):
+    """
+    Process-wide DataProcessor shared by every page and session, rebuilt when
+    the loader's data version changes (memoized results for older versions
+    are dropped at the same time).
+    
+    Args:
+        loader: DataLoader (default: the shared loader)
+        scope: DataScope of the user (utils.data_scope.current_data_scope); None
+            for unrestricted data. Scoped processors are shared by every user
+            with the same scope and built from the unscoped processor's row bitmap.
+    """
+    loader = loader if loader is not None else get_shared_loader()
+    version = loader.get_data_version()
+    
+    with _shared_processors_lock:
+        processor = _shared_processors.get(id(loader))
+        if processor is None or processor.loader is not loader or processor.data_version != version:
+            processor = DataProcessor(loader)
+            _shared_processors[id(loader)] = processor
+            for key in [key for key in _scoped_processors if key[0] == id(loader)]:
+                del _scoped_processors[key]
+            prune_stale(loader)
+        if scope is None:
+            return processor
+        
+        scoped = _scoped_processors.get((id(loader), scope))
+        if scoped is None or scoped.loader is not loader or scoped.data_version != version:
+            scoped = DataProcessor(loader, scope, processor.get_scope_mask(scope))
+            _scoped_processors[(id(loader), scope)] = scoped
+        return scoped
+
+
+def release_shared_processors(loader):
+    """Drop the shared processors (any scope) built over a loader that is no longer shared"""
+    with _shared_processors_lock:
+        processor = _shared_processors.get(id(loader))
+        if processor is not None and processor.loader is loader:
+            del _shared_processors[id(loader)]
+        for key in [key for key, scoped in _scoped_processors.items() if scoped.loader is loader]:
+            del _scoped_processors[key]
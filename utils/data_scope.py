@@ -0,0 +1,205 @@
+import json
+import re
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.database import get_user_data_scopes
+from utils.auth import is_authenticated
+from utils.db_events import db_events
+
+# Channel the user_data_scope trigger (migration 1.4.0) publishes on when scopes change
+SCOPES_CHANNEL = 'data_scopes_changed'
+
+# Seconds between reloads when no LISTEN connection is available, and between
+# attempts while the table has never been read
+SCOPES_REFRESH_SECONDS = 300
+SCOPES_RETRY_SECONDS = 10
+
+# Columns each scope dimension restricts, per data set (a row matches if any listed column does)
+ACCOUNT_SCOPE_COLUMNS = {
+    'branches': ['ACNTS_BRN_CODE'],
+    'products': ['ACNTS_PROD_CODE', 'Product Name'],
+    'currencies': ['ACNTS_CURR_CODE']
+}
+GL_SCOPE_COLUMNS = {
+    'branches': ['GLBALH_BRN_CODE'],
+    'products': [],  # GL balances aren't by product
+    'currencies': ['GLBALH_CURR_CODE']
+}
+PRODUCT_VOLUME_SCOPE_COLUMNS = {
+    'branches': [],  # bank-wide totals per product
+    'products': ['ACNTS_PROD_CODE', 'PRODUCT_NAME'],
+    'currencies': []
+}
+
+# Codes written with thousands separators in some extracts (product_volume.csv)
+THOUSANDS = re.compile(r'\d{1,3}(,\d{3})+')
+
+
+def scope_value(value):
+    """Comparable text of a scope or data value (product 2001, 2001.0, '2001' and '2,001' all match)"""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text.replace(',', '') if THOUSANDS.fullmatch(text) else text
+
+
+class DataScope(namedtuple('DataScope', ['branches', 'products', 'currencies'])):
+    """
+    Values a user may see per dimension: a sorted tuple of scope_value
+    strings, or None when the dimension is unrestricted.
+
+    Scopes are hashable and compare by value, so users with the same scope
+    share one scoped DataProcessor and its cached results.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_lists(cls, branches=None, products=None, currencies=None):
+        """Scope from JSON lists (or JSON text); None when nothing is restricted"""
+        dimensions = []
+        for values in (branches, products, currencies):
+            if isinstance(values, str):
+                values = json.loads(values) if values.strip() else None
+            dimensions.append(None if values is None else tuple(sorted({scope_value(v) for v in values})))
+        if all(values is None for values in dimensions):
+            return None
+        return cls(*dimensions)
+
+    def row_mask(self, df, columns, codes=None):
+        """
+        Rows of df inside the scope.
+
+        Args:
+            df: Frame to restrict
+            columns: Dimension -> candidate columns (ACCOUNT_SCOPE_COLUMNS, GL_SCOPE_COLUMNS)
+            codes: Optional callable column -> (codes, uniques) returning cached
+                integer codes (DataProcessor.get_filter_codes)
+
+        Returns: numpy bool array; dimensions with none of their columns in df match nothing
+        """
+        mask = np.ones(len(df), dtype=bool)
+        for dimension, candidates in columns.items():
+            allowed = getattr(self, dimension)
+            if allowed is None:
+                continue
+            present = [column for column in candidates if column in df.columns]
+            matched = np.zeros(len(df), dtype=bool)
+            for column in present:
+                column_codes, uniques = codes(column) if codes is not None else pd.factorize(df[column])
+                allowed_codes = np.flatnonzero(pd.Index(uniques).map(scope_value).isin(allowed))
+                matched |= np.isin(column_codes, allowed_codes)
+            mask &= matched
+        return mask
+
+    def filter(self, df, columns):
+        """Rows of df inside the scope (None passes through)"""
+        if df is None:
+            return None
+        return df[self.row_mask(df, columns)]
+
+    def describe(self):
+        """Short text of the restricted dimensions, e.g. 'branches 12, 15; currencies USD'"""
+        return '; '.join(f"{dimension} {', '.join(values) or 'none'}"
+                         for dimension, values in self._asdict().items() if values is not None)
+
+
+# Scope of visitors who aren't logged in, and of everyone while the
+# user_data_scope table hasn't been read: fail closed
+NO_ACCESS = DataScope((), (), ())
+
+
+class DataScopeCache:
+    """
+    Row-level data scopes from the user_data_scope table.
+
+    All scopes are loaded once per process and reloaded when the table's
+    trigger NOTIFYs SCOPES_CHANNEL (PostgreSQL), otherwise every
+    SCOPES_REFRESH_SECONDS. Until the table has been read once every user
+    gets NO_ACCESS; after that a failed reload keeps the previous scopes.
+    """
+
+    def __init__(self):
+        self._scopes = {}
+        self._loaded = False
+        self._loaded_at = None
+        self._subscribed = False
+        self._lock = threading.Lock()
+
+    def reload(self):
+        """Re-read the user_data_scope table"""
+        try:
+            scopes = {row.user_id: DataScope.from_lists(row.branches, row.products, row.currencies)
+                      for row in get_user_data_scopes()}
+        except Exception:
+            scopes = None
+        with self._lock:
+            self._loaded_at = time.monotonic()
+            if scopes is not None:
+                self._scopes = {user_id: scope for user_id, scope in scopes.items() if scope is not None}
+                self._loaded = True
+
+    def _ensure_loaded(self):
+        interval = SCOPES_REFRESH_SECONDS if self._loaded else SCOPES_RETRY_SECONDS
+        if self._loaded_at is not None and (self._loaded and self._subscribed and db_events.listening
+                                            or time.monotonic() - self._loaded_at < interval):
+            return
+        if not self._subscribed:
+            try:
+                self._subscribed = db_events.subscribe(SCOPES_CHANNEL, lambda payload: self.reload(),
+                                                       on_connect=self.reload)
+            except Exception:
+                pass
+        self.reload()
+
+    @property
+    def loaded(self):
+        """Whether the user_data_scope table has been read"""
+        return self._loaded
+
+    def scope(self, user_id):
+        """DataScope of a user, or None when the user sees all data"""
+        self._ensure_loaded()
+        if not self._loaded:
+            return NO_ACCESS
+        return self._scopes.get(user_id)
+
+
+# Process-wide data scope cache
+data_scope_cache = DataScopeCache()
+
+
+def current_data_scope():
+    """
+    DataScope of the logged-in user (None for unrestricted users).
+
+    Visitors who aren't logged in get NO_ACCESS, so logging out never
+    widens what a restricted user can see.
+    """
+    if not is_authenticated() or st.session_state.get('user_id') is None:
+        return NO_ACCESS
+    return data_scope_cache.scope(st.session_state.user_id)
+
+
+def show_data_scope(scope):
+    """
+    Sidebar note of a restricted user's data scope. Under NO_ACCESS the page
+    stops after saying why it has no data to show.
+    """
+    if scope is None:
+        return
+    if scope == NO_ACCESS:
+        if not is_authenticated():
+            st.warning("🔒 Account data is shown to logged-in users only. Please log in to see this dashboard.")
+        elif not data_scope_cache.loaded:
+            st.warning("🔒 Data access rights couldn't be loaded yet, so no account data is shown. "
+                       "Try again in a moment.")
+        else:
+            st.warning("🔒 Your data scope doesn't include any branches, products or currencies. "
+                       "Contact an administrator for access.")
+        st.stop()
+    st.sidebar.caption(f"🔒 Data limited to {scope.describe()}")
@@ -4,7 +4,8 @@ Handles PostgreSQL connections, session management, and ORM setup
 """
 
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, Text, TIMESTAMP, text
+from contextlib import contextmanager
+from sqlalchemy import tuple_, insert, update, bindparam, create_engine, Column, Integer, BigInteger, String, Boolean, DateTime, Text, TIMESTAMP, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.sql import func
@@ -14,6 +15,12 @@ import streamlit as st
 # Base class for ORM models
 Base = declarative_base()
 
+# Connection pool sizing (per process)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds before a connection is replaced
+
 # Database connection
 def get_database_url():
     """Get database URL from environment variables"""
@@ -30,43 +37,76 @@ def get_database_engine():
     engine = create_engine(
         database_url,
         pool_pre_ping=True,  # Verify connections before using
-        pool_size=5,
-        max_overflow=10,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
         echo=False  # Set to True for SQL debugging
     )
+
+    # Once per process: one query when the schema is current, migrations otherwise
+    from utils.migrations import DB_AUTO_MIGRATE, ensure_schema
+    if DB_AUTO_MIGRATE:
+        ensure_schema(engine)
     return engine
 
+@st.cache_resource
+def get_session_factory():
+    """
+    Create and cache the session factory.
+    
+    Objects stay readable after commit (expire_on_commit=False), so helpers
+    can return rows from a session that has already been closed.
+    """
+    return sessionmaker(bind=get_database_engine(), autocommit=False, autoflush=False, expire_on_commit=False)
+
 def get_session() -> Session:
     """Get database session"""
-    engine = get_database_engine()
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return SessionLocal()
+    return get_session_factory()()
+
+@contextmanager
+def unit_of_work():
+    """
+    Session for a group of related operations, sharing one connection and transaction.
+    
+    Commits when the block exits normally, rolls back on error, then closes.
+    Pass the session to the helpers below (session=...) to include them.
+    
+    Usage:
+        with unit_of_work() as session:
+            user = create_user(..., session=session)
+            log_user_action(user.user_id, user.username, 'register', session=session)
+    """
+    session = get_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+@contextmanager
+def _session_scope(session: Session = None):
+    """The caller's unit of work, or a new one committed when the helper finishes"""
+    if session is not None:
+        yield session
+    else:
+        with unit_of_work() as session:
+            yield session
 
 def init_database():
-    """Initialize database schema from schema.sql file"""
+    """Apply pending migrations from database/migrations (see utils/migrations.py)"""
+    from utils.migrations import migrate
     try:
         engine = get_database_engine()
-        
-        # Read and execute schema.sql
-        schema_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'schema.sql')
-        
-        if os.path.exists(schema_path):
-            with open(schema_path, 'r') as f:
-                schema_sql = f.read()
-            
-            # Execute schema SQL
-            with engine.connect() as connection:
-                # Split by semicolon and execute each statement
-                statements = [s.strip() for s in schema_sql.split(';') if s.strip()]
-                for statement in statements:
-                    if statement:
-                        connection.execute(text(statement))
-                connection.commit()
-            
-            return True, "Database initialized successfully"
-        else:
-            return False, f"Schema file not found: {schema_path}"
-            
+        if engine.dialect.name != 'postgresql':
+            return False, "Migrations require PostgreSQL"
+        applied = migrate(engine)
+        if not applied:
+            return True, "Database schema is up to date"
+        return True, f"Applied {len(applied)} migration(s): {', '.join(m.version for m in applied)}"
     except Exception as e:
         return False, f"Database initialization error: {str(e)}"
 
@@ -80,7 +120,7 @@ def test_database_connection():
     except Exception as e:
         return False, f"Database connection failed: {str(e)}"
 
-# ORM Models (matching schema.sql)
+# ORM Models (matching database/migrations)
 
 class User(Base):
     """User model for authentication"""
@@ -166,39 +206,109 @@ class AuditLog(Base):
     user_agent = Column(Text)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
+class ExportJob(Base):
+    """Background export request and its artifact"""
+    __tablename__ = 'export_jobs'
+    
+    job_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer)
+    username = Column(String(100))
+    export_name = Column(String(100), nullable=False)
+    dashboard = Column(String(100))
+    export_format = Column(String(20), nullable=False, default='csv.gz')
+    parameters = Column(Text)  # JSON stored as text
+    status = Column(String(20), nullable=False, default='queued')
+    rows_total = Column(Integer)
+    rows_written = Column(Integer, default=0)
+    artifact_path = Column(Text)
+    artifact_bytes = Column(BigInteger)
+    error = Column(Text)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    started_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
+
+class UserSession(Base):
+    """Server-side login session (token stored as a SHA-256 hash)"""
+    __tablename__ = 'user_sessions'
+    
+    session_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    session_token = Column(String(255), unique=True, nullable=False)
+    ip_address = Column(String(50))
+    user_agent = Column(Text)
+    expires_at = Column(TIMESTAMP, nullable=False)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    last_activity = Column(TIMESTAMP, default=datetime.utcnow)
+
+class UserDataScope(Base):
+    """Row-level data scope of a user (JSON lists; NULL = unrestricted)"""
+    __tablename__ = 'user_data_scope'
+    
+    user_id = Column(Integer, primary_key=True)
+    branches = Column(Text)  # JSON stored as text
+    products = Column(Text)
+    currencies = Column(Text)
+    updated_by = Column(String(100))
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # Helper functions for common queries
+# Each takes an optional session: pass one from unit_of_work() to share its
+# connection and transaction, otherwise the helper commits on its own.
 
-def get_user_by_username(username: str):
+def get_user_by_username(username: str, session: Session = None):
     """Get user by username"""
-    session = get_session()
-    try:
-        user = session.query(User).filter(User.username == username).first()
-        return user
-    finally:
-        session.close()
+    with _session_scope(session) as s:
+        return s.query(User).filter(User.username == username).first()
 
-def get_user_by_email(email: str):
+def get_user_by_email(email: str, session: Session = None):
     """Get user by email"""
-    session = get_session()
-    try:
-        user = session.query(User).filter(User.email == email).first()
-        return user
-    finally:
-        session.close()
+    with _session_scope(session) as s:
+        return s.query(User).filter(User.email == email).first()
 
-def get_user_by_id(user_id: int):
+def get_user_by_id(user_id: int, session: Session = None):
     """Get user by ID"""
-    session = get_session()
-    try:
-        user = session.query(User).filter(User.user_id == user_id).first()
-        return user
-    finally:
-        session.close()
+    with _session_scope(session) as s:
+        return s.query(User).filter(User.user_id == user_id).first()
+
+def find_user_conflicts(username: str, email: str, session: Session = None) -> tuple[bool, bool]:
+    """
+    Check whether a username or email is already registered, in one query
+    Returns: (username_taken, email_taken)
+    """
+    with _session_scope(session) as s:
+        rows = s.query(User.username, User.email).filter(
+            (User.username == username) | (User.email == email)
+        ).all()
+        return any(row.username == username for row in rows), any(row.email == email for row in rows)
+
+def find_existing_users(usernames: list, emails: list, session: Session = None) -> tuple[set, set]:
+    """
+    Which of many usernames and emails are already registered, in one query
+    Returns: (taken usernames, taken emails)
+    """
+    with _session_scope(session) as s:
+        rows = s.query(User.username, User.email).filter(
+            User.username.in_(usernames) | User.email.in_(emails)
+        ).all()
+        return {row.username for row in rows} & set(usernames), {row.email for row in rows} & set(emails)
 
-def create_user(username: str, email: str, password_hash: str, role_level: int = 4, **kwargs):
+def bulk_create_users(users: list, session: Session = None) -> list:
+    """
+    Insert many users in one INSERT ... RETURNING (every dict needs the same keys)
+    Returns: list of (user_id, username) in the order of users
+    """
+    if not users:
+        return []
+    with _session_scope(session) as s:
+        return s.execute(
+            insert(User).returning(User.user_id, User.username, sort_by_parameter_order=True),
+            users
+        ).all()
+
+def create_user(username: str, email: str, password_hash: str, role_level: int = 4, session: Session = None, **kwargs):
     """Create new user"""
-    session = get_session()
-    try:
+    with _session_scope(session) as s:
         user = User(
             username=username,
             email=email,
@@ -206,90 +316,284 @@ def create_user(username: str, email: str, password_hash: str, role_level: int =
             role_level=role_level,
             **kwargs
         )
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+        s.add(user)
+        s.flush()  # assigns user_id
         return user
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
 
-def update_user_login(user_id: int):
+def update_user_login(user_id: int, session: Session = None):
     """Update user login timestamp and count"""
-    session = get_session()
-    try:
-        user = session.query(User).filter(User.user_id == user_id).first()
-        if user:
-            user.last_login = datetime.utcnow()
-            user.login_count = (user.login_count or 0) + 1
-            session.commit()
-    finally:
-        session.close()
+    with _session_scope(session) as s:
+        s.query(User).filter(User.user_id == user_id).update({
+            'last_login': datetime.utcnow(),
+            'login_count': func.coalesce(User.login_count, 0) + 1
+        }, synchronize_session=False)
+
+def record_login(user_id: int, username: str, session: Session = None):
+    """
+    Update login timestamp and count and write the 'login' audit entry.
+    
+    On PostgreSQL both writes are one statement (a data-modifying CTE), so a
+    login costs a single round-trip; other databases run an UPDATE and an
+    INSERT in the same transaction.
+    """
+    now = datetime.utcnow()
+    with _session_scope(session) as s:
+        if s.get_bind().dialect.name == 'postgresql':
+            s.execute(text("""
+                WITH login AS (
+                    UPDATE users
+                    SET last_login = :now, login_count = COALESCE(login_count, 0) + 1
+                    WHERE user_id = :user_id
+                    RETURNING user_id
+                )
+                INSERT INTO audit_log (user_id, username, action, created_at)
+                SELECT user_id, :username, 'login', :now FROM login
+            """), {'user_id': user_id, 'username': username, 'now': now})
+        else:
+            update_user_login(user_id, session=s)
+            s.add(AuditLog(user_id=user_id, username=username, action='login', created_at=now))
+
+def log_user_action(user_id: int, username: str, action: str, dashboard: str = None, details: str = None,
+                    session: Session = None):
+    """
+    Log user action to audit trail.
+    
+    Inside a unit of work the entry is part of its transaction; otherwise it
+    is queued for the background audit writer (utils.audit) and never blocks.
+    """
+    if session is None:
+        from utils.audit import audit_writer  # utils.audit imports this module
+        audit_writer.log(user_id, username, action, dashboard, details)
+        return
 
-def log_user_action(user_id: int, username: str, action: str, dashboard: str = None, details: str = None):
-    """Log user action to audit trail"""
-    session = get_session()
     try:
-        log_entry = AuditLog(
-            user_id=user_id,
-            username=username,
-            action=action,
-            dashboard_accessed=dashboard,
-            details=details
-        )
-        session.add(log_entry)
-        session.commit()
-    except Exception as e:
-        session.rollback()
+        # Savepoint, so a failed entry doesn't abort the caller's transaction
+        with session.begin_nested():
+            session.add(AuditLog(
+                user_id=user_id,
+                username=username,
+                action=action,
+                dashboard_accessed=dashboard,
+                details=details
+            ))
+    except Exception:
         # Don't fail if logging fails
         pass
-    finally:
-        session.close()
 
-def get_user_notifications(user_id: int, unread_only: bool = False):
+def maintain_audit_log(months_ahead: int = 3, retain_months: int = 24) -> bool:
+    """
+    Create upcoming monthly audit_log partitions and drop those past retention.
+    Returns False (nothing done) on databases other than PostgreSQL.
+    """
+    engine = get_database_engine()
+    if engine.dialect.name != 'postgresql':
+        return False
+    with engine.begin() as connection:
+        connection.execute(text("SELECT maintain_audit_log(:months_ahead, :retain_months)"),
+                           {'months_ahead': months_ahead, 'retain_months': retain_months})
+    return True
+
+def get_roles(session: Session = None):
+    """Get all roles, ordered by level"""
+    with _session_scope(session) as s:
+        return s.query(Role).order_by(Role.role_level).all()
+
+def update_role_permissions(role_level: int, permissions: str, session: Session = None) -> bool:
+    """Replace a role's permissions document (JSON text); False if the role doesn't exist"""
+    with _session_scope(session) as s:
+        updated = s.query(Role).filter(Role.role_level == role_level).update(
+            {'permissions': permissions}, synchronize_session=False)
+        return updated == 1
+
+def get_user_data_scopes(session: Session = None):
+    """Get every user's row-level data scope"""
+    with _session_scope(session) as s:
+        return s.query(UserDataScope).all()
+
+def create_user_session(user_id: int, token_hash: str, expires_at: datetime, ip_address: str = None,
+                        user_agent: str = None, session: Session = None):
+    """Record a login session"""
+    with _session_scope(session) as s:
+        user_session = UserSession(
+            user_id=user_id,
+            session_token=token_hash,
+            expires_at=expires_at,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+        s.add(user_session)
+        s.flush()
+        return user_session
+
+def get_active_user_session(token_hash: str, session: Session = None):
+    """
+    Active, unexpired session for a token hash, with its (active) user
+    Returns: (UserSession, User) or None
+    """
+    with _session_scope(session) as s:
+        return s.query(UserSession, User).join(User, User.user_id == UserSession.user_id).filter(
+            UserSession.session_token == token_hash,
+            UserSession.is_active == True,
+            UserSession.expires_at > datetime.utcnow(),
+            User.is_active == True
+        ).first()
+
+def deactivate_user_session(token_hash: str, session: Session = None):
+    """End a login session"""
+    with _session_scope(session) as s:
+        s.query(UserSession).filter(UserSession.session_token == token_hash).update(
+            {'is_active': False}, synchronize_session=False)
+
+def touch_user_sessions(activity: dict, session: Session = None):
+    """Record last_activity for many sessions in one statement; activity maps token hash -> datetime"""
+    if not activity:
+        return
+    with _session_scope(session) as s:
+        s.connection().execute(
+            update(UserSession.__table__)
+            .where(UserSession.__table__.c.session_token == bindparam('token'))
+            .values(last_activity=bindparam('seen')),
+            [{'token': token, 'seen': seen} for token, seen in activity.items()]
+        )
+
+def get_user_notifications(user_id: int, unread_only: bool = False, session: Session = None):
     """Get user notifications"""
-    session = get_session()
-    try:
-        query = session.query(Notification).filter(Notification.user_id == user_id)
+    with _session_scope(session) as s:
+        query = s.query(Notification).filter(Notification.user_id == user_id)
         if unread_only:
             query = query.filter(Notification.is_read == False)
-        notifications = query.order_by(Notification.created_at.desc()).all()
-        return notifications
-    finally:
-        session.close()
+        return query.order_by(Notification.created_at.desc()).all()
+
+def count_unread_notifications(user_id: int, session: Session = None) -> int:
+    """Number of unread notifications for a user"""
+    with _session_scope(session) as s:
+        return s.query(func.count(Notification.notification_id)).filter(
+            Notification.user_id == user_id,
+            Notification.is_read == False
+        ).scalar()
 
-def mark_notification_read(notification_id: int):
+def get_notifications_page(user_id: int, before: tuple = None, limit: int = 20, unread_only: bool = False,
+                           session: Session = None):
+    """
+    One page of a user's notifications, newest first (keyset pagination)
+    
+    Args:
+        user_id: Notification owner
+        before: (created_at, notification_id) of the last row on the previous page, None for the first page
+        limit: Page size
+        unread_only: Only unread notifications
+    
+    Returns: list of Notification
+    """
+    with _session_scope(session) as s:
+        query = s.query(Notification).filter(Notification.user_id == user_id)
+        if unread_only:
+            query = query.filter(Notification.is_read == False)
+        if before is not None:
+            query = query.filter(tuple_(Notification.created_at, Notification.notification_id) < tuple_(*before))
+        return query.order_by(
+            Notification.created_at.desc(), Notification.notification_id.desc()
+        ).limit(limit).all()
+
+def mark_notification_read(notification_id: int, session: Session = None):
     """Mark notification as read"""
-    session = get_session()
-    try:
-        notification = session.query(Notification).filter(
+    with _session_scope(session) as s:
+        s.query(Notification).filter(
             Notification.notification_id == notification_id
-        ).first()
-        if notification:
-            notification.is_read = True
-            notification.read_at = datetime.utcnow()
-            session.commit()
-    finally:
-        session.close()
+        ).update({'is_read': True, 'read_at': datetime.utcnow()}, synchronize_session=False)
 
-def get_user_bookmarks(user_id: int, dashboard_name: str = None):
+def mark_all_notifications_read(user_id: int, session: Session = None) -> int:
+    """Mark every unread notification of a user as read; returns the number updated"""
+    with _session_scope(session) as s:
+        return s.query(Notification).filter(
+            Notification.user_id == user_id,
+            Notification.is_read == False
+        ).update({'is_read': True, 'read_at': datetime.utcnow()}, synchronize_session=False)
+
+def create_notification(user_id: int, title: str, message: str, notification_type: str = 'info',
+                        priority: int = 3, link_to_dashboard: str = None, session: Session = None):
+    """Create an in-app notification for a user"""
+    with _session_scope(session) as s:
+        notification = Notification(
+            user_id=user_id,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            priority=priority,
+            link_to_dashboard=link_to_dashboard
+        )
+        s.add(notification)
+        s.flush()
+        return notification
+
+def create_export_job(user_id: int, username: str, export_name: str, export_format: str,
+                      parameters: str = None, dashboard: str = None, session: Session = None):
+    """Record a queued export job"""
+    with _session_scope(session) as s:
+        job = ExportJob(
+            user_id=user_id,
+            username=username,
+            export_name=export_name,
+            export_format=export_format,
+            parameters=parameters,
+            dashboard=dashboard,
+            status='queued'
+        )
+        s.add(job)
+        s.flush()
+        return job
+
+def claim_export_job(job_id: int, session: Session = None) -> bool:
+    """Move a queued job to running; False if another worker already claimed it"""
+    with _session_scope(session) as s:
+        claimed = s.query(ExportJob).filter(
+            ExportJob.job_id == job_id,
+            ExportJob.status == 'queued'
+        ).update({'status': 'running', 'started_at': datetime.utcnow()}, synchronize_session=False)
+        return claimed == 1
+
+def requeue_stale_export_jobs(started_before: datetime, session: Session = None) -> int:
+    """Move jobs left running since before a cutoff (their process died) back to queued"""
+    with _session_scope(session) as s:
+        return s.query(ExportJob).filter(
+            ExportJob.status == 'running',
+            ExportJob.started_at < started_before
+        ).update({'status': 'queued', 'started_at': None, 'rows_written': 0}, synchronize_session=False)
+
+def update_export_job(job_id: int, session: Session = None, **fields):
+    """Update status, progress or artifact details of an export job"""
+    with _session_scope(session) as s:
+        s.query(ExportJob).filter(ExportJob.job_id == job_id).update(fields, synchronize_session=False)
+
+def get_export_job(job_id: int, session: Session = None):
+    """Get export job by ID"""
+    with _session_scope(session) as s:
+        return s.query(ExportJob).filter(ExportJob.job_id == job_id).first()
+
+def get_user_export_jobs(user_id: int, limit: int = 50, session: Session = None):
+    """Get a user's most recent export jobs"""
+    with _session_scope(session) as s:
+        return s.query(ExportJob).filter(
+            ExportJob.user_id == user_id
+        ).order_by(ExportJob.created_at.desc()).limit(limit).all()
+
+def get_export_jobs_by_status(status: str, session: Session = None):
+    """Get export jobs with a status, oldest first"""
+    with _session_scope(session) as s:
+        return s.query(ExportJob).filter(ExportJob.status == status).order_by(ExportJob.job_id).all()
+
+def get_user_bookmarks(user_id: int, dashboard_name: str = None, session: Session = None):
     """Get user bookmarks, optionally filtered by dashboard"""
-    session = get_session()
-    try:
-        query = session.query(Bookmark).filter(Bookmark.user_id == user_id)
+    with _session_scope(session) as s:
+        query = s.query(Bookmark).filter(Bookmark.user_id == user_id)
         if dashboard_name:
             query = query.filter(Bookmark.dashboard_name == dashboard_name)
-        bookmarks = query.order_by(Bookmark.created_at.desc()).all()
-        return bookmarks
-    finally:
-        session.close()
+        return query.order_by(Bookmark.created_at.desc()).all()
 
-def create_bookmark(user_id: int, dashboard_name: str, bookmark_name: str, filter_config: str = None, **kwargs):
+def create_bookmark(user_id: int, dashboard_name: str, bookmark_name: str, filter_config: str = None,
+                    session: Session = None, **kwargs):
     """Create user bookmark"""
-    session = get_session()
-    try:
+    with _session_scope(session) as s:
         bookmark = Bookmark(
             user_id=user_id,
             dashboard_name=dashboard_name,
@@ -297,32 +601,22 @@ def create_bookmark(user_id: int, dashboard_name: str, bookmark_name: str, filte
             filter_config=filter_config,
             **kwargs
         )
-        session.add(bookmark)
-        session.commit()
-        session.refresh(bookmark)
+        s.add(bookmark)
+        s.flush()
         return bookmark
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
 
-def get_user_favorites(user_id: int, favorite_type: str = None):
+def get_user_favorites(user_id: int, favorite_type: str = None, session: Session = None):
     """Get user favorites, optionally filtered by type"""
-    session = get_session()
-    try:
-        query = session.query(Favorite).filter(Favorite.user_id == user_id)
+    with _session_scope(session) as s:
+        query = s.query(Favorite).filter(Favorite.user_id == user_id)
         if favorite_type:
             query = query.filter(Favorite.favorite_type == favorite_type)
-        favorites = query.order_by(Favorite.created_at.desc()).all()
-        return favorites
-    finally:
-        session.close()
+        return query.order_by(Favorite.created_at.desc()).all()
 
-def add_favorite(user_id: int, favorite_type: str, favorite_ref: str, favorite_name: str = None, notes: str = None):
+def add_favorite(user_id: int, favorite_type: str, favorite_ref: str, favorite_name: str = None, notes: str = None,
+                 session: Session = None):
     """Add item to user favorites"""
-    session = get_session()
-    try:
+    with _session_scope(session) as s:
         favorite = Favorite(
             user_id=user_id,
             favorite_type=favorite_type,
@@ -330,28 +624,15 @@ def add_favorite(user_id: int, favorite_type: str, favorite_ref: str, favorite_n
             favorite_name=favorite_name,
             notes=notes
         )
-        session.add(favorite)
-        session.commit()
-        session.refresh(favorite)
+        s.add(favorite)
+        s.flush()
         return favorite
-    except Exception as e:
-        session.rollback()
-        raise e
-    finally:
-        session.close()
 
-def remove_favorite(user_id: int, favorite_id: int):
+def remove_favorite(user_id: int, favorite_id: int, session: Session = None):
     """Remove item from user favorites"""
-    session = get_session()
-    try:
-        favorite = session.query(Favorite).filter(
+    with _session_scope(session) as s:
+        deleted = s.query(Favorite).filter(
             Favorite.favorite_id == favorite_id,
             Favorite.user_id == user_id
-        ).first()
-        if favorite:
-            session.delete(favorite)
-            session.commit()
-            return True
-        return False
-    finally:
-        session.close()
+        ).delete(synchronize_session=False)
+        return deleted > 0
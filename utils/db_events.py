@@ -0,0 +1,102 @@
+import select
+import threading
+import time
+from utils.database import get_database_engine
+
+# Seconds between checks for newly subscribed channels while waiting for NOTIFY
+LISTEN_POLL_SECONDS = 5.0
+
+
+class DatabaseEvents:
+    """
+    PostgreSQL LISTEN/NOTIFY for the whole process over one connection.
+
+    subscribe() registers a callback for a channel; a background thread
+    LISTENs on every subscribed channel and calls the callback with each
+    NOTIFY payload. on_connect callbacks run whenever the connection is
+    (re)established, since notifications sent while disconnected are lost.
+    The connection is detached from the pool so it doesn't hold a slot,
+    and is re-opened with backoff after errors.
+    """
+
+    def __init__(self):
+        self.listening = False
+        self._subscribers = {}  # channel -> [(callback, on_connect)]
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, channel, callback, on_connect=None):
+        """
+        Call callback(payload) for every NOTIFY on channel.
+
+        Returns: bool - False if the database isn't PostgreSQL (nothing will be delivered)
+        """
+        if get_database_engine().dialect.name != 'postgresql':
+            return False
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append((callback, on_connect))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='db-events', daemon=True)
+                self._thread.start()
+        return True
+
+    def _dispatch(self, channel, payload):
+        with self._lock:
+            callbacks = [callback for callback, _ in self._subscribers.get(channel, [])]
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception:
+                pass
+
+    def _connected(self, channels):
+        with self._lock:
+            hooks = [on_connect for channel in channels
+                     for _, on_connect in self._subscribers.get(channel, []) if on_connect]
+        for on_connect in hooks:
+            try:
+                on_connect()
+            except Exception:
+                pass
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            raw = None
+            try:
+                raw = get_database_engine().raw_connection()
+                raw.detach()
+                connection = raw.driver_connection
+                connection.autocommit = True
+                listened = set()
+                backoff = 1
+                while True:
+                    with self._lock:
+                        new_channels = set(self._subscribers) - listened
+                    if new_channels:
+                        with connection.cursor() as cursor:
+                            for channel in sorted(new_channels):
+                                cursor.execute(f'LISTEN {channel}')
+                        listened |= new_channels
+                        self.listening = True
+                        self._connected(new_channels)
+
+                    if select.select([connection], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self._dispatch(notify.channel, notify.payload)
+            except Exception:
+                self.listening = False
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+
+# Process-wide LISTEN connection
+db_events = DatabaseEvents()
@@ -0,0 +1,256 @@
+import os
+import io
+import pickle
+import hashlib
+import functools
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: atomic renames still apply, without cross-process locks
+    fcntl = None
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+CACHE_DIR = Path(os.environ.get('BI_CACHE_DIR', '.cache/results'))
+MAX_CACHE_BYTES = int(os.environ.get('BI_CACHE_MAX_BYTES', 1024 ** 3))  # 1 GB
+
+ENTRY_SUFFIXES = ('.parquet', '.pkl')
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on a lock file, shared by every process on the host"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def hash_value(value):
+    """Stable content hash of an argument (DataFrames hashed by content)"""
+    digest = hashlib.sha1()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(pickle.dumps(list(value.columns) if isinstance(value, pd.DataFrame) else value.name))
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    else:
+        try:
+            digest.update(pickle.dumps(value, protocol=4))
+        except Exception:
+            digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def find_data_version(value, sources=None):
+    """
+    Data version of `sources` for a loader, processor or calculator argument
+    (None otherwise). Processors and calculators report the versions captured
+    when they were built, which their cached frames match.
+    """
+    if hasattr(value, 'get_data_version'):
+        return value.get_data_version(sources)
+    return None
+
+
+def find_scope(value):
+    """DataScope of a processor or calculator argument (None when unrestricted or not a processor)"""
+    if hasattr(value, 'processor'):
+        return find_scope(value.processor)
+    return getattr(value, 'scope', None)
+
+
+class DiskCache:
+    """
+    Disk-backed result cache shared by all processes on the host.
+
+    Entries are files named by key hash: DataFrames are written as parquet
+    when pyarrow is available, everything else is pickled. Writes go to a
+    temporary file and are atomically renamed into place; computation of a
+    key happens under a per-key file lock so concurrent processes compute it
+    once. Reads touch the file's mtime, and the directory is trimmed to
+    max_bytes by evicting least recently used entries.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat, n=1):
+        with self._stats_lock:
+            self.stats[stat] += n
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return self.cache_dir / digest[:2] / digest
+
+    def _read(self, base):
+        """Load an entry if present; corrupt entries are removed"""
+        for suffix in ENTRY_SUFFIXES:
+            path = base.with_suffix(suffix)
+            if not path.exists():
+                continue
+            try:
+                if suffix == '.parquet':
+                    value = pd.read_parquet(path)
+                else:
+                    with open(path, 'rb') as handle:
+                        value = pickle.load(handle)
+                os.utime(path)
+                return True, value
+            except FileNotFoundError:
+                return False, None
+            except Exception:
+                self._count('errors')
+                path.unlink(missing_ok=True)
+        return False, None
+
+    def _write(self, base, value):
+        """Serialize to a temporary file and atomically rename into place"""
+        base.parent.mkdir(parents=True, exist_ok=True)
+        payload, suffix = None, '.pkl'
+        if PARQUET_AVAILABLE and isinstance(value, pd.DataFrame):
+            try:
+                buffer = io.BytesIO()
+                value.to_parquet(buffer)
+                payload, suffix = buffer.getvalue(), '.parquet'
+            except Exception:
+                payload = None
+        if payload is None:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        tmp = base.with_suffix(f'.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}')
+        with open(tmp, 'wb') as handle:
+            handle.write(payload)
+        os.replace(tmp, base.with_suffix(suffix))
+        self._count('writes')
+
+    def get(self, key):
+        """Return (found, value) for a key"""
+        found, value = self._read(self._path(key))
+        self._count('hits' if found else 'misses')
+        return found, value
+
+    def set(self, key, value):
+        """Store a value (best effort: serialization failures are counted, not raised)"""
+        try:
+            self._write(self._path(key), value)
+            self.enforce_limit()
+        except Exception:
+            self._count('errors')
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value or compute it once across processes"""
+        found, value = self.get(key)
+        if found:
+            return value
+
+        base = self._path(key)
+        with file_lock(base.with_suffix('.lock')):
+            # Another process may have finished while we waited for the lock
+            found, value = self._read(base)
+            if found:
+                return value
+            value = compute()
+            self.set(key, value)
+        base.with_suffix('.lock').unlink(missing_ok=True)
+        return value
+
+    def _entries(self):
+        """(path, size, mtime) for every stored entry"""
+        entries = []
+        for suffix in ENTRY_SUFFIXES:
+            for path in self.cache_dir.glob(f'*/*{suffix}'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def size(self):
+        """Total bytes of stored entries"""
+        return sum(size for _, size, _ in self._entries())
+
+    def enforce_limit(self):
+        """Evict least recently used entries until the cache fits in max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        with file_lock(self.cache_dir / '.evict.lock'):
+            for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                self._count('evictions')
+
+    def clear(self):
+        """Remove every stored entry"""
+        for path, _, _ in self._entries():
+            path.unlink(missing_ok=True)
+
+
+# Host-wide default cache
+default_cache = DiskCache()
+
+
+def disk_cache(sources=None, cache=None, ttl=None):
+    """
+    Decorator persisting a function's results on disk, keyed by function,
+    arguments and data version.
+
+    Arguments that are a DataLoader, DataProcessor or MetricsCalculator are
+    not hashed; they contribute their data version for `sources`
+    (and the processor's data scope, if any) instead, so results are reused
+    across restarts until the data changes.
+
+    Args:
+        sources: Data source name(s) the result depends on (None = all sources)
+        cache: DiskCache to use (default: host-wide cache)
+        ttl: Optional lifetime in seconds, for results that depend on the clock
+
+    Usage:
+        @disk_cache(sources=['accounts', 'churn'])
+        def calculate_monthly_churn_rate(self): ...
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            store = cache or default_cache
+            parts, versions = [], []
+            for value in list(args) + [kwargs[k] for k in sorted(kwargs)]:
+                version = find_data_version(value, sources)
+                if version is not None:
+                    scope = find_scope(value)
+                    versions.append(version if scope is None else (version, tuple(scope)))
+                else:
+                    parts.append(hash_value(value))
+
+            key = (name, tuple(sorted(kwargs)), tuple(parts), tuple(versions))
+            if ttl is not None:
+                key += (int(time.time() // ttl),)
+            return store.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = lambda: cache or default_cache
+        return wrapper
+    return decorator
@@ -0,0 +1,228 @@
+import os
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+import streamlit as st
+from utils.database import (
+    unit_of_work,
+    create_export_job,
+    claim_export_job,
+    update_export_job,
+    get_export_job,
+    get_export_jobs_by_status,
+    requeue_stale_export_jobs,
+    log_user_action
+)
+from utils.auth import can_export, get_current_user
+from utils.notifications import notification_service
+from utils.data_processor import get_shared_processor
+from utils.data_scope import data_scope_cache
+from utils.exporter import EXPORT_FORMATS, available_formats, position_chunks, write_export
+
+EXPORT_WORKERS = int(os.environ.get('BI_EXPORT_WORKERS', 2))
+ARTIFACT_DIR = Path(os.environ.get('BI_ARTIFACT_DIR', 'artifacts'))
+ARTIFACT_TTL_DAYS = int(os.environ.get('BI_ARTIFACT_TTL_DAYS', 7))
+
+# Jobs still 'running' this long after they started are taken to have lost their process
+STALE_JOB_MINUTES = int(os.environ.get('BI_EXPORT_STALE_MINUTES', 60))
+
+# Seconds between sweeps for expired artifacts and stale or left-over jobs
+MAINTENANCE_INTERVAL = int(os.environ.get('BI_EXPORT_MAINTENANCE_SECONDS', 300))
+
+# Seconds between progress updates written to export_jobs
+PROGRESS_INTERVAL = 1.0
+
+# Page (URL path) listing a user's export jobs, linked from notifications
+DOWNLOADS_PAGE = 'Export_Downloads'
+
+
+def account_list_export(processor, parameters):
+    """
+    Row count and chunk source for an account list export.
+
+    Args:
+        processor: DataProcessor
+        parameters: Dict saved with the job - filters, sort_by, ascending, search,
+            options (open_only, activity, days_threshold), columns and rename
+
+    Returns: (int total rows, callable returning DataFrame chunks)
+    """
+    if processor.accounts_df is None:
+        raise ValueError("No account data is loaded")
+
+    positions = processor.select_table_rows(
+        filters=parameters.get('filters'),
+        sort_by=parameters.get('sort_by'),
+        ascending=parameters.get('ascending', True),
+        search=parameters.get('search'),
+        **parameters.get('options', {})
+    )
+    return len(positions), lambda: position_chunks(
+        processor.accounts_df, positions, parameters.get('columns'), parameters.get('rename')
+    )
+
+
+def _notify(user_id, title, message, notification_type, job_id):
+    """Notify the requesting user (best effort: a failed notification doesn't fail the job)"""
+    try:
+        notification_service.notify(user_id, title, message, notification_type, priority=2,
+                                    link_to_dashboard=f'{DOWNLOADS_PAGE}?job={job_id}')
+    except Exception:
+        pass
+
+
+class ExportJobQueue:
+    """
+    Background exports recorded in the export_jobs table.
+
+    submit() records a queued job (plus an 'export' audit entry) and hands it
+    to a thread pool, so the requesting script returns immediately. Workers
+    share the in-memory data model; each claims its job atomically, streams
+    it into a compressed artifact under artifact_dir while recording rows
+    written, then notifies the user with a link to the Export Downloads page.
+
+    At most every maintenance_interval seconds, resume() expires old
+    artifacts, re-queues jobs left running by a process that died (started
+    more than stale_minutes ago) and picks up queued jobs.
+    """
+
+    def __init__(self, max_workers=EXPORT_WORKERS, artifact_dir=ARTIFACT_DIR, ttl_days=ARTIFACT_TTL_DAYS,
+                 stale_minutes=STALE_JOB_MINUTES, maintenance_interval=MAINTENANCE_INTERVAL):
+        self.max_workers = max_workers
+        self.artifact_dir = Path(artifact_dir)
+        self.ttl_days = ttl_days
+        self.stale_minutes = stale_minutes
+        self.maintenance_interval = maintenance_interval
+        self._pool = None
+        self._maintained_at = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='export-job')
+            return self._pool
+
+    def submit(self, user_id, username, export_name, parameters, fmt='csv.gz', dashboard=None):
+        """
+        Queue an account list export.
+
+        Args:
+            user_id, username: Requesting user (notified when the export finishes)
+            export_name: Name used for the artifact file, e.g. 'active_email_accounts'
+            parameters: JSON-serializable parameters for account_list_export
+            fmt: Export format; plain CSV is stored gzip-compressed
+            dashboard: Requesting dashboard, for the audit trail
+
+        Returns: int - job id
+        """
+        fmt = 'csv.gz' if fmt == 'csv' else fmt
+        if fmt not in available_formats():
+            raise ValueError(f"Unsupported export format: {fmt}. Use one of {available_formats()}")
+
+        with unit_of_work() as session:
+            job = create_export_job(user_id, username, export_name, fmt, json.dumps(parameters), dashboard,
+                                    session=session)
+            log_user_action(user_id, username, 'export', dashboard,
+                            json.dumps({'job_id': job.job_id, 'export': export_name, 'format': fmt}),
+                            session=session)
+        self.resume()
+        self._executor().submit(self._run, job.job_id)
+        return job.job_id
+
+    def resume(self):
+        """
+        Expire old artifacts, re-queue stale running jobs and pick up queued
+        ones (no-op within maintenance_interval of the last sweep)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._maintained_at is not None and now - self._maintained_at < self.maintenance_interval:
+                return
+            self._maintained_at = now
+        self.expire_artifacts()
+        requeue_stale_export_jobs(datetime.utcnow() - timedelta(minutes=self.stale_minutes))
+        for job in get_export_jobs_by_status('queued'):
+            self._executor().submit(self._run, job.job_id)
+
+    def _progress(self, job_id, chunks):
+        """Pass chunks through, recording rows written at most every PROGRESS_INTERVAL"""
+        written, last_update = 0, time.monotonic()
+        for chunk in chunks:
+            yield chunk
+            written += len(chunk)
+            if time.monotonic() - last_update >= PROGRESS_INTERVAL:
+                update_export_job(job_id, rows_written=written)
+                last_update = time.monotonic()
+
+    def _run(self, job_id):
+        if not claim_export_job(job_id):
+            return  # already taken by another worker or process
+
+        job = get_export_job(job_id)
+        path = self.artifact_dir / f'{job_id}_{job.export_name}{EXPORT_FORMATS[job.export_format][1]}'
+        partial = path.with_name(path.name + '.part')
+        try:
+            # Rows the requesting user may see (jobs run outside their session)
+            processor = get_shared_processor(scope=data_scope_cache.scope(job.user_id))
+            # jsonb column: psycopg2 returns a dict, other drivers the JSON text
+            parameters = job.parameters if isinstance(job.parameters, dict) else json.loads(job.parameters or '{}')
+            total, chunks = account_list_export(processor, parameters)
+            update_export_job(job_id, rows_total=total)
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_export(self._progress(job_id, chunks()), partial, job.export_format)
+            os.replace(partial, path)
+
+            update_export_job(job_id, status='done', rows_written=total, artifact_path=str(path),
+                              artifact_bytes=path.stat().st_size, finished_at=datetime.utcnow())
+            _notify(job.user_id, 'Export ready',
+                    f"Your {job.export_name.replace('_', ' ')} export ({total:,} rows) is ready to download.",
+                    'success', job_id)
+        except Exception as e:
+            partial.unlink(missing_ok=True)
+            update_export_job(job_id, status='failed', error=str(e)[:1000], finished_at=datetime.utcnow())
+            _notify(job.user_id, 'Export failed',
+                    f"Your {job.export_name.replace('_', ' ')} export could not be completed: {e}",
+                    'alert', job_id)
+
+    def expire_artifacts(self):
+        """Delete artifacts of finished jobs older than ttl_days"""
+        cutoff = datetime.utcnow() - timedelta(days=self.ttl_days)
+        for job in get_export_jobs_by_status('done'):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                if job.artifact_path:
+                    Path(job.artifact_path).unlink(missing_ok=True)
+                update_export_job(job.job_id, status='expired')
+
+
+# Process-wide export job queue
+job_queue = ExportJobQueue()
+
+
+def show_background_export(export_name, dashboard, parameters, fmt, total_rows):
+    """
+    Button queueing an account list export as a background job (users who may export only).
+
+    Args:
+        export_name: Artifact name, e.g. 'active_email_accounts'
+        dashboard: Requesting dashboard name
+        parameters: Parameters for account_list_export
+        fmt: Export format (from show_export)
+        total_rows: Rows in the export, shown on the button
+    """
+    if not can_export():
+        return
+
+    if st.button(f"📨 Export {total_rows:,} rows in the background", key=f"background_{export_name}",
+                 help="Large exports run on the server; you'll get a notification with a download link"):
+        user = get_current_user()
+        try:
+            job_id = job_queue.submit(user['user_id'], user['username'], export_name, parameters, fmt, dashboard)
+            st.success(f"Export #{job_id} queued. You'll be notified when it's ready.")
+            st.page_link("pages/14_Export_Downloads.py", label="View my exports", icon="📦")
+        except Exception as e:
+            st.error(f"Could not queue export: {e}")
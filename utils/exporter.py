@@ -0,0 +1,266 @@
+import os
+import gzip
+import hashlib
+import threading
+import uuid
+from pathlib import Path
+import streamlit as st
+from utils.disk_cache import file_lock, PARQUET_AVAILABLE
+from utils.paged_table import materialize
+
+try:
+    import openpyxl
+    XLSX_AVAILABLE = True
+except ImportError:
+    XLSX_AVAILABLE = False
+
+EXPORT_DIR = Path(os.environ.get('BI_EXPORT_DIR', '.cache/exports'))
+MAX_EXPORT_BYTES = int(os.environ.get('BI_EXPORT_MAX_BYTES', 2 * 1024 ** 3))  # 2 GB
+
+# Rows serialized per chunk, bounding memory for large exports
+EXPORT_CHUNK_ROWS = 50_000
+
+# Data rows per worksheet (Excel's limit, less the header row)
+XLSX_MAX_ROWS = 1_048_575
+
+# format -> (label, file suffix, mime type)
+EXPORT_FORMATS = {
+    'csv': ('CSV', '.csv', 'text/csv'),
+    'csv.gz': ('CSV (gzip)', '.csv.gz', 'application/gzip'),
+    'parquet': ('Parquet', '.parquet', 'application/vnd.apache.parquet'),
+    'xlsx': ('Excel', '.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+
+def available_formats():
+    """Export formats supported by the installed libraries"""
+    return [fmt for fmt in EXPORT_FORMATS
+            if (fmt != 'parquet' or PARQUET_AVAILABLE) and (fmt != 'xlsx' or XLSX_AVAILABLE)]
+
+
+def frame_chunks(df, rows=EXPORT_CHUNK_ROWS):
+    """Consecutive row slices of a DataFrame"""
+    for start in range(0, max(len(df), 1), rows):
+        yield df.iloc[start:start + rows]
+
+
+def position_chunks(df, positions, columns=None, rename=None, rows=EXPORT_CHUNK_ROWS):
+    """
+    Rows of df at the given positions, materialized one chunk at a time.
+
+    Args:
+        df: Source frame
+        positions: Row positions in export order (e.g. from select_table_rows)
+        columns: Columns to export (may include derived columns, see materialize)
+        rename: Optional column name mapping
+    """
+    for start in range(0, max(len(positions), 1), rows):
+        chunk = materialize(df, positions[start:start + rows], columns)
+        yield chunk.rename(columns=rename) if rename else chunk
+
+
+def _write_csv(chunks, path, compress=False):
+    handle = gzip.open(path, 'wt', compresslevel=6, newline='', encoding='utf-8') if compress \
+        else open(path, 'w', newline='', encoding='utf-8')
+    with handle:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(handle, index=False, header=i == 0)
+
+
+def _write_parquet(chunks, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_xlsx(chunks, path):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet, sheet_rows = None, 0
+    for chunk in chunks:
+        header = [str(col) for col in chunk.columns]
+        if sheet is None:
+            sheet = workbook.create_sheet('Data 1')
+            sheet.append(header)
+        # Excel has no missing-value type: write blanks
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if sheet_rows >= XLSX_MAX_ROWS:
+                sheet = workbook.create_sheet(f'Data {len(workbook.worksheets) + 1}')
+                sheet.append(header)
+                sheet_rows = 0
+            sheet.append(list(row))
+            sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet('Data 1')
+    workbook.save(path)
+
+
+def write_export(chunks, path, fmt='csv'):
+    """
+    Stream DataFrame chunks into a file in one of EXPORT_FORMATS.
+
+    Args:
+        chunks: Iterable of DataFrames (same columns)
+        path: Destination file
+        fmt: Export format
+    """
+    if fmt not in available_formats():
+        raise ValueError(f"Unsupported export format: {fmt}. Use one of {available_formats()}")
+    if fmt in ('csv', 'csv.gz'):
+        _write_csv(chunks, path, compress=fmt == 'csv.gz')
+    elif fmt == 'parquet':
+        _write_parquet(chunks, path)
+    else:
+        _write_xlsx(chunks, path)
+
+
+class Exporter:
+    """
+    Export artifacts written on request and cached on disk.
+
+    An export is described by a key (name, filter state and data version)
+    and a chunk source - a callable yielding DataFrames - so nothing is
+    computed or serialized until a download is requested. Chunks are
+    streamed into a temporary file (gzip-compressed for 'csv.gz') that is
+    atomically renamed into place; later requests for the same key and
+    format reuse the file. The directory is trimmed to max_bytes, least
+    recently used first.
+    """
+
+    def __init__(self, export_dir=EXPORT_DIR, max_bytes=MAX_EXPORT_BYTES):
+        self.export_dir = Path(export_dir)
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'bytes_written': 0, 'evictions': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat, n=1):
+        with self._stats_lock:
+            self.stats[stat] += n
+
+    def _path(self, key, fmt):
+        digest = hashlib.sha1(repr((key, fmt)).encode()).hexdigest()
+        return self.export_dir / digest[:2] / f'{digest}{EXPORT_FORMATS[fmt][1]}'
+
+    def export(self, key, chunks, fmt='csv'):
+        """
+        Path of the export artifact, writing it on the first request.
+
+        Args:
+            key: Hashable description of the exported data (include the data version)
+            chunks: Callable returning an iterable of DataFrames
+            fmt: One of EXPORT_FORMATS
+
+        Returns: Path
+        """
+        if fmt not in available_formats():
+            raise ValueError(f"Unsupported export format: {fmt}. Use one of {available_formats()}")
+
+        path = self._path(key, fmt)
+        if path.exists():
+            os.utime(path)
+            self._count('hits')
+            return path
+
+        with file_lock(path.with_name(path.name + '.lock')):
+            if not path.exists():
+                self._count('misses')
+                tmp = path.with_name(f'{path.name}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}')
+                try:
+                    write_export(chunks(), tmp, fmt)
+                    os.replace(tmp, path)
+                finally:
+                    tmp.unlink(missing_ok=True)
+                self._count('bytes_written', path.stat().st_size)
+        path.with_name(path.name + '.lock').unlink(missing_ok=True)
+        self.enforce_limit(keep=path)
+        return path
+
+    def data(self, key, chunks, fmt='csv'):
+        """Deferred download contents: a callable producing the artifact's bytes"""
+        return lambda: self.export(key, chunks, fmt).read_bytes()
+
+    def _entries(self):
+        """(path, size, mtime) for every stored artifact"""
+        entries = []
+        for _, suffix, _ in EXPORT_FORMATS.values():
+            for path in self.export_dir.glob(f'*/*{suffix}'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def size(self):
+        """Total bytes of stored artifacts"""
+        return sum(size for _, size, _ in self._entries())
+
+    def enforce_limit(self, keep=None):
+        """Remove least recently used artifacts (other than keep) until the directory fits in max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        with file_lock(self.export_dir / '.evict.lock'):
+            for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
+                self._count('evictions')
+
+    def clear(self):
+        """Remove every stored artifact"""
+        for path, _, _ in self._entries():
+            path.unlink(missing_ok=True)
+
+
+# Host-wide export store
+exporter = Exporter()
+
+
+def show_export(label, file_stem, key, chunks, widget_key=None):
+    """
+    Format picker and download button for an export, serialized only when clicked.
+
+    Args:
+        label: Button label (the format is appended)
+        file_stem: Download file name without suffix
+        key: Hashable export description: name, filter state and data version
+        chunks: Callable returning an iterable of DataFrames
+        widget_key: Optional widget key prefix, for several exports on one page
+
+    Returns: str - the selected format
+    """
+    formats = available_formats()
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        fmt = st.selectbox("Format", formats, format_func=lambda f: EXPORT_FORMATS[f][0],
+                           key=f"{widget_key}_format" if widget_key else None)
+    with col2:
+        label_text, suffix, mime = EXPORT_FORMATS[fmt]
+        st.download_button(
+            label=f"{label} ({label_text})",
+            data=exporter.data(key, chunks, fmt),
+            file_name=f"{file_stem}{suffix}",
+            mime=mime,
+            key=f"{widget_key}_download" if widget_key else None,
+            on_click='ignore',
+            use_container_width=True
+        )
+    return fmt
@@ -0,0 +1,233 @@
+import pandas as pd
+import numpy as np
+
+# GL category codes (Gl Catg Code) for income lines
+FUNDED_INCOME_CATEGORIES = [300]  # Interest from investing/lending activities
+NON_FUNDED_INCOME_CATEGORIES = [301, 302, 303]  # Fees & commissions, FX gains, LC/guarantee margins
+
+INCOME_CATEGORY_NAMES = {
+    300: 'Interest Income',
+    301: 'Fees & Commissions',
+    302: 'Net FX Gains',
+    303: 'LC & Guarantee Margins',
+    304: 'Investment Property Gains',
+    305: 'Revaluation Gains'
+}
+
+
+def to_gl_code(series):
+    """Convert GL numbers that may contain thousands separators (e.g. '3,000,201') to integers"""
+    if not pd.api.types.is_numeric_dtype(series):
+        series = series.astype(str).str.replace(',', '').str.strip()
+    return pd.to_numeric(series, errors='coerce').astype('Int64')
+
+
+class GLHierarchy:
+    """
+    GL chart-of-accounts hierarchy with O(1) subtree balance rollups.
+
+    The GL tree (L1 -> L2 -> L3 via `Gl Parent Gl Num`) is laid out in
+    Euler-tour order so every node's descendants occupy the contiguous
+    interval [tin, tout). Balances are stored as prefix sums over that order,
+    one column per (branch, currency) cell including the "all" wildcards,
+    so any subtree total is the difference of two array lookups.
+    """
+
+    ALL = '*'
+
+    def __init__(self, gl_df, balances_df=None, gl_col='GLBALH_GLACC_CODE',
+                 branch_col='GLBALH_BRN_CODE', currency_col='GLBALH_CURR_CODE',
+                 amount_col='SUM(GLBALH_AC_BAL)'):
+        """
+        Args:
+            gl_df: GL master (GL CATEGORY LOOKUP TABLE)
+            balances_df: GL balances in the revenue_gls format (optional)
+            gl_col, branch_col, currency_col, amount_col: balance column names
+        """
+        nodes = gl_df.copy()
+        nodes['gl_code'] = to_gl_code(nodes['Gl Number'])
+        nodes['parent_code'] = to_gl_code(nodes['Gl Parent Gl Num']) if 'Gl Parent Gl Num' in nodes.columns else pd.NA
+        nodes = nodes[nodes['gl_code'].notna()].drop_duplicates('gl_code').reset_index(drop=True)
+
+        self.nodes = nodes
+        self._index = pd.Index(nodes['gl_code'].astype('int64'))
+
+        self._build_tree()
+        self._build_balances(balances_df, gl_col, branch_col, currency_col, amount_col)
+
+    def _build_tree(self):
+        """Compute ancestor matrix, Euler-tour intervals and depth for every node"""
+        n = len(self.nodes)
+        parent = self._index.get_indexer(self.nodes['parent_code'].fillna(-1).astype('int64'))
+
+        # Ancestor matrix: column k holds the k-th ancestor of each node (-1 past the root).
+        # Orphans (parent missing from the master) and parent code 0 become roots.
+        ancestors = [np.arange(n)]
+        current = parent
+        while (current >= 0).any() and len(ancestors) <= n:
+            ancestors.append(current)
+            current = np.where(current >= 0, parent[current.clip(0)], -1)
+        anc = np.column_stack(ancestors)
+
+        valid = anc >= 0
+        depth = valid.sum(axis=1) - 1
+
+        # Root-to-node paths, ranked by GL code so siblings keep chart order.
+        # Shorter paths pad with -1 and therefore sort before their descendants.
+        code_rank = np.empty(n, dtype=np.int64)
+        code_rank[np.argsort(self._index.values, kind='stable')] = np.arange(n)
+        steps = np.arange(anc.shape[1])
+        src = depth[:, None] - steps[None, :]
+        path = np.where(src >= 0, anc[np.arange(n)[:, None], src.clip(0)], -1)
+        path_rank = np.where(path >= 0, code_rank[path.clip(0)], -1)
+        order = np.lexsort(path_rank.T[::-1])
+
+        tin = np.empty(n, dtype=np.int64)
+        tin[order] = np.arange(n)
+        descendants = anc[:, 1:][valid[:, 1:]]
+        subtree_size = np.bincount(descendants, minlength=n) + 1
+
+        self._ancestors = anc
+        self.depth = depth
+        self.tin = tin
+        self.tout = tin + subtree_size
+        self.euler_order = order
+
+    def _build_balances(self, balances_df, gl_col, branch_col, currency_col, amount_col):
+        """Join balances by GL account code and build per-cell prefix sums in Euler order"""
+        n = len(self.nodes)
+        self._columns = {(self.ALL, self.ALL): 0}
+        self._prefix = np.zeros((n + 1, 1))
+        self.unmatched_balances = pd.DataFrame()
+
+        if balances_df is None or len(balances_df) == 0:
+            return
+
+        bal = pd.DataFrame({
+            'pos': self._index.get_indexer(to_gl_code(balances_df[gl_col]).fillna(-1).astype('int64')),
+            'branch': balances_df[branch_col].values if branch_col in balances_df.columns else self.ALL,
+            'currency': balances_df[currency_col].values if currency_col in balances_df.columns else self.ALL,
+            'amount': pd.to_numeric(balances_df[amount_col], errors='coerce').fillna(0).values
+        })
+
+        self.unmatched_balances = balances_df[bal['pos'].values < 0]
+        bal = bal[bal['pos'] >= 0]
+        bal['pos'] = self.tin[bal['pos'].values]
+
+        # One column per (branch, currency) cell plus the wildcard rollups
+        variants = [
+            (bal['branch'], bal['currency']),
+            (bal['branch'], pd.Series(self.ALL, index=bal.index)),
+            (pd.Series(self.ALL, index=bal.index), bal['currency']),
+        ]
+        for branches, currencies in variants:
+            for key in zip(branches, currencies):
+                if key not in self._columns:
+                    self._columns[key] = len(self._columns)
+
+        matrix = np.zeros((n + 1, len(self._columns)))
+        rows = bal['pos'].values + 1
+        amounts = bal['amount'].values
+        np.add.at(matrix, (rows, np.zeros(len(bal), dtype=np.int64)), amounts)
+        for branches, currencies in variants:
+            cols = np.fromiter((self._columns[key] for key in zip(branches, currencies)),
+                               dtype=np.int64, count=len(bal))
+            np.add.at(matrix, (rows, cols), amounts)
+
+        self._prefix = np.cumsum(matrix, axis=0)
+
+    def _node_positions(self, gl_codes):
+        """Map GL codes to node indices (-1 when unknown)"""
+        codes = to_gl_code(pd.Series(np.atleast_1d(gl_codes))).fillna(-1).astype('int64')
+        return self._index.get_indexer(codes)
+
+    def _column(self, branch, currency):
+        branch = self.ALL if branch is None or branch == 'All' else branch
+        currency = self.ALL if currency is None or currency == 'All' else currency
+        return self._columns.get((branch, currency))
+
+    def subtree_total(self, gl_code, branch=None, currency=None):
+        """
+        Total balance of a GL node and all of its descendants.
+
+        Args:
+            gl_code: GL number of the node
+            branch: Branch code, or None/'All' for every branch
+            currency: Currency code, or None/'All' for every currency
+
+        Returns: float - subtree total (0 for unknown nodes or empty cells)
+        """
+        return float(self.subtree_totals([gl_code], branch, currency)[0])
+
+    def subtree_totals(self, gl_codes, branch=None, currency=None):
+        """Vectorized subtree totals for many GL nodes in one (branch, currency) cell"""
+        pos = self._node_positions(gl_codes)
+        col = self._column(branch, currency)
+        totals = np.zeros(len(pos))
+        known = pos >= 0
+        if col is None or not known.any():
+            return totals
+        p = pos[known]
+        totals[known] = self._prefix[self.tout[p], col] - self._prefix[self.tin[p], col]
+        return totals
+
+    def get_children(self, gl_code):
+        """GL codes of the direct children of a node"""
+        pos = self._node_positions([gl_code])[0]
+        if pos < 0:
+            return []
+        return self._index[self._ancestors[:, 1] == pos].tolist() if self._ancestors.shape[1] > 1 else []
+
+    def get_closure_table(self):
+        """
+        Closure table of the GL tree.
+
+        Returns: DataFrame with ancestor_gl, descendant_gl and distance (0 = self)
+        """
+        anc = self._ancestors
+        rows, dist = np.nonzero(anc >= 0)
+        return pd.DataFrame({
+            'ancestor_gl': self._index.values[anc[rows, dist]],
+            'descendant_gl': self._index.values[rows],
+            'distance': dist
+        })
+
+    def rollup(self, level=None, gl_type=None, categories=None, branch=None, currency=None):
+        """
+        Subtree totals for every node matching the filters.
+
+        Args:
+            level: Hierarchy level ('L1', 'L2', 'L3') or None for all
+            gl_type: GL type code ('I', 'E', 'A', 'L') or None for all
+            categories: List of Gl Catg Code values or None for all
+            branch: Branch code or None for every branch
+            currency: Currency code or None for every currency
+
+        Returns: DataFrame with GL details and subtree totals
+        """
+        mask = pd.Series(True, index=self.nodes.index)
+        if level is not None and 'Gl Glhier Code' in self.nodes.columns:
+            mask &= self.nodes['Gl Glhier Code'] == level
+        if gl_type is not None and 'Gl Type' in self.nodes.columns:
+            mask &= self.nodes['Gl Type'] == gl_type
+        if categories is not None and 'Gl Catg Code' in self.nodes.columns:
+            mask &= pd.to_numeric(self.nodes['Gl Catg Code'], errors='coerce').isin(categories)
+
+        selected = self.nodes[mask]
+        pos = selected.index.values
+        col = self._column(branch, currency)
+        if col is None:
+            totals = np.zeros(len(pos))
+        else:
+            totals = self._prefix[self.tout[pos], col] - self._prefix[self.tin[pos], col]
+
+        columns = [c for c in ['Gl Name', 'Gl Type', 'Gl Catg Code', 'Gl Glhier Code'] if c in selected.columns]
+        result = selected[['gl_code'] + columns].copy()
+        result['depth'] = self.depth[pos]
+        result['balance'] = totals
+        return result.sort_values('balance', ascending=False).reset_index(drop=True)
+
+    def get_non_funded_income(self, level='L2', branch=None, currency=None):
+        """Non-funded income (fees, commissions, FX, LC/guarantee margins) by GL node"""
+        return self.rollup(level=level, gl_type='I', categories=NON_FUNDED_INCOME_CATEGORIES,
+                           branch=branch, currency=currency)
@@ -0,0 +1,159 @@
+import pandas as pd
+import numpy as np
+
+GROUP_DIMENSIONS = ['ACNTS_BRN_CODE', 'Product Name', 'ACNTS_CURR_CODE']
+
+# KPIs where a lower value ranks better
+ASCENDING_KPIS = ['closed_accounts']
+
+
+def quarter_periods(year, quarters=(1, 2, 3)):
+    """(label, start, end) for calendar quarters of a year"""
+    periods = []
+    for q in quarters:
+        q_start = pd.Timestamp(f'{year}-{(q-1)*3+1:02d}-01')
+        q_end = pd.Timestamp(f'{year}-{q*3:02d}-01') + pd.offsets.MonthEnd(0)
+        periods.append((f'Q{q}', q_start, q_end))
+    return periods
+
+
+class GroupKPIMatrix:
+    """
+    Full KPI vector for every branch, product and currency, computed in one
+    grouped pass per dimension and stored as a KPI-by-group matrix.
+
+    Row-level indicators (open, active, in window, in each period, balance)
+    are built once with vectorized comparisons; each dimension is then a
+    single groupby-sum over the indicator frame plus one bincount for distinct
+    customers. Selecting a group is a row lookup, and rankings are a column rank.
+    """
+
+    def __init__(self, df, dims=None, days_threshold=90, as_of=None, window=None, periods=None,
+                 balance=None):
+        """
+        Args:
+            df: Accounts data
+            dims: Dimension columns to group by (default GROUP_DIMENSIONS present in df)
+            days_threshold: Days since last transaction for an account to count as active
+            as_of: Reference date for activity (default now)
+            window: (start, end) for window activity, e.g. a campaign period
+            periods: List of (label, start, end); counts accounts whose last
+                transaction falls in each period (e.g. quarter_periods(2025))
+            balance: Optional per-row balance array (e.g. converted to a reporting currency)
+        """
+        self.dims = [d for d in (dims or GROUP_DIMENSIONS) if d in df.columns]
+        self.period_labels = [label for label, _, _ in (periods or [])]
+        indicators, self._customer_flags = self._build_indicators(df, days_threshold, as_of, window, periods, balance)
+
+        customers = df['ACNTS_CLIENT_NUM'] if 'ACNTS_CLIENT_NUM' in df.columns else None
+        self.matrices = {dim: self._aggregate(df[dim], indicators, customers) for dim in self.dims}
+
+    def _build_indicators(self, df, days_threshold, as_of, window, periods, balance):
+        """Per-row 0/1 indicator and value columns"""
+        n = len(df)
+        indicators = {'total_accounts': np.ones(n)}
+        customer_flags = {}
+
+        if 'ACNTS_CLOSURE_DATE' in df.columns:
+            indicators['open_accounts'] = df['ACNTS_CLOSURE_DATE'].isna().to_numpy(dtype=float)
+            indicators['closed_accounts'] = 1.0 - indicators['open_accounts']
+
+        if 'ACNTS_LAST_TRAN_DATE' in df.columns:
+            last_txn = df['ACNTS_LAST_TRAN_DATE']
+            reference = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now()
+            active = ((reference - last_txn).dt.days <= days_threshold).to_numpy()
+            indicators['active_accounts'] = active.astype(float)
+
+            if window is not None:
+                in_window = ((last_txn >= pd.Timestamp(window[0])) & (last_txn <= pd.Timestamp(window[1]))).to_numpy()
+                indicators['window_accounts'] = in_window.astype(float)
+                customer_flags['window_customers'] = in_window
+
+            for label, start, end in (periods or []):
+                indicators[label] = ((last_txn >= start) & (last_txn <= end)).to_numpy(dtype=float)
+
+        if balance is None and 'BASE_CURR_BAL' in df.columns:
+            balance = pd.to_numeric(df['BASE_CURR_BAL'], errors='coerce').to_numpy()
+        if balance is not None:
+            indicators['total_balance'] = np.nan_to_num(np.asarray(balance, dtype=float))
+
+        return pd.DataFrame(indicators), customer_flags
+
+    def _aggregate(self, keys, indicators, customers):
+        """One grouped pass for a dimension, plus derived ratios"""
+        codes, uniques = pd.factorize(keys, sort=True)
+        keep = codes >= 0
+        matrix = indicators[keep].groupby(codes[keep]).sum()
+        present = matrix.index.to_numpy()
+        matrix.index = pd.Index(uniques[present], name=keys.name)
+
+        if customers is not None:
+            known = keep & customers.notna().to_numpy()
+            pairs = pd.DataFrame({'group': codes[known], 'customer': customers.to_numpy()[known]})
+            matrix['unique_customers'] = self._distinct(pairs, len(uniques))[present]
+            for name, flag in self._customer_flags.items():
+                matrix[name] = self._distinct(pairs[flag[known]], len(uniques))[present]
+
+        total = matrix['total_accounts']
+        if 'unique_customers' in matrix.columns:
+            matrix['accounts_per_customer'] = total / matrix['unique_customers'].where(matrix['unique_customers'] > 0)
+        if 'active_accounts' in matrix.columns:
+            matrix['active_rate'] = matrix['active_accounts'] / total * 100
+        if 'total_balance' in matrix.columns:
+            matrix['avg_balance'] = matrix['total_balance'] / total
+
+        count_columns = [c for c in matrix.columns if c.endswith('_accounts') or c.endswith('_customers')
+                         or c in self.period_labels]
+        matrix[count_columns] = matrix[count_columns].astype('int64')
+        return matrix
+
+    @staticmethod
+    def _distinct(pairs, n_groups):
+        """Distinct customers per group code"""
+        unique_pairs = pairs.drop_duplicates()
+        return np.bincount(unique_pairs['group'].to_numpy(), minlength=n_groups)
+
+    def get(self, dim='ACNTS_BRN_CODE', with_ranks=False):
+        """
+        KPI-by-group matrix for a dimension.
+
+        Args:
+            dim: Grouping dimension
+            with_ranks: Add rank_<kpi> columns (1 = best)
+
+        Returns: DataFrame indexed by group value with one column per KPI
+        """
+        if dim not in self.matrices:
+            return pd.DataFrame()
+        matrix = self.matrices[dim]
+        if not with_ranks:
+            return matrix
+
+        ranks = matrix.rank(ascending=False, method='min')
+        for kpi in ASCENDING_KPIS:
+            if kpi in matrix.columns:
+                ranks[kpi] = matrix[kpi].rank(ascending=True, method='min')
+        return matrix.join(ranks.astype('Int64').add_prefix('rank_'))
+
+    def lookup(self, dim, value):
+        """KPI vector for one group (empty Series when the group is unknown)"""
+        matrix = self.matrices.get(dim)
+        if matrix is None or value not in matrix.index:
+            return pd.Series(dtype='float64')
+        return matrix.loc[value]
+
+    def league_table(self, dim, kpi, top_n=None, ascending=None):
+        """
+        Groups ordered by one KPI with their rank.
+
+        Returns: DataFrame with the group column, every KPI and rank
+        """
+        matrix = self.matrices.get(dim)
+        if matrix is None or kpi not in matrix.columns:
+            return pd.DataFrame()
+
+        ascending = kpi in ASCENDING_KPIS if ascending is None else ascending
+        table = matrix.sort_values(kpi, ascending=ascending).reset_index()
+        table.insert(0, 'rank', matrix[kpi].rank(ascending=ascending, method='min')
+                     .reindex(table[dim]).astype('int64').to_numpy())
+        return table.head(top_n) if top_n is not None else table
@@ -0,0 +1,179 @@
+import threading
+import time
+import pandas as pd
+from utils.disk_cache import default_cache, find_scope
+from utils.cache_manager import CacheManager, cache_manager
+
+
+class KPIDefinition:
+    """
+    A named metric and the inputs it declares: data sources read directly,
+    other KPIs it is derived from, and parameters it accepts.
+    """
+
+    def __init__(self, name, func, sources=(), depends=(), params=(), label=None, description='',
+                 persist=False, daily=False):
+        self.name = name
+        self.func = func
+        self.sources = tuple(sources)
+        self.depends = tuple(depends)
+        self.params = tuple(params)
+        self.label = label or name.replace('_', ' ').title()
+        self.description = description
+        self.persist = persist
+        self.daily = daily
+
+
+class KPIRegistry:
+    """
+    Registry of KPI definitions with a dependency-aware, memoized evaluator.
+
+    Each evaluated node is cached under (name, versions of every data source it
+    transitively reads, values of every parameter it transitively accepts).
+    Results are held in a CacheManager under the 'kpi' namespace, so a
+    module-level registry is shared by all pages and sessions in the server
+    process and counts against the global memory budget. A change to one
+    source only misses the KPIs that depend on it; everything else stays hot.
+
+    KPIs registered with persist=True are also kept in a disk cache under the
+    same key, so they survive restarts and are shared by every server process
+    on the host.
+
+    KPIs registered with daily=True are computed against the clock (e.g.
+    days since the last transaction); they, and every KPI derived from them,
+    also key on today's date, so they are recomputed once a day.
+    """
+
+    NAMESPACE = 'kpi'
+
+    def __init__(self, disk_cache=None, cache=None):
+        self.disk_cache = disk_cache
+        self.cache = cache if cache is not None else CacheManager()
+        self._definitions = {}
+        self._closures = {}
+        self._lock = threading.RLock()
+
+    @property
+    def stats(self):
+        """Hit/miss counters and compute seconds for KPI results"""
+        return self.cache.namespace_stats(self.NAMESPACE)
+
+    def register(self, name, sources=(), depends=(), params=(), label=None, description='', persist=False,
+                 daily=False):
+        """
+        Decorator registering a KPI function.
+
+        The function is called as func(calculator, **dependency_values, **params),
+        where dependency values are keyed by KPI name. Set daily=True when the
+        result depends on today's date.
+        """
+        def decorator(func):
+            with self._lock:
+                self._definitions[name] = KPIDefinition(
+                    name, func, sources, depends, params, label, description or (func.__doc__ or '').strip(),
+                    persist, daily
+                )
+                self._closures.clear()
+            return func
+        return decorator
+
+    def get_definition(self, name):
+        """Get a KPI definition by name"""
+        if name not in self._definitions:
+            raise KeyError(f"Unknown KPI: {name}")
+        return self._definitions[name]
+
+    def list_kpis(self):
+        """Get all registered KPI definitions"""
+        return list(self._definitions.values())
+
+    def _closure(self, name, visiting=()):
+        """Transitive (sources, params, daily) of a KPI, with cycle detection"""
+        if name in self._closures:
+            return self._closures[name]
+        if name in visiting:
+            raise ValueError(f"KPI dependency cycle: {' -> '.join(visiting + (name,))}")
+
+        definition = self.get_definition(name)
+        sources, params, daily = set(definition.sources), set(definition.params), definition.daily
+        for dependency in definition.depends:
+            dep_sources, dep_params, dep_daily = self._closure(dependency, visiting + (name,))
+            sources |= dep_sources
+            params |= dep_params
+            daily = daily or dep_daily
+
+        self._closures[name] = (frozenset(sources), frozenset(params), daily)
+        return self._closures[name]
+
+    def _cache_key(self, name, versioned, params, scope=None):
+        """Key of a KPI result; versioned is the calculator (or loader) whose data versions it was computed from"""
+        sources, param_names, daily = self._closure(name)
+        versions = tuple((source, versioned.get_data_version(source)) for source in sorted(sources))
+        if daily:
+            # Today's date counts as an input version: yesterday's results are stale like older data
+            versions += (('date', pd.Timestamp.now().date().isoformat()),)
+        values = tuple((param, params.get(param)) for param in sorted(param_names))
+        if scope is not None:
+            # Scoped results are a separate parameter set (same invalidation by data version)
+            values += (('scope', tuple(scope)),)
+        return (name, versions, values)
+
+    def evaluate(self, name, calculator, **params):
+        """
+        Evaluate a KPI, computing each dependency at most once per data version
+        and parameter set.
+
+        Args:
+            name: KPI name
+            calculator: MetricsCalculator bound to the current data
+            **params: Parameter values (only those a KPI declares are passed to it)
+
+        Returns: KPI value
+        """
+        definition = self.get_definition(name)
+        key = self._cache_key(name, calculator, params, find_scope(calculator))
+
+        found, value = self.cache.get(self.NAMESPACE, key)
+        if found:
+            return value
+
+        inputs = {dependency: self.evaluate(dependency, calculator, **params) for dependency in definition.depends}
+        inputs.update({param: params[param] for param in definition.params if params.get(param) is not None})
+
+        start = time.perf_counter()
+        if definition.persist and self.disk_cache is not None:
+            value = self.disk_cache.get_or_compute(('kpi',) + key, lambda: definition.func(calculator, **inputs))
+        else:
+            value = definition.func(calculator, **inputs)
+        elapsed = time.perf_counter() - start
+
+        # Drop results for the same node and parameters from older data versions (or earlier days)
+        self.cache.invalidate(self.NAMESPACE, lambda k: k[0] == name and k[2] == key[2] and k[1] != key[1])
+        return self.cache.put(self.NAMESPACE, key, value, elapsed)
+
+    def evaluate_many(self, names, calculator, **params):
+        """Evaluate several KPIs sharing intermediate results; returns {name: value}"""
+        return {name: self.evaluate(name, calculator, **params) for name in names}
+
+    def invalidate(self, sources=None):
+        """
+        Drop cached results that depend on the given data sources.
+
+        Args:
+            sources: Source name or list of names; None clears everything
+
+        Returns: int - number of cache entries removed
+        """
+        if sources is None:
+            return self.cache.invalidate(self.NAMESPACE)
+
+        sources = {sources} if isinstance(sources, str) else set(sources)
+        return self.cache.invalidate(self.NAMESPACE, lambda k: bool(sources & self._closure(k[0])[0]))
+
+    def dependents(self, source):
+        """Names of KPIs that (transitively) read a data source"""
+        return [name for name in self._definitions if source in self._closure(name)[0]]
+
+
+# Process-wide registry shared by all pages and sessions
+registry = KPIRegistry(disk_cache=default_cache, cache=cache_manager)
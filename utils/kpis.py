@@ -0,0 +1,166 @@
+import pandas as pd
+from utils.kpi_registry import registry
+from utils.channels import adoption_table, combination_table, segment_table
+from utils.concentration import concentration_summary, account_segment_table
+
+
+# Customer base
+
+@registry.register('total_customers', sources=['accounts'], label='Total Customers', persist=True)
+def total_customers(calculator):
+    """Unique customers (not accounts)"""
+    return calculator.processor.get_unique_customer_count()
+
+
+@registry.register('avg_products_per_customer', sources=['accounts', 'products'], label='Avg Products/Customer',
+                   persist=True)
+def avg_products_per_customer(calculator):
+    """Average distinct products per customer, excluding Account and Card types"""
+    return calculator.processor.get_avg_products_per_customer()
+
+
+@registry.register('open_customers', sources=['accounts'], label='Customers with Open Accounts', persist=True)
+def open_customers(calculator):
+    """Unique customers holding at least one open account"""
+    return calculator.processor.count_unique_customers(open_only=True)
+
+
+@registry.register('transacting_customers', sources=['accounts'], params=['active_since'],
+                   label='Transacting Customers', persist=True)
+def transacting_customers(calculator, active_since=None):
+    """Unique customers with an open account transacting in or after a month"""
+    return calculator.processor.count_unique_customers(open_only=True, active_since=active_since)
+
+
+@registry.register('products_per_customer', sources=['accounts'], label='Products per Customer', persist=True)
+def products_per_customer(calculator):
+    """Distribution of distinct products held per customer"""
+    return calculator.processor.get_products_per_customer_distribution()
+
+
+@registry.register('customer_tenure_years', sources=['accounts'], label='Avg Customer Tenure', daily=True)
+def customer_tenure_years(calculator):
+    """Average customer relationship duration in years"""
+    return calculator.calculate_customer_lifetime_value()
+
+
+# Activity
+
+@registry.register('activity_split', sources=['accounts'], params=['days_threshold'], label='Account Activity',
+                   daily=True)
+def activity_split(calculator, days_threshold=90):
+    """Active vs inactive account counts for a days-since-last-transaction threshold"""
+    return calculator.processor.get_account_activity_counts(days_threshold)
+
+
+@registry.register('quarterly_funded_accounts', sources=['accounts'], params=['year'],
+                   label='Quarterly Funded Accounts')
+def quarterly_funded_accounts(calculator, year=2025):
+    """Funded accounts opened per quarter"""
+    return calculator.processor.get_quarterly_funded_accounts(year)
+
+
+@registry.register('monthly_churn', sources=['accounts', 'churn'], label='Monthly Churn')
+def monthly_churn(calculator):
+    """Monthly churn series"""
+    return calculator.processor.calculate_monthly_churn_rate()
+
+
+@registry.register('latest_churn_rate', depends=['monthly_churn'], label='Latest Monthly Churn Rate')
+def latest_churn_rate(calculator, monthly_churn):
+    """Most recent month's churn rate (None when no churn data)"""
+    return monthly_churn.iloc[-1]['churn_rate'] if len(monthly_churn) > 0 else None
+
+
+# Products
+
+@registry.register('product_penetration', sources=['accounts', 'products'], label='Product Penetration',
+                   persist=True)
+def product_penetration(calculator):
+    """Customer penetration rate per product"""
+    return calculator.calculate_product_penetration()
+
+
+# Channels
+
+@registry.register('channel_histogram', sources=['accounts'], persist=True)
+def channel_histogram(calculator):
+    """Accounts per channel combination bitmask, with the flag columns present"""
+    return calculator.processor.get_channel_histogram()
+
+
+@registry.register('channel_adoption', depends=['channel_histogram'], label='Channel Adoption')
+def channel_adoption(calculator, channel_histogram):
+    """Adoption rate per channel"""
+    histogram, present = channel_histogram
+    return adoption_table(histogram, present) if present else pd.DataFrame()
+
+
+@registry.register('channel_combinations', depends=['channel_histogram'], label='Channel Combinations')
+def channel_combinations(calculator, channel_histogram):
+    """Every non-empty channel combination, most common first"""
+    histogram, present = channel_histogram
+    return combination_table(histogram) if present and histogram.sum() > 0 else pd.DataFrame()
+
+
+@registry.register('channel_segments', depends=['channel_histogram'], label='Channel Segments')
+def channel_segments(calculator, channel_histogram):
+    """Digital-only vs branch-only account segments"""
+    histogram, present = channel_histogram
+    return segment_table(histogram) if present and histogram.sum() > 0 else pd.DataFrame()
+
+
+# Concentration
+
+@registry.register('customer_concentration', sources=['accounts'], persist=True)
+def customer_concentration(calculator):
+    """Sorted accounts-per-customer distribution"""
+    return calculator.get_customer_concentration('accounts')
+
+
+@registry.register('balance_concentration', sources=['accounts', 'currency', 'fx_rates'], persist=True)
+def balance_concentration(calculator):
+    """Sorted balance-per-customer distribution"""
+    return calculator.get_customer_concentration('balance')
+
+
+@registry.register('account_concentration', depends=['customer_concentration'], label='Account Concentration')
+def account_concentration(calculator, customer_concentration):
+    """Top 10%/20% customer shares, Gini and HHI"""
+    return concentration_summary(customer_concentration) if customer_concentration is not None else {}
+
+
+@registry.register('customer_segments', depends=['customer_concentration'], label='Customer Segments')
+def customer_segments(calculator, customer_concentration):
+    """Customers binned by number of accounts"""
+    return account_segment_table(customer_concentration) if customer_concentration is not None else pd.DataFrame()
+
+
+@registry.register('branch_concentration', sources=['accounts', 'currency', 'fx_rates'],
+                   params=['concentration_value'], label='Branch Concentration', persist=True)
+def branch_concentration(calculator, concentration_value='accounts'):
+    """Per-branch Gini, HHI and top-share figures"""
+    return calculator.calculate_branch_concentration(concentration_value)
+
+
+# Per-group batch
+
+@registry.register('group_kpi_matrix', sources=['accounts', 'currency', 'fx_rates'],
+                   params=['days_threshold', 'window', 'year', 'product', 'currency'], label='KPIs by Group',
+                   daily=True)
+def group_kpi_matrix(calculator, days_threshold=90, window=None, year=None, product=None, currency=None):
+    """Full KPI vector for every branch, product and currency"""
+    return calculator.processor.get_group_kpi_matrix(days_threshold, window, year, product, currency)
+
+
+def get_kpi(name, calculator, **params):
+    """
+    Evaluate one KPI through the shared registry.
+    Results are shared across sessions, so treat them as read-only.
+    """
+    return registry.evaluate(name, calculator, **params)
+
+
+def get_kpis(names, calculator, **params):
+    """Evaluate several KPIs through the shared registry; returns {name: value}"""
+    return registry.evaluate_many(names, calculator, **params)
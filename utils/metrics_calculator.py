@@ -1,6 +1,11 @@
 import pandas as pd
 import numpy as np
+import threading
 from datetime import datetime, timedelta
+from utils.channels import adoption_table, combination_table, segment_table
+from utils.concentration import Concentration, account_segment_table, concentration_summary, grouped_concentration
+from utils.cache_manager import memoized
+from utils.data_processor import get_shared_processor
 
 class MetricsCalculator:
     """
@@ -10,6 +15,11 @@ class MetricsCalculator:
     def __init__(self, data_processor):
         self.processor = data_processor
         self.accounts_df = data_processor.accounts_df
+        self.data_versions = data_processor.data_versions
+    
+    def get_data_version(self, sources=None):
+        """Version of the data this calculator was built from (see DataLoader.get_data_version)"""
+        return self.processor.get_data_version(sources)
     
     def calculate_growth_rate(self, current_value, previous_value):
         """Calculate growth rate percentage"""
@@ -30,6 +40,7 @@ class MetricsCalculator:
         
         return (((end_value / start_value) ** (1 / periods)) - 1) * 100
     
+    @memoized(sources=['accounts'], daily=True)
     def calculate_customer_lifetime_value(self):
         """
         Calculate estimated customer lifetime value.
@@ -53,6 +64,7 @@ class MetricsCalculator:
         
         return 0
     
+    @memoized(sources=['accounts'])
     def calculate_retention_rate(self, period_start, period_end):
         """
         Calculate customer retention rate for a period.
@@ -88,6 +100,7 @@ class MetricsCalculator:
         
         return (customers_retained / customers_start) * 100
     
+    @memoized(sources=['accounts', 'products'])
     def calculate_product_penetration(self):
         """
         Calculate product penetration rates.
@@ -125,81 +138,154 @@ class MetricsCalculator:
         
         return pd.DataFrame()
     
+    def _customer_values(self, value='accounts', by_branch=False):
+        """
+        Per-customer accounts or balance, aggregated with bincount over factorized keys.
+        Balances are converted to USD when FX rates are loaded (unconverted rows count as 0).
+        
+        Returns: (values per entity, branch per entity or None)
+        """
+        df = self.accounts_df
+        keys = [df['ACNTS_BRN_CODE'], df['ACNTS_CLIENT_NUM']] if by_branch else [df['ACNTS_CLIENT_NUM']]
+        codes, uniques = pd.factorize(pd.MultiIndex.from_arrays(keys) if by_branch else keys[0])
+        keep = codes >= 0
+        
+        if value == 'balance':
+            balance = df[['BASE_CURR_BAL', 'ACNTS_CURR_CODE']] if 'ACNTS_CURR_CODE' in df.columns else None
+            converter = self.processor.get_currency_converter()
+            if balance is not None and converter.has_rates():
+                weights = converter.convert(balance, 'BASE_CURR_BAL', 'ACNTS_CURR_CODE')['BASE_CURR_BAL']
+            else:
+                weights = df['BASE_CURR_BAL']
+            weights = np.nan_to_num(pd.to_numeric(weights, errors='coerce').to_numpy(dtype='float64'))
+            values = np.bincount(codes[keep], weights=weights[keep], minlength=len(uniques))
+        else:
+            values = np.bincount(codes[keep], minlength=len(uniques))
+        
+        branches = uniques.get_level_values(0) if by_branch else None
+        return values, branches
+    
+    @memoized(sources=['accounts', 'currency', 'fx_rates'])
+    def get_customer_concentration(self, value='accounts'):
+        """
+        Concentration of accounts (or balances) across customers, built once per data version.
+        
+        Args:
+            value: 'accounts' or 'balance'
+            
+        Returns: Concentration or None when customer numbers are unavailable
+        """
+        if self.accounts_df is None or 'ACNTS_CLIENT_NUM' not in self.accounts_df.columns:
+            return None
+        if value == 'balance' and 'BASE_CURR_BAL' not in self.accounts_df.columns:
+            return None
+        
+        values, _ = self._customer_values(value)
+        return Concentration(values)
+    
+    @memoized(sources=['accounts'])
     def calculate_account_concentration(self):
         """
         Calculate concentration metrics (e.g., top 10% customers' share).
         Returns: dict with concentration metrics
         """
-        if self.accounts_df is None:
+        concentration = self.get_customer_concentration('accounts')
+        if concentration is None:
             return {}
         
-        df = self.accounts_df.copy()
+        return concentration_summary(concentration)
+    
+    @memoized(sources=['accounts', 'currency', 'fx_rates'])
+    def calculate_lorenz_curve(self, value='accounts', points=101):
+        """
+        Lorenz curve of accounts or balances across customers.
+        Returns: DataFrame with population_share and value_share (%)
+        """
+        concentration = self.get_customer_concentration(value)
+        if concentration is None:
+            return pd.DataFrame()
+        return concentration.lorenz_curve(points)
+    
+    @memoized(sources=['accounts'])
+    def calculate_customer_segments(self):
+        """
+        Customer segments by number of accounts (binned on the sorted distribution).
+        Returns: DataFrame with segment, customer count and account statistics
+        """
+        concentration = self.get_customer_concentration('accounts')
+        if concentration is None:
+            return pd.DataFrame()
         
-        if 'ACNTS_CLIENT_NUM' not in df.columns:
-            return {}
+        return account_segment_table(concentration)
+    
+    @memoized(sources=['accounts', 'currency', 'fx_rates'])
+    def calculate_branch_concentration(self, value='accounts'):
+        """
+        Per-branch concentration (Gini, HHI, top 10%/20% shares) in one grouped pass.
+        Customers with accounts in several branches count once per branch.
         
-        # Count accounts per customer
-        accounts_per_customer = df.groupby('ACNTS_CLIENT_NUM').size().reset_index(name='account_count')
-        accounts_per_customer = accounts_per_customer.sort_values('account_count', ascending=False)
+        Returns: DataFrame with one row per branch
+        """
+        if self.accounts_df is None or 'ACNTS_BRN_CODE' not in self.accounts_df.columns:
+            return pd.DataFrame()
+        if self.get_customer_concentration(value) is None:
+            return pd.DataFrame()
         
-        total_accounts = len(df)
-        total_customers = len(accounts_per_customer)
-        
-        # Top 10% customers
-        top_10_pct_count = int(total_customers * 0.1)
-        top_10_pct_accounts = accounts_per_customer.head(top_10_pct_count)['account_count'].sum()
-        
-        # Top 20% customers
-        top_20_pct_count = int(total_customers * 0.2)
-        top_20_pct_accounts = accounts_per_customer.head(top_20_pct_count)['account_count'].sum()
-        
-        return {
-            'total_customers': total_customers,
-            'total_accounts': total_accounts,
-            'top_10_pct_customers': top_10_pct_count,
-            'top_10_pct_accounts': top_10_pct_accounts,
-            'top_10_pct_share': (top_10_pct_accounts / total_accounts) * 100,
-            'top_20_pct_customers': top_20_pct_count,
-            'top_20_pct_accounts': top_20_pct_accounts,
-            'top_20_pct_share': (top_20_pct_accounts / total_accounts) * 100
-        }
+        values, branches = self._customer_values(value, by_branch=True)
+        result = grouped_concentration(branches, values)
+        return result.rename(columns={'group': 'branch', 'entities': 'customers'})
     
+    @memoized(sources=['accounts'])
     def calculate_channel_adoption(self):
         """
         Calculate channel adoption rates (Internet Banking, Mobile, ATM, etc.).
+        Per-channel counts are read off the combination histogram.
         Returns: DataFrame with channel metrics
         """
         if self.accounts_df is None:
             return pd.DataFrame()
         
-        df = self.accounts_df.copy()
+        histogram, present = self.processor.get_channel_histogram()
+        if not present:
+            return pd.DataFrame()
         
-        total_accounts = len(df)
+        return adoption_table(histogram, present)
+    
+    @memoized(sources=['accounts'])
+    def calculate_channel_combinations(self, top_n=15):
+        """
+        Multi-channel combinations (UpSet-style intersections).
         
-        channel_columns = {
-            'ACNTS_INET_OPERN': 'Internet Banking',
-            'ACNTS_MBLBNK_OPERN': 'Mobile Banking',
-            'ACNTS_ATM_OPERN': 'ATM',
-            'ACNTS_SMS_OPERN': 'SMS Banking',
-            'ACNTS_CALL_CENTER_OPERN': 'Call Center',
-            'ACNTS_TELLER_OPERN': 'Teller/Branch'
-        }
+        Args:
+            top_n: Number of most common combinations to return (None for all)
+            
+        Returns: DataFrame with combination label, number of channels, accounts and share
+        """
+        if self.accounts_df is None:
+            return pd.DataFrame()
         
-        channel_stats = []
+        histogram, present = self.processor.get_channel_histogram()
+        if not present or histogram.sum() == 0:
+            return pd.DataFrame()
         
-        for col, channel_name in channel_columns.items():
-            if col in df.columns:
-                enabled_count = df[df[col] == 'Y'].shape[0]
-                adoption_rate = (enabled_count / total_accounts) * 100 if total_accounts > 0 else 0
-                
-                channel_stats.append({
-                    'channel': channel_name,
-                    'enabled_accounts': enabled_count,
-                    'adoption_rate': adoption_rate
-                })
+        return combination_table(histogram, top_n)
+    
+    @memoized(sources=['accounts'])
+    def calculate_channel_segments(self):
+        """
+        Digital-only vs branch-only vs multi-channel account segments.
+        Returns: DataFrame with segment, accounts and share
+        """
+        if self.accounts_df is None:
+            return pd.DataFrame()
+        
+        histogram, present = self.processor.get_channel_histogram()
+        if not present or histogram.sum() == 0:
+            return pd.DataFrame()
         
-        return pd.DataFrame(channel_stats).sort_values('adoption_rate', ascending=False)
+        return segment_table(histogram)
     
+    @memoized(sources=['accounts'])
     def calculate_dormancy_metrics(self):
         """
         Calculate dormancy and inoperative account metrics.
@@ -227,3 +313,38 @@ class MetricsCalculator:
             metrics['inoperative_rate'] = (inop_count / total_accounts) * 100 if total_accounts > 0 else 0
         
         return metrics
+
+
+_shared_calculators = {}
+_shared_calculators_lock = threading.Lock()
+
+
+def get_shared_calculator(loader=None, scope=None):
+    """
+    Process-wide MetricsCalculator over the shared DataProcessor, rebuilt
+    together with it when the data version changes.
+    
+    Args:
+        loader: DataLoader (default: the shared loader)
+        scope: DataScope of the user (None for unrestricted data)
+    """
+    processor = get_shared_processor(loader, scope)
+    
+    with _shared_calculators_lock:
+        key = (id(processor.loader), scope)
+        calculator = _shared_calculators.get(key)
+        if calculator is None or calculator.processor is not processor:
+            calculator = MetricsCalculator(processor)
+            # Calculators of any scope over an older data version
+            for stale in [k for k, c in _shared_calculators.items()
+                          if k[0] == key[0] and c.processor.data_version != processor.data_version]:
+                del _shared_calculators[stale]
+            _shared_calculators[key] = calculator
+        return calculator
+
+
+def release_shared_calculators(loader):
+    """Drop the shared calculators (any scope) built over a loader that is no longer shared"""
+    with _shared_calculators_lock:
+        for key in [key for key, c in _shared_calculators.items() if c.processor.loader is loader]:
+            del _shared_calculators[key]
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+# Versioned schema files, named <major>.<minor>.<patch>__<name>.sql and applied in version order
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / 'database' / 'migrations'
+MIGRATION_FILE = re.compile(r'^(\d+)\.(\d+)\.(\d+)__(\w+)\.sql$')
+
+# Apply pending migrations when an app process first connects (0 leaves it to database/init_db.py)
+DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', '1').lower() in ('1', 'true', 'yes')
+
+# Advisory lock held while migrating, so replicas starting together apply each file once
+MIGRATION_LOCK = 'schema_migrations'
+
+# schema_version predates the runner; the checksum column is added to tables created by schema 1.0
+BOOTSTRAP_SQL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version_id SERIAL PRIMARY KEY,
+    version VARCHAR(20) NOT NULL,
+    description TEXT,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+ALTER TABLE schema_version ADD COLUMN IF NOT EXISTS checksum VARCHAR(64);
+"""
+
+Migration = namedtuple('Migration', ['version', 'key', 'description', 'path', 'checksum'])
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Migration files in version order (the description is the second header comment line)"""
+    migrations = []
+    for path in Path(directory).glob('*.sql'):
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            continue
+        sql = path.read_text(encoding='utf-8')
+        comments = [line[2:].strip() for line in sql.splitlines()[:3] if line.startswith('--')]
+        description = comments[1] if len(comments) > 1 else match.group(4).replace('_', ' ')
+        key = tuple(int(part) for part in match.groups()[:3])
+        migrations.append(Migration('.'.join(match.groups()[:3]), key, description, path,
+                                    hashlib.sha256(sql.encode('utf-8')).hexdigest()))
+    return sorted(migrations, key=lambda migration: migration.key)
+
+
+def _applied_versions(connection):
+    return {row.version: row.checksum for row in connection.execute(
+        text('SELECT version, checksum FROM schema_version'))}
+
+
+def schema_is_current(engine, migrations=None):
+    """
+    Startup fast path: one SELECT against schema_version.
+
+    Returns: bool - False when a migration is pending or schema_version doesn't exist yet
+    """
+    migrations = discover_migrations() if migrations is None else migrations
+    try:
+        with engine.connect() as connection:
+            applied = {row.version for row in connection.execute(text('SELECT version FROM schema_version'))}
+    except ProgrammingError:
+        return False
+    return all(migration.version in applied for migration in migrations)
+
+
+def migrate(engine, migrations=None):
+    """
+    Apply pending migrations (PostgreSQL only).
+
+    Runs under a session advisory lock. Each file is executed whole (so
+    dollar-quoted function bodies are left intact) in its own transaction,
+    together with its schema_version row, so a failed migration leaves no
+    partial changes and is retried on the next run. Versions recorded
+    before the runner existed (schema.sql inserted '1.0.0') count as
+    applied.
+
+    Returns: list of Migration applied
+    """
+    if engine.dialect.name != 'postgresql':
+        return []
+    migrations = discover_migrations() if migrations is None else migrations
+
+    applied_now = []
+    with engine.connect() as connection:
+        connection.execute(text('SELECT pg_advisory_lock(hashtext(:lock))'), {'lock': MIGRATION_LOCK})
+        connection.commit()
+        try:
+            connection.exec_driver_sql(BOOTSTRAP_SQL)
+            connection.commit()
+            # Re-read under the lock: another replica may have migrated while we waited
+            applied = _applied_versions(connection)
+            connection.commit()
+
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+                with connection.begin():
+                    # no_parameters: the file is sent as-is, so '%' in SQL isn't taken for a placeholder
+                    connection.exec_driver_sql(migration.path.read_text(encoding='utf-8'),
+                                               execution_options={'no_parameters': True})
+                    connection.execute(
+                        text('INSERT INTO schema_version (version, description, checksum) '
+                             'VALUES (:version, :description, :checksum)'),
+                        {'version': migration.version, 'description': migration.description,
+                         'checksum': migration.checksum}
+                    )
+                applied_now.append(migration)
+        finally:
+            try:
+                connection.rollback()
+                connection.execute(text('SELECT pg_advisory_unlock(hashtext(:lock))'), {'lock': MIGRATION_LOCK})
+                connection.commit()
+            except Exception:
+                # Drop the connection rather than return it to the pool still holding the lock
+                connection.invalidate()
+    return applied_now
+
+
+def ensure_schema(engine):
+    """Bring the schema up to date unless the fast path shows it already is (PostgreSQL only)"""
+    if engine.dialect.name != 'postgresql':
+        return []
+    migrations = discover_migrations()
+    if schema_is_current(engine, migrations):
+        return []
+    return migrate(engine, migrations)
+
+
+def migration_status(engine):
+    """
+    Every known migration with its state.
+
+    Returns: list of dicts (version, description, state: 'applied', 'pending' or
+        'modified' when the file changed after it was applied)
+    """
+    applied = {}
+    try:
+        with engine.connect() as connection:
+            applied = _applied_versions(connection)
+    except ProgrammingError:
+        try:
+            # schema_version from schema 1.0, before the runner added checksums
+            with engine.connect() as connection:
+                applied = {row.version: None for row in connection.execute(text('SELECT version FROM schema_version'))}
+        except ProgrammingError:
+            pass
+    status = []
+    for migration in discover_migrations():
+        if migration.version not in applied:
+            state = 'pending'
+        elif applied[migration.version] not in (None, migration.checksum):
+            state = 'modified'
+        else:
+            state = 'applied'
+        status.append({'version': migration.version, 'description': migration.description, 'state': state})
+    return status
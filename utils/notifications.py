@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+import streamlit as st
+from utils.database import (
+    create_notification,
+    count_unread_notifications,
+    get_notifications_page,
+    mark_notification_read,
+    mark_all_notifications_read
+)
+from utils.auth import is_authenticated
+from utils.db_events import db_events
+
+# Channel the notifications trigger (migration 1.2.0) publishes changed user ids on
+NOTIFY_CHANNEL = 'notifications_changed'
+
+# Seconds a cached unread count is trusted: short when only this process's
+# writes invalidate it, long (a safety net) while LISTEN is connected
+UNREAD_COUNT_TTL = float(os.environ.get('BI_NOTIFICATION_COUNT_TTL', 30))
+LISTENING_COUNT_TTL = 600
+
+NOTIFICATIONS_PAGE_SIZE = 20
+
+
+class NotificationService:
+    """
+    Notifications with per-user unread counts cached in process.
+
+    On PostgreSQL the service subscribes to NOTIFY_CHANNEL (utils.db_events);
+    the notifications trigger publishes the user id of every insert, read
+    or delete, so cached counts are dropped as soon as any process changes
+    them. Without a listener (other databases, or while reconnecting) writes
+    made through this service invalidate locally and counts expire after
+    UNREAD_COUNT_TTL. Lists are read with keyset pagination.
+    """
+
+    def __init__(self, ttl=UNREAD_COUNT_TTL):
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._counts = {}  # user_id -> (count, monotonic time fetched)
+        self._lock = threading.Lock()
+        self._subscribed = None
+
+    def unread_count(self, user_id):
+        """Unread notifications for a user, cached"""
+        self.start_listener()
+        ttl = LISTENING_COUNT_TTL if self._subscribed and db_events.listening else self.ttl
+        with self._lock:
+            cached = self._counts.get(user_id)
+            if cached is not None and time.monotonic() - cached[1] < ttl:
+                self.stats['hits'] += 1
+                return cached[0]
+            self.stats['misses'] += 1
+
+        count = count_unread_notifications(user_id)
+        with self._lock:
+            self._counts[user_id] = (count, time.monotonic())
+        return count
+
+    def invalidate(self, user_id=None):
+        """Drop the cached count of one user, or of everyone"""
+        with self._lock:
+            if user_id is None:
+                self._counts.clear()
+            else:
+                self._counts.pop(user_id, None)
+            self.stats['invalidations'] += 1
+
+    def notify(self, user_id, title, message, notification_type='info', priority=3, link_to_dashboard=None):
+        """Create a notification for a user"""
+        notification = create_notification(user_id, title, message, notification_type, priority, link_to_dashboard)
+        self.invalidate(user_id)
+        return notification
+
+    def mark_read(self, user_id, notification_id):
+        mark_notification_read(notification_id)
+        self.invalidate(user_id)
+
+    def mark_all_read(self, user_id):
+        updated = mark_all_notifications_read(user_id)
+        self.invalidate(user_id)
+        return updated
+
+    def page(self, user_id, before=None, limit=NOTIFICATIONS_PAGE_SIZE, unread_only=False):
+        """
+        One page of a user's notifications, newest first.
+
+        Returns: (list of Notification, cursor for the next page or None on the last page)
+        """
+        rows = get_notifications_page(user_id, before, limit + 1, unread_only)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].created_at, rows[-1].notification_id)
+
+    def start_listener(self):
+        """Subscribe to count invalidations once per process (PostgreSQL only)"""
+        with self._lock:
+            if self._subscribed is not None:
+                return
+            self._subscribed = False
+        try:
+            self._subscribed = db_events.subscribe(NOTIFY_CHANNEL, self._on_notify,
+                                                   on_connect=self.invalidate)
+        except Exception:
+            self._subscribed = None  # no database configured yet; try again on the next call
+
+    def _on_notify(self, payload):
+        self.invalidate(int(payload) if payload.isdigit() else None)
+
+
+# Process-wide notification service
+notification_service = NotificationService()
+
+
+def show_notification_badge():
+    """Sidebar link to the Notifications page with the unread count (logged-in users only)"""
+    if not is_authenticated():
+        return
+    try:
+        count = notification_service.unread_count(st.session_state.user_id)
+    except Exception:
+        return
+    st.sidebar.page_link("pages/15_Notifications.py", label=f"Notifications ({count:,} unread)" if count
+                         else "Notifications", icon="🔔")
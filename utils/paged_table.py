@@ -0,0 +1,85 @@
+import pandas as pd
+import numpy as np
+
+# Page sizes offered by the account list pages
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Derived list columns: name -> (source column, source sorts in the opposite direction)
+DERIVED_COLUMNS = {
+    'days_since_last_txn': ('ACNTS_LAST_TRAN_DATE', True)
+}
+
+
+def filter_codes(series):
+    """
+    Integer code per row for an equality-filter column.
+
+    Returns: (numpy int32 array of codes, -1 for missing; Index of distinct values by code)
+    """
+    codes, uniques = pd.factorize(series)
+    return codes.astype(np.int32), pd.Index(uniques)
+
+
+def table_filters(filters):
+    """Cache-key form of a dict of column -> value filters, without the 'All'/None entries"""
+    return tuple(sorted(
+        (column, value) for column, value in (filters or {}).items() if value is not None and value != 'All'
+    ))
+
+
+def value_mask(codes, uniques, value):
+    """Rows equal to a filter value (or any of a list of values)"""
+    values = value if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)) else [value]
+    wanted = uniques.get_indexer(list(values))
+    wanted = wanted[wanted >= 0]
+    if len(wanted) == 1:
+        return codes == wanted[0]
+    return np.isin(codes, wanted)
+
+
+def sort_order(series, ascending=True):
+    """
+    Row positions ordering a column (stable, missing values last).
+
+    Returns: numpy int64 array of positions
+    """
+    ordered = series.reset_index(drop=True).sort_values(ascending=ascending, kind='stable', na_position='last')
+    return ordered.index.to_numpy(dtype=np.int64)
+
+
+def sorted_selection(order, mask):
+    """Positions selected by a boolean row mask, in the order of a cached sort"""
+    return order[mask[order]]
+
+
+def page_bounds(total, page, page_size):
+    """
+    Clamp a 1-based page number to the available rows.
+
+    Returns: (page, start, stop, total_pages)
+    """
+    total_pages = max((total + page_size - 1) // page_size, 1)
+    page = min(max(int(page), 1), total_pages)
+    start = (page - 1) * page_size
+    return page, start, min(start + page_size, total), total_pages
+
+
+def materialize(df, positions, columns=None, now=None):
+    """
+    Build the display frame for a set of row positions only.
+
+    Args:
+        df: Source frame (positions index into it)
+        positions: Row positions to materialize, in display order
+        columns: Columns to include; DERIVED_COLUMNS are computed for these rows only
+        now: Reference time for derived day counts (default now)
+
+    Returns: DataFrame with the requested rows and columns
+    """
+    columns = list(columns) if columns is not None else list(df.columns)
+    stored = [col for col in columns if col in df.columns]
+    page = df.iloc[positions][stored]
+    if 'days_since_last_txn' in columns and 'ACNTS_LAST_TRAN_DATE' in df.columns:
+        last_txn = df['ACNTS_LAST_TRAN_DATE'].iloc[positions]
+        page = page.assign(days_since_last_txn=((now or pd.Timestamp.now()) - last_txn).dt.days)
+    return page[[col for col in columns if col in page.columns]]
@@ -0,0 +1,22 @@
+"""
+Password hashing for NMB BI Portal
+Kept free of Streamlit and database imports so password hashing worker
+processes (utils/provisioning.py) start quickly
+"""
+
+import bcrypt
+
+BCRYPT_ROUNDS = 12
+
+def hash_password(password: str) -> str:
+    """Hash password using bcrypt"""
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+    return hashed.decode('utf-8')
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Verify password against hash"""
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except Exception:
+        return False
@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+from utils.database import get_roles
+from utils.db_events import db_events
+
+# Channel the roles trigger (migration 1.3.0) publishes on when permissions change
+ROLES_CHANNEL = 'roles_changed'
+
+# Seconds between reloads when no LISTEN connection is available
+ROLES_REFRESH_SECONDS = 300
+
+# Capability bits (full export also sets PERM_EXPORT_LIMITED, so a role with
+# full export holds every bit of one with limited export)
+PERM_EXPORT = 1 << 0
+PERM_EXPORT_LIMITED = 1 << 1
+PERM_ADMIN = 1 << 2
+
+# Dashboard bits, in navigation order
+DASHBOARDS = [
+    'Executive Summary',
+    'Active Email Accounts',
+    'Account Activity',
+    'Customer Metrics',
+    'Quarterly Performance',
+    'Campaign Analysis',
+    'Customer Engagement Analytics',
+    'Sentiment Analysis',
+    'Social Media Analytics',
+    'Cache Administration',
+    'Export Downloads',
+    'Notifications',
+    'User Provisioning'
+]
+DASHBOARD_BITS = {name: 1 << (8 + i) for i, name in enumerate(DASHBOARDS)}
+
+# Dashboards only roles with the admin permission can open
+ADMIN_DASHBOARDS = ['Cache Administration', 'User Provisioning']
+
+# Dashboard groups usable in roles.permissions['dashboards'] (dashboard names work too)
+DASHBOARD_GROUPS = {
+    'all': [d for d in DASHBOARDS if d not in ADMIN_DASHBOARDS],
+    'operational': [
+        'Executive Summary',
+        'Active Email Accounts',
+        'Account Activity',
+        'Quarterly Performance',
+        'Campaign Analysis',
+        'Social Media Analytics',
+        'Export Downloads',
+        'Notifications'
+    ],
+    'selected': ['Executive Summary', 'Quarterly Performance', 'Export Downloads', 'Notifications'],
+    'executive_summary_limited': ['Executive Summary', 'Quarterly Performance', 'Export Downloads', 'Notifications']
+}
+
+# Used until the roles table can be read (same as the rows inserted by migration 1.0.0)
+DEFAULT_ROLE_PERMISSIONS = {
+    1: {'dashboards': ['all'], 'export': True, 'admin': True},
+    2: {'dashboards': ['all'], 'export': 'limited', 'admin': False},
+    3: {'dashboards': ['operational'], 'export': False, 'admin': False},
+    4: {'dashboards': ['selected'], 'export': False, 'admin': False},
+    5: {'dashboards': ['executive_summary_limited'], 'export': False, 'admin': False}
+}
+
+
+def compile_permissions(permissions):
+    """
+    Permission bitmask for a roles.permissions document.
+
+    Args:
+        permissions: Dict (or JSON text) with 'dashboards' (group or dashboard
+            names), 'export' (true, 'limited' or false) and 'admin' (bool)
+
+    Returns: int
+    """
+    if isinstance(permissions, str):
+        permissions = json.loads(permissions or '{}')
+    permissions = permissions or {}
+
+    mask = 0
+    for entry in permissions.get('dashboards') or []:
+        for name in DASHBOARD_GROUPS.get(entry, [entry]):
+            mask |= DASHBOARD_BITS.get(name, 0)
+
+    export = permissions.get('export')
+    if export is True:
+        mask |= PERM_EXPORT | PERM_EXPORT_LIMITED
+    elif export == 'limited':
+        mask |= PERM_EXPORT_LIMITED
+
+    if permissions.get('admin') is True:
+        mask |= PERM_ADMIN
+        for name in ADMIN_DASHBOARDS:
+            mask |= DASHBOARD_BITS[name]
+    return mask
+
+
+class PermissionCache:
+    """
+    Role permission bitmasks compiled from the roles table.
+
+    Roles are loaded once per process and compiled with
+    compile_permissions. On PostgreSQL the cache reloads when the roles
+    trigger NOTIFYs ROLES_CHANNEL; otherwise it reloads every
+    ROLES_REFRESH_SECONDS. Checks are a dict lookup and a bit test; until
+    the table can be read, DEFAULT_ROLE_PERMISSIONS apply.
+    """
+
+    def __init__(self):
+        self._masks = {level: compile_permissions(p) for level, p in DEFAULT_ROLE_PERMISSIONS.items()}
+        self._loaded_at = None
+        self._subscribed = False
+        self._lock = threading.Lock()
+
+    def reload(self):
+        """Re-read and compile the roles table (keeps the current masks if it can't be read)"""
+        try:
+            masks = {role.role_level: compile_permissions(role.permissions) for role in get_roles()}
+        except Exception:
+            masks = None
+        with self._lock:
+            self._loaded_at = time.monotonic()
+            if masks:
+                self._masks = masks
+
+    def _ensure_loaded(self):
+        if self._loaded_at is not None and (self._subscribed and db_events.listening
+                                            or time.monotonic() - self._loaded_at < ROLES_REFRESH_SECONDS):
+            return
+        if not self._subscribed:
+            try:
+                self._subscribed = db_events.subscribe(ROLES_CHANNEL, lambda payload: self.reload(),
+                                                       on_connect=self.reload)
+            except Exception:
+                pass
+        self.reload()
+
+    def mask(self, role_level):
+        """Permission bitmask of a role (0 for unknown roles)"""
+        self._ensure_loaded()
+        return self._masks.get(role_level, 0)
+
+    def has(self, role_level, bits):
+        """True if the role holds every bit in bits"""
+        return bits != 0 and self.mask(role_level) & bits == bits
+
+
+# Process-wide permission cache
+permission_cache = PermissionCache()
+
+
+def dashboard_bit(dashboard_name):
+    """Bit for a dashboard; dashboards outside DASHBOARDS require the admin permission"""
+    return DASHBOARD_BITS.get(dashboard_name, PERM_ADMIN)
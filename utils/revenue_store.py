@@ -0,0 +1,218 @@
+import pandas as pd
+import numpy as np
+from utils.gl_hierarchy import (
+    to_gl_code,
+    FUNDED_INCOME_CATEGORIES,
+    NON_FUNDED_INCOME_CATEGORIES,
+    INCOME_CATEGORY_NAMES
+)
+
+# Column names that may carry the balance date in a revenue_gls extract
+PERIOD_COLUMNS = ['PERIOD', 'GLBALH_ASON_DATE', 'GLBALH_DATE', 'AS_AT_DATE', 'BALANCE_DATE']
+
+
+class RevenueStore:
+    """
+    Time-series store of periodic GL balance extracts (revenue_gls format).
+
+    Balances are held in a single frame indexed by (period, gl_code, branch,
+    currency) and sorted, so date ranges are index slices and every monthly
+    series, MoM delta and income-type split is a grouped/vectorized operation.
+    """
+
+    KEY = ['period', 'gl_code', 'branch', 'currency']
+
+    def __init__(self, gl_master=None, cumulative_balances=False):
+        """
+        Args:
+            gl_master: GL master used to classify GLs into income categories
+            cumulative_balances: True when extracts carry year-to-date balances,
+                in which case monthly revenue is the within-year difference
+        """
+        self.cumulative_balances = cumulative_balances
+        self._categories = self._build_category_map(gl_master)
+        self.store = pd.DataFrame(
+            columns=['balance', 'category'],
+            index=pd.MultiIndex.from_arrays([[], [], [], []], names=self.KEY)
+        )
+
+    def _build_category_map(self, gl_master):
+        """Map GL code -> Gl Catg Code for income GLs"""
+        if gl_master is None or 'Gl Number' not in gl_master.columns or 'Gl Catg Code' not in gl_master.columns:
+            return pd.Series(dtype='float64')
+
+        income = gl_master[gl_master['Gl Type'] == 'I'] if 'Gl Type' in gl_master.columns else gl_master
+        codes = to_gl_code(income['Gl Number'])
+        categories = pd.to_numeric(income['Gl Catg Code'], errors='coerce')
+        mapping = pd.Series(categories.values, index=codes.values)
+        return mapping[mapping.index.notna()].groupby(level=0).first()
+
+    @staticmethod
+    def normalize_extract(extract_df, period=None):
+        """
+        Normalize a revenue_gls extract to the store layout.
+
+        Args:
+            extract_df: DataFrame in the revenue_gls format
+            period: Balance date for extracts without a period column
+
+        Returns: DataFrame with period, gl_code, branch, currency and balance
+        """
+        period_col = next((c for c in PERIOD_COLUMNS if c in extract_df.columns), None)
+        if period_col is not None:
+            periods = pd.to_datetime(extract_df[period_col], errors='coerce')
+        elif period is not None:
+            periods = pd.Series(pd.Timestamp(period), index=extract_df.index)
+        else:
+            raise ValueError("Extract has no period column and no period was supplied")
+
+        balance = extract_df['SUM(GLBALH_AC_BAL)']
+        if not pd.api.types.is_numeric_dtype(balance):
+            balance = pd.to_numeric(balance.astype(str).str.replace(',', ''), errors='coerce')
+
+        return pd.DataFrame({
+            'period': periods.dt.to_period('M').dt.to_timestamp(),
+            'gl_code': to_gl_code(extract_df['GLBALH_GLACC_CODE']),
+            'branch': extract_df['GLBALH_BRN_CODE'],
+            'currency': extract_df['GLBALH_CURR_CODE'],
+            'balance': balance.fillna(0)
+        }).dropna(subset=['period', 'gl_code'])
+
+    def ingest(self, extract_df, period=None):
+        """
+        Add a periodic extract to the store. Re-ingesting a period replaces
+        the existing balances for the same (period, GL, branch, currency) keys.
+
+        Args:
+            extract_df: DataFrame in the revenue_gls format
+            period: Balance date for extracts without a period column
+        """
+        frame = self.normalize_extract(extract_df, period)
+        if len(frame) == 0:
+            return
+
+        frame = frame.groupby(self.KEY, sort=False)['balance'].sum().to_frame()
+        frame['category'] = self._categories.reindex(frame.index.get_level_values('gl_code')).values
+
+        combined = pd.concat([self.store, frame]) if len(self.store) > 0 else frame
+        combined = combined[~combined.index.duplicated(keep='last')]
+        self.store = combined.sort_index()
+
+    def get_periods(self):
+        """Get the distinct periods held in the store"""
+        return self.store.index.get_level_values('period').unique().sort_values()
+
+    def _slice(self, start=None, end=None, branch=None, currency=None):
+        """Rows for a date range and optional branch/currency filter"""
+        if len(self.store) == 0:
+            return self.store
+
+        start = pd.Timestamp(start).to_period('M').to_timestamp() if start is not None else None
+        end = pd.Timestamp(end).to_period('M').to_timestamp() if end is not None else None
+        rows = self.store.loc[pd.IndexSlice[start:end], :]
+
+        if branch is not None and branch != 'All':
+            rows = rows[rows.index.get_level_values('branch') == branch]
+        if currency is not None and currency != 'All':
+            rows = rows[rows.index.get_level_values('currency') == currency]
+        return rows
+
+    def _monthly_revenue(self, totals):
+        """Convert period balances to monthly revenue (differences for YTD balances)"""
+        if not self.cumulative_balances:
+            return totals
+
+        # Year-to-date balances: revenue is the change since the previous month of the same year
+        years = totals.index.year
+        previous = totals.groupby(years).shift(1).fillna(0)
+        return totals - previous
+
+    def get_income_by_type(self, start=None, end=None, branch=None, currency=None):
+        """
+        Monthly income split by income type.
+
+        Args:
+            start, end: Date range (inclusive, month granularity)
+            branch: Branch code or None/'All'
+            currency: Currency code or None/'All'
+
+        Returns: DataFrame indexed by month with one column per income type
+        """
+        rows = self._slice(start, end, branch, currency)
+        rows = rows[rows['category'].notna()]
+        if len(rows) == 0:
+            return pd.DataFrame()
+
+        split = rows.groupby([rows.index.get_level_values('period'), 'category'])['balance'].sum().unstack(fill_value=0)
+        split = self._monthly_revenue(split)
+        split.index.name = 'month'
+        return split.rename(columns=lambda c: INCOME_CATEGORY_NAMES.get(int(c), f'Category {int(c)}'))
+
+    def get_monthly_revenue(self, start, end, branch=None, currency=None):
+        """
+        Monthly total, funded and non-funded income over a contiguous month range.
+        Months without an extract are NaN rather than zero.
+
+        Returns: DataFrame with month, revenue, funded_income and non_funded_income
+        """
+        months = pd.date_range(
+            pd.Timestamp(start).to_period('M').to_timestamp(),
+            pd.Timestamp(end).to_period('M').to_timestamp(),
+            freq='MS'
+        )
+        rows = self._slice(start, end, branch, currency)
+        rows = rows[rows['category'].notna()]
+
+        if len(rows) > 0:
+            periods = rows.index.get_level_values('period')
+            category = rows['category'].values
+            frame = pd.DataFrame({
+                'revenue': rows['balance'].values,
+                'funded_income': np.where(np.isin(category, FUNDED_INCOME_CATEGORIES), rows['balance'].values, 0),
+                'non_funded_income': np.where(np.isin(category, NON_FUNDED_INCOME_CATEGORIES), rows['balance'].values, 0)
+            }, index=periods)
+            monthly = self._monthly_revenue(frame.groupby(level=0).sum())
+        else:
+            monthly = pd.DataFrame(columns=['revenue', 'funded_income', 'non_funded_income'], dtype='float64')
+
+        monthly = monthly.reindex(months)
+        monthly.index.name = 'month'
+        return monthly.reset_index()
+
+    def get_campaign_analysis(self, campaign_start, campaign_end, baseline_start=None,
+                              branch=None, currency=None, measure='revenue'):
+        """
+        Campaign vs baseline revenue with MoM deltas and rolling windows.
+
+        Args:
+            campaign_start, campaign_end: Campaign period
+            baseline_start: Start of the comparison period; defaults to a window
+                of the same length immediately before the campaign
+            branch: Branch code or None/'All'
+            currency: Currency code or None/'All'
+            measure: Column the MoM deltas, rolling average and baseline comparison
+                are computed on ('revenue', 'funded_income' or 'non_funded_income')
+
+        Returns: DataFrame with one row per month from baseline start to campaign end
+        """
+        campaign_start = pd.Timestamp(campaign_start).to_period('M').to_timestamp()
+        campaign_end = pd.Timestamp(campaign_end).to_period('M').to_timestamp()
+        if baseline_start is None:
+            n_months = (campaign_end.to_period('M') - campaign_start.to_period('M')).n + 1
+            baseline_start = (campaign_start.to_period('M') - n_months).to_timestamp()
+        baseline_start = min(pd.Timestamp(baseline_start).to_period('M').to_timestamp(), campaign_start)
+
+        df = self.get_monthly_revenue(baseline_start, campaign_end, branch, currency)
+        df['month_name'] = df['month'].dt.strftime('%B %Y')
+        df['period_type'] = np.where(df['month'] >= campaign_start, 'Campaign', 'Baseline')
+
+        # Vectorized window operations over the whole series
+        previous = df[measure].shift(1)
+        df['mom_change_abs'] = df[measure] - previous
+        df['mom_change'] = np.where(previous != 0, df['mom_change_abs'] / previous.abs() * 100, np.nan)
+        df['rolling_3m_avg'] = df[measure].rolling(3, min_periods=1).mean()
+
+        baseline_avg = df.loc[df['period_type'] == 'Baseline', measure].mean()
+        df['vs_baseline_pct'] = (df[measure] / baseline_avg - 1) * 100 if pd.notna(baseline_avg) and baseline_avg != 0 else np.nan
+
+        return df
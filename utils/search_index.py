@@ -0,0 +1,179 @@
+import pandas as pd
+import numpy as np
+
+# Columns searched by the account list search boxes
+SEARCH_COLUMNS = ['ACNTS_ACCOUNT_NUMBER', 'ACNTS_AC_NAME1', 'ACNTS_EMAIL', 'ACNTS_CLIENT_NUM']
+
+# Characters indexed per field; longer values are only searchable on their first MAX_FIELD_LENGTH characters
+MAX_FIELD_LENGTH = 64
+
+# Rows processed per batch while building, bounding peak memory
+BUILD_CHUNK_ROWS = 250_000
+
+# Byte marking the start of a word, so short queries become word-prefix lookups
+WORD_START = 1
+
+
+def _normalize(series):
+    """Lower-case search text for a column ('' for missing values)"""
+    if pd.api.types.is_numeric_dtype(series):
+        # Client/account numbers parsed as floats: index them without a trailing '.0'
+        series = series.round().astype('Int64')
+    return series.astype('string').fillna('').str.lower()
+
+
+def _to_bytes(text):
+    """Fixed-width ASCII byte matrix (rows x longest value, capped at MAX_FIELD_LENGTH), zero padded"""
+    encoded = text.str.slice(0, MAX_FIELD_LENGTH).str.encode('ascii', errors='replace')
+    raw = np.array(encoded.tolist(), dtype='S')
+    width = max(raw.dtype.itemsize, 1)
+    return raw.view(np.uint8).reshape(len(raw), width)
+
+
+def _sorted_unique(keys):
+    """Sorted distinct values (sort + adjacent compare; faster than np.unique's hashing here)"""
+    keys = np.sort(keys)
+    if len(keys) == 0:
+        return keys
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+
+
+def _gram_codes(chars, offset):
+    """
+    (gram code, row) keys for a byte matrix: every trigram, plus word-start
+    grams (WORD_START, WORD_START, c0) and (WORD_START, c0, c1) for prefix lookups.
+    """
+    rows = np.arange(len(chars), dtype=np.uint64) + np.uint64(offset)
+    c = chars.astype(np.uint64)
+    alnum = ((chars >= ord('0')) & (chars <= ord('9'))) | ((chars >= ord('a')) & (chars <= ord('z')))
+    starts = alnum & ~np.pad(alnum[:, :-1], ((0, 0), (1, 0)))
+
+    keys = []
+    # Substring trigrams
+    valid = chars[:, 2:] > 0
+    codes = (c[:, :-2] << np.uint64(16)) | (c[:, 1:-1] << np.uint64(8)) | c[:, 2:]
+    keys.append((codes << np.uint64(32) | rows[:, None])[valid])
+    # Word-start prefixes of one and two characters
+    marker = np.uint64(WORD_START)
+    one = (marker << np.uint64(16)) | (marker << np.uint64(8)) | c
+    keys.append((one << np.uint64(32) | rows[:, None])[starts])
+    two = (marker << np.uint64(16)) | (c[:, :-1] << np.uint64(8)) | c[:, 1:]
+    keys.append((two << np.uint64(32) | rows[:, None])[starts[:, :-1] & (chars[:, 1:] > 0)])
+    return _sorted_unique(np.concatenate(keys))
+
+
+class AccountSearchIndex:
+    """
+    Character n-gram inverted index over account identifiers and names.
+
+    Every field value is broken into trigrams (plus word-start grams for one-
+    and two-character prefixes); each gram maps to the sorted row positions
+    containing it, stored CSR-style as one codes array, offsets and one rows
+    array. A query of three or more characters intersects the posting lists
+    of its trigrams, smallest first, and verifies the few candidates with a
+    plain substring test; shorter queries match word prefixes directly.
+    """
+
+    def __init__(self, df, columns=None):
+        """
+        Args:
+            df: Accounts data (positions in df are the row ids returned by search)
+            columns: Columns to index (default SEARCH_COLUMNS present in df)
+        """
+        self.columns = [c for c in (columns or SEARCH_COLUMNS) if c in df.columns]
+        self.index = df.index
+        self.n_rows = len(df)
+        self.text = {col: _normalize(df[col]).reset_index(drop=True) for col in self.columns}
+        self.codes, self.offsets, self.rows = self._build()
+
+    def _build(self):
+        keys = []
+        for start in range(0, self.n_rows, BUILD_CHUNK_ROWS):
+            stop = min(start + BUILD_CHUNK_ROWS, self.n_rows)
+            for col in self.columns:
+                chars = _to_bytes(self.text[col].iloc[start:stop])
+                keys.append(_gram_codes(chars, start))
+
+        if not keys:
+            return np.array([], dtype=np.uint32), np.zeros(1, dtype=np.int64), np.array([], dtype=np.uint32)
+
+        # Same gram in several fields of a row: keep one posting
+        keys = _sorted_unique(np.concatenate(keys))
+        grams = (keys >> np.uint64(32)).astype(np.uint32)
+        rows = (keys & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        # Keys are sorted by gram then row: posting lists are contiguous and already sorted
+        starts = np.flatnonzero(np.concatenate(([True], grams[1:] != grams[:-1])))
+        codes = grams[starts]
+        offsets = np.append(starts, len(rows)).astype(np.int64)
+        return codes, offsets, rows
+
+    def _postings(self, code):
+        """Sorted row positions for one gram code"""
+        i = np.searchsorted(self.codes, code)
+        if i >= len(self.codes) or self.codes[i] != code:
+            return np.array([], dtype=np.uint32)
+        return self.rows[self.offsets[i]:self.offsets[i + 1]]
+
+    @staticmethod
+    def _query_bytes(query):
+        return list(query.encode('ascii', errors='replace'))
+
+    def search(self, query, limit=None):
+        """
+        Row positions whose indexed fields contain the query (case-insensitive).
+        Queries of one or two characters match the start of any word.
+
+        Args:
+            query: Search text
+            limit: Optional maximum number of positions to return
+
+        Returns: sorted numpy array of row positions
+        """
+        query = (query or '').strip().lower()
+        if not query or not self.columns:
+            return np.arange(self.n_rows) if not query else np.array([], dtype=np.int64)
+
+        chars = self._query_bytes(query)
+        if len(chars) < 3:
+            grams = [(WORD_START << 16) | (WORD_START << 8) | chars[0]] if len(chars) == 1 \
+                else [(WORD_START << 16) | (chars[0] << 8) | chars[1]]
+        else:
+            grams = sorted({(chars[i] << 16) | (chars[i + 1] << 8) | chars[i + 2] for i in range(len(chars) - 2)})
+
+        postings = sorted((self._postings(code) for code in grams), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+
+        if len(chars) >= 3 and len(candidates) > 0:
+            candidates = candidates[self._verify(candidates, query)]
+
+        matches = candidates.astype(np.int64)
+        return matches[:limit] if limit is not None else matches
+
+    def _verify(self, candidates, query):
+        """Exact substring check for trigram candidates"""
+        found = np.zeros(len(candidates), dtype=bool)
+        for col in self.columns:
+            values = self.text[col].iloc[candidates]
+            found |= values.str.contains(query, regex=False).to_numpy(dtype=bool, na_value=False)
+        return found
+
+    def search_labels(self, query):
+        """Index labels (of the indexed frame) matching the query"""
+        return self.index[self.search(query)]
+
+    def filter(self, df, query):
+        """
+        Rows of df (a filtered view of the indexed frame) matching the query,
+        in df's order. Composes with any filters already applied to df.
+        """
+        if not (query or '').strip():
+            return df
+        return df[df.index.isin(self.search_labels(query))]
+
+    def memory_bytes(self):
+        """Approximate size of the posting arrays"""
+        return int(self.codes.nbytes + self.offsets.nbytes + self.rows.nbytes)
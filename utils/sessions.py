@@ -0,0 +1,160 @@
+import os
+import atexit
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from utils.database import (
+    create_user_session,
+    get_active_user_session,
+    deactivate_user_session,
+    touch_user_sessions
+)
+
+SESSION_TTL_HOURS = int(os.environ.get('BI_SESSION_TTL_HOURS', 12))
+SESSION_CACHE_SIZE = int(os.environ.get('BI_SESSION_CACHE_SIZE', 10_000))
+
+# Cookie holding the session token in the browser
+SESSION_COOKIE = 'nmb_bi_session'
+
+# Seconds a cached validation is trusted before the database is asked again
+# (bounds how long a session revoked by another process stays usable here)
+VALIDATION_TTL = 60
+
+# Seconds between batched last_activity writes
+ACTIVITY_FLUSH_INTERVAL = 60
+
+
+def hash_token(token):
+    """Tokens are stored and cached as SHA-256 hashes, never in plain text"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class SessionStore:
+    """
+    Login sessions persisted in user_sessions, validated from an LRU cache.
+
+    create() issues a random token for a logged-in user. validate() answers
+    from an in-process LRU cache (max_entries) for VALIDATION_TTL seconds
+    before checking the database again, so a reconnect or refresh costs a
+    dictionary lookup rather than a bcrypt check or a query. Activity is
+    recorded in memory and written to last_activity for all sessions in one
+    statement every ACTIVITY_FLUSH_INTERVAL seconds (and at exit).
+    """
+
+    def __init__(self, ttl_hours=SESSION_TTL_HOURS, max_entries=SESSION_CACHE_SIZE):
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'activity_writes': 0}
+        self._cache = OrderedDict()  # token hash -> (user_data, expires_at, monotonic time validated)
+        self._activity = {}  # token hash -> last seen (utc)
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def _remember(self, token_hash, user_data, expires_at):
+        with self._lock:
+            self._cache[token_hash] = (user_data, expires_at, time.monotonic())
+            self._cache.move_to_end(token_hash)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def create(self, user_data, ip_address=None, user_agent=None):
+        """
+        Start a session for an authenticated user.
+
+        Args:
+            user_data: Dict from authenticate_user
+            ip_address, user_agent: Client details recorded with the session
+
+        Returns: str - session token for the client
+        """
+        token = secrets.token_urlsafe(32)
+        token_hash = hash_token(token)
+        expires_at = datetime.utcnow() + self.ttl
+        create_user_session(user_data['user_id'], token_hash, expires_at, ip_address,
+                            (user_agent or '')[:1000] or None)
+        self._remember(token_hash, dict(user_data), expires_at)
+        return token
+
+    def validate(self, token):
+        """
+        User data for a valid session token.
+
+        Returns: dict or None (unknown, expired or revoked token)
+        """
+        if not token:
+            return None
+        token_hash = hash_token(token)
+        now = datetime.utcnow()
+
+        with self._lock:
+            cached = self._cache.get(token_hash)
+            if cached is not None and cached[1] > now and time.monotonic() - cached[2] < VALIDATION_TTL:
+                self._cache.move_to_end(token_hash)
+                self.stats['hits'] += 1
+            else:
+                self._cache.pop(token_hash, None)
+                self.stats['misses'] += 1
+                cached = None
+        if cached is not None:
+            self.touch(token_hash)
+            return dict(cached[0])
+
+        found = get_active_user_session(token_hash)
+        if found is None:
+            return None
+        user_session, user = found
+        user_data = {
+            'user_id': user.user_id,
+            'username': user.username,
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'role_level': user.role_level,
+            'department': user.department
+        }
+        self._remember(token_hash, user_data, user_session.expires_at)
+        self.touch(token_hash)
+        return dict(user_data)
+
+    def revoke(self, token):
+        """End a session (logout)"""
+        if not token:
+            return
+        token_hash = hash_token(token)
+        with self._lock:
+            self._cache.pop(token_hash, None)
+            self._activity.pop(token_hash, None)
+        deactivate_user_session(token_hash)
+
+    def touch(self, token_hash):
+        """Note activity on a session; written with the next batch"""
+        with self._lock:
+            self._activity[token_hash] = datetime.utcnow()
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='session-activity', daemon=True)
+                self._flusher.start()
+                atexit.register(self.flush)
+
+    def flush(self):
+        """Write pending last_activity times in one statement"""
+        with self._lock:
+            activity, self._activity = self._activity, {}
+        if not activity:
+            return
+        try:
+            touch_user_sessions(activity)
+            self.stats['activity_writes'] += 1
+        except Exception:
+            pass  # activity is informational; the next batch carries newer times
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(ACTIVITY_FLUSH_INTERVAL)
+            self.flush()
+
+
+# Process-wide session store
+session_store = SessionStore()
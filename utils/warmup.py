@@ -0,0 +1,205 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from utils.data_loader import get_shared_loader, reload_shared_loader
+from utils.data_processor import get_shared_processor, release_shared_processors
+from utils.metrics_calculator import get_shared_calculator, release_shared_calculators
+from utils.kpi_registry import registry
+from utils.kpis import get_kpi, get_kpis
+
+WARMUP_WORKERS = 4
+
+
+def _transacting_since():
+    """Default 'active since' month used by the Customer Metrics page"""
+    return (pd.Timestamp.now() - pd.DateOffset(months=3)).strftime('%Y-%m')
+
+
+# (label, stage, task) - default-parameter results for every page. Stages run in
+# order; tasks within a stage run in parallel. Base results go in stage 1 so the
+# KPIs derived from them in stage 2 are cache hits rather than duplicate work.
+WARMUP_TASKS = [
+    ('Customer base', 1, lambda c: get_kpis(
+        ['total_customers', 'avg_products_per_customer', 'open_customers', 'customer_tenure_years'], c)),
+    ('Transacting customers', 1, lambda c: get_kpi('transacting_customers', c, active_since=_transacting_since())),
+    ('90-day activity split', 1, lambda c: get_kpi('activity_split', c, days_threshold=90)),
+    ('2025 quarterly funded accounts', 1, lambda c: (
+        get_kpi('quarterly_funded_accounts', c, year=2025),
+        c.processor.get_quarterly_funded_accounts(2025)
+    )),
+    ('2025 KPIs by group', 1, lambda c: get_kpi('group_kpi_matrix', c, year=2025)),
+    ('Product penetration', 1, lambda c: get_kpi('product_penetration', c)),
+    ('Products per customer', 1, lambda c: get_kpi('products_per_customer', c)),
+    ('Monthly churn', 1, lambda c: get_kpi('monthly_churn', c)),
+    ('Channel usage', 1, lambda c: get_kpi('channel_histogram', c)),
+    ('Account search index', 1, lambda c: c.processor.get_search_index()),
+    ('Account concentration', 1, lambda c: get_kpi('customer_concentration', c)),
+    ('Balance concentration', 1, lambda c: get_kpi('balance_concentration', c)),
+    ('Concentration summaries', 2, lambda c: get_kpis(
+        ['account_concentration', 'customer_segments', 'latest_churn_rate'], c)),
+    ('Channel adoption', 2, lambda c: get_kpis(['channel_adoption', 'channel_combinations', 'channel_segments'], c)),
+    ('Branch concentration', 2, lambda c: get_kpi('branch_concentration', c, concentration_value='accounts')),
+]
+
+
+class CacheWarmer:
+    """
+    Background warm-up of the data model and default dashboard results.
+
+    Runs on a daemon thread: loads the shared DataLoader, then evaluates
+    every warm-up task on a thread pool so results land in the shared KPI
+    registry (and the disk cache for persisted results). Progress is
+    available from progress() while it runs.
+    """
+
+    def __init__(self, tasks=None, max_workers=WARMUP_WORKERS):
+        self.tasks = tasks if tasks is not None else WARMUP_TASKS
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._thread = None
+        self._warmed_version = None
+        self._progress = self._initial_progress('idle')
+
+    def _initial_progress(self, state):
+        return {
+            'state': state,
+            'completed': 0,
+            'total': len(self.tasks) + 1,
+            'current': None,
+            'errors': {},
+            'started_at': None,
+            'finished_at': None,
+            'data_version': None
+        }
+
+    def _update(self, **changes):
+        with self._lock:
+            self._progress.update(changes)
+
+    def _step_done(self, label, error=None):
+        with self._lock:
+            self._progress['completed'] += 1
+            self._progress['current'] = label
+            if error is not None:
+                self._progress['errors'][label] = str(error)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, loader_factory=get_shared_loader, force=False):
+        """
+        Start warming in the background (no-op while running, or when the
+        current data version is already warm unless force=True).
+
+        Returns: bool - whether a new warm-up was started
+        """
+        with self._lock:
+            if self.running:
+                return False
+            if self._warmed_version is not None and not force:
+                return False
+            self._progress = self._initial_progress('running')
+            self._progress['started_at'] = pd.Timestamp.now()
+            self._thread = threading.Thread(target=self._run, args=(loader_factory,), name='cache-warmup', daemon=True)
+            self._thread.start()
+        return True
+
+    def _run(self, loader_factory):
+        try:
+            self._update(current='Loading data model')
+            loader = loader_factory()
+            version = loader.get_data_version()
+            self._update(data_version=version)
+            self._step_done('Data model')
+
+            if loader.get_accounts_data() is not None:
+                calculator = get_shared_calculator(loader)
+                self._run_tasks(calculator)
+
+            with self._lock:
+                self._warmed_version = version
+                self._progress['state'] = 'done'
+        except Exception as e:
+            self._update(state='failed', current=None)
+            with self._lock:
+                self._progress['errors']['Data model'] = str(e)
+        finally:
+            self._update(finished_at=pd.Timestamp.now())
+
+    def _run_tasks(self, calculator):
+        """Run tasks stage by stage on a thread pool"""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cache-warmup') as pool:
+            for stage in sorted({stage for _, stage, _ in self.tasks}):
+                futures = {
+                    pool.submit(task, calculator): label
+                    for label, task_stage, task in self.tasks if task_stage == stage
+                }
+                for future in as_completed(futures):
+                    error = future.exception()
+                    self._step_done(futures[future], error)
+
+    def refresh(self):
+        """
+        Reload data files into a new shared loader, drop cached results for the
+        sources that changed and warm again in the background.
+
+        Returns: list of changed source names
+        """
+        previous, loader, changed = reload_shared_loader()
+        if changed:
+            registry.invalidate(changed)
+            release_shared_calculators(previous)
+            release_shared_processors(previous)
+            get_shared_processor(loader)  # build over the new loader, dropping stale memoized results
+            with self._lock:
+                self._warmed_version = None
+        self.start(force=bool(changed))
+        return changed
+
+    def progress(self):
+        """
+        Snapshot of warm-up progress.
+
+        Returns: dict with state ('idle', 'running', 'done', 'failed'), completed,
+            total, fraction, current step, errors by step and timings
+        """
+        with self._lock:
+            progress = dict(self._progress, errors=dict(self._progress['errors']))
+        progress['fraction'] = progress['completed'] / progress['total'] if progress['total'] else 1.0
+        return progress
+
+    def wait(self, timeout=None):
+        """Block until the current warm-up finishes; returns progress()"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.progress()
+
+
+# Process-wide warmer shared by all sessions
+warmer = CacheWarmer()
+
+
+def start_warmup():
+    """Start the process-wide warm-up if it has not run yet"""
+    return warmer.start()
+
+
+if __name__ == '__main__':
+    # Pre-boot warm-up (populates the host-wide disk cache): python -m utils.warmup
+    started = time.perf_counter()
+    warmer.start()
+    while warmer.running:
+        progress = warmer.progress()
+        print(f"\rWarming caches: {progress['completed']}/{progress['total']} {progress['current'] or ''}".ljust(80),
+              end='', flush=True)
+        time.sleep(0.5)
+    progress = warmer.progress()
+    print(f"\rWarm-up {progress['state']}: {progress['completed']}/{progress['total']} steps "
+          f"in {time.perf_counter() - started:.1f}s".ljust(80))
+    for label, error in progress['errors'].items():
+        print(f"  {label}: {error}")
+    sys.exit(0 if progress['state'] == 'done' else 1)